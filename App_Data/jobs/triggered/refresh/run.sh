@@ -0,0 +1,7 @@
+#!/bin/sh
+# Scheduled data refresh, an Azure App Service triggered WebJob (schedule in settings.job).
+# Runs daily; auto mode does nothing until the database is older than UPDATE_INTERVAL,
+# and resumes from checkpoints if a previous run was cut short.
+cd /home/site/wwwroot || exit 1
+[ -f antenv/bin/activate ] && . antenv/bin/activate
+exec python -m Core --mode auto
@@ -0,0 +1,140 @@
+'''Command line entry point for the ETL pipeline.
+
+Usage:
+    python -m Core [--mode {auto,full,delta,noop}] [--stages STAGE ...] [--dry-run]
+                   [--force STAGE] [--workers N] [--chunk-size N] [--profile [PATH]]
+
+Runs the pipeline once with the settings in `config.py`, outside of any web process, so it
+can be scheduled with cron or an Azure WebJob. An interrupted run resumes from its last
+checkpointed stage, and stages whose inputs are unchanged are skipped.
+
+Modes:
+    auto   resume an unfinished run, build a new database, or update a stale one (default)
+    full   rebuild the database from scratch
+    delta  update the existing database
+    noop   report what `auto` would do and exit
+
+Exit codes:
+    0  success, or nothing to do
+    1  unexpected failure
+    2  invalid arguments
+    3  source data rejected by schema checks
+    4  a skipped stage has no usable checkpoint
+    130  interrupted
+'''
+# Import dependencies
+import sys
+import cProfile
+import argparse
+import pstats
+from pathlib import Path
+
+# Import config file
+import config as C
+
+# Import Directory Modules for Core Building
+from .pipeline import Pipeline
+from .etl.schema import SchemaError
+from .etl.checkpoint import STAGES, CheckpointMissing
+
+# Bring in custom logger
+from .log_config import init_log
+log = init_log(__name__)
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_SCHEMA = 3
+EXIT_CHECKPOINT = 4
+EXIT_INTERRUPTED = 130
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog = 'python -m Core', description = 'Run the CurryScorer ETL pipeline.')
+    parser.add_argument('--mode', choices = ('auto', 'full', 'delta', 'noop'), default = 'auto', help = 'Refresh strategy. Defaults to auto.')
+    parser.add_argument('--stages', nargs = '+', choices = STAGES, default = list(STAGES), help = 'Stages to run, skipped upstream stages are read from checkpoints.')
+    parser.add_argument('--dry-run', action = 'store_true', help = 'Extract and transform only, report rows and timings without touching the database.')
+    parser.add_argument('--force', choices = STAGES, action = 'append', default = [], help = 'Rerun this stage and the ones after it, ignoring checkpoints.')
+    parser.add_argument('--workers', type = int, help = 'Processes for the sharded transform, overrides TRANSFORM_WORKERS.')
+    parser.add_argument('--chunk-size', type = int, help = 'Rows per insert batch during fresh loads, overrides CHUNK_SIZE.')
+    parser.add_argument('--profile', nargs = '?', type = Path, const = C.STORAGE / 'pipeline.prof', help = 'Profile the run with cProfile and write stats to PATH.')
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 0:
+        parser.error('--workers must be zero or positive.')
+    if args.chunk_size is not None and args.chunk_size < 1:
+        parser.error('--chunk-size must be positive.')
+    if args.dry_run:
+        args.stages = [s for s in args.stages if s != 'load']
+    return args
+
+
+def print_stats(pipeline: Pipeline, dry_run: bool) -> None:
+    header = f'{"stage":<11}{"source":<12}{"seconds":>10}{"rows":>10}{"rows/s":>12}'
+    print(header)
+    print('-' * len(header))
+    for s in pipeline.stats:
+        rate = s['rows'] / s['seconds'] if s['seconds'] else float('inf')
+        print(f'{s["stage"]:<11}{s["source"]:<12}{s["seconds"]:>10.3f}{s["rows"]:>10}{rate:>12.0f}')
+    if dry_run:
+        print('dry run: database left untouched')
+    elif getattr(pipeline, 'version', None) is not None:
+        print(f'data version: {pipeline.version}')
+
+
+def warm_shared_cache() -> None:
+    # Pre-render API responses into the cross-worker cache so web workers pick them up on first request
+    if not C.DB_CONFIG.get('SHARED_CACHE_PATH'):
+        return None
+    from .backend import warm_cache
+    warm_cache()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    db_config = {**C.DB_CONFIG}
+    if args.workers is not None:
+        db_config['TRANSFORM_WORKERS'] = args.workers
+    if args.chunk_size is not None:
+        db_config['CHUNK_SIZE'] = args.chunk_size
+
+    profiler = None
+    try:
+        pipeline = Pipeline(db_config, C.API_CONFIG, C.REF_SEQS, C.STORAGE / 'app.log')
+        if args.mode == 'noop':
+            new_db, reason = pipeline.plan('auto')
+            print(f'noop: would {"build fresh" if new_db else "update" if new_db is False else "do nothing"} ({reason})')
+            return EXIT_OK
+        if args.profile:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        pipeline.run(force = args.force, mode = args.mode, stages = args.stages)
+        if profiler is not None:
+            profiler.disable()
+        if pipeline.stats and 'load' in args.stages:
+            warm_shared_cache()
+        print_stats(pipeline, args.dry_run)
+        return EXIT_OK
+    except SchemaError as e:
+        log.critical('Source data rejected: %s', e)
+        return EXIT_SCHEMA
+    except CheckpointMissing as e:
+        log.critical('%s', e)
+        return EXIT_CHECKPOINT
+    except KeyboardInterrupt:
+        log.warning('Pipeline run interrupted, rerun to resume from the last checkpoint.')
+        return EXIT_INTERRUPTED
+    except Exception:
+        log.critical('Pipeline run failed.', exc_info = True)
+        return EXIT_FAILED
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            args.profile.parent.mkdir(parents = True, exist_ok = True)
+            profiler.dump_stats(args.profile)
+            pstats.Stats(profiler, stream = sys.stdout).sort_stats('cumulative').print_stats(25)
+            print(f'profile written to {args.profile}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,16 @@
 # Import dependencies
-import datetime as dt
-from sqlalchemy import func, select
-from sqlalchemy.orm import joinedload
-from flask import Flask, jsonify, request, render_template, abort
+from flask import Flask, jsonify, request, render_template, abort, send_file
 from flask_cors import CORS
 from werkzeug.middleware.proxy_fix import ProxyFix
+from sqlalchemy.exc import OperationalError
 
 # Import subpackage dependencies
-from Core.database import Restaurants, Boroughs, Cuisines, get_session, execute_query
-from .backend import forge_json
+from .backend import forge_json, latest_snapshot
+from .queries import SqlSource, match_expression
+from .cache import HOST_SLOT, ResponseCache, SharedCache, cache_key, cached, data_version, with_host
+from .audit import query_timer, audit_endpoints
+from .spatial import spatial_index, NYC_LAT, NYC_LNG
+from Core.database import engine, SEARCH_TABLE
 
 # Import config file
 import config as C
@@ -35,6 +37,440 @@ map_node = '/api/v1.0/map/'
 topCuisines_node = '/api/v1.0/top-cuisines/'
 cuisineDist_node = '/api/v1.0/cuisine-distributions/'
 boroughSummary_node = '/api/v1.0/borough-summaries/'
+snapshot_node = '/api/v1.0/snapshot/'
+cacheStats_node = '/api/v1.0/cache-stats/'
+bundle_node = '/api/v1.0/bundle/'
+queryPlans_node = '/api/v1.0/debug/query-plans/'
+search_node = '/api/v1.0/search/'
+nearby_node = '/api/v1.0/nearby/'
+trends_node = '/api/v1.0/trends/'
+cuisineScores_node = '/api/v1.0/cuisine-scores/'
+
+# Search page size bounds
+SEARCH_LIMIT = (1, 100)
+SEARCH_MAX_OFFSET = 10000
+
+# Nearby result count and radius (metres) bounds
+NEARBY_K = (1, 100)
+NEARBY_MAX_RADIUS = 20000
+
+# Dimensions the trends endpoint can split its series by
+TRENDS_BY = ('borough', 'cuisine')
+
+# Rankings the cuisine scores endpoint offers, and its result count bounds
+SCORE_METRICS = ('per_100k', 'location_quotient', 'citywide_percent')
+SCORES_LIMIT = (1, 100)
+
+# Parts the bundle endpoint can return, in response order
+BUNDLE_PARTS = ('map', 'top-cuisines', 'cuisine-distributions', 'borough-summaries')
+
+# Data sources for the endpoints
+sql_source = SqlSource()
+
+# Serialized responses shared by all request threads of this process
+response_cache = ResponseCache(C.DB_CONFIG['CACHE_MAX_BYTES'], C.DB_CONFIG['CACHE_TTL'])
+shared_cache = SharedCache(C.DB_CONFIG['SHARED_CACHE_PATH'], C.DB_CONFIG['CACHE_TTL'], C.DB_CONFIG['SHARED_CACHE_JOURNAL']) if C.DB_CONFIG['SHARED_CACHE_PATH'] else None
+
+# Diagnostic mode, times every statement sent to SQLite by this worker
+if C.DB_CONFIG['QUERY_AUDIT']:
+    log.warning('QUERY_AUDIT is on, timing every SQL statement.')
+    query_timer.attach(engine)
+
+def data_source():
+    '''Picks the backing store for API reads based on `SERVE_MODE`.
+
+    Returns:
+        SqlSource | ReadModel: Memory-mapped read model when enabled and exported, else SQL.
+    '''
+    if C.DB_CONFIG['SERVE_MODE'] == 'mmap':
+        from Core.readmodel import load_read_model  # Deferred so SQL-only workers never import NumPy
+        model = load_read_model(C.DB_CONFIG['READ_MODEL_DIR'])
+        if model is not None:
+            return model
+        log.warning('Read model not exported yet, falling back to SQL.')
+    return sql_source
+
+
+#################################################
+# Payload Builders (shared by the WSGI and ASGI apps)
+#################################################
+def map_payload(host: str | None = None) -> dict:
+    data = data_source().map_rows()
+    desc = 'Retrieves restaurant details for interactive heat map.'
+    return forge_json(map_node, data, desc, host = host)
+
+
+def map_delta_payload(since: int, host: str | None = None) -> dict:
+    '''Builds the map change feed from the SQL change log, whatever `SERVE_MODE` is.
+
+    Args:
+        since (int): Data version the client already holds.
+        host (str | None, optional): Requesting host. Defaults to the Flask request host.
+
+    Returns:
+        dict: `forge_json` envelope with `version`, `since`, `full_reload`, `upserts` and `deleted`.
+    '''
+    version = data_version()
+    if since == version:
+        changes = {'upserts': [], 'deleted': []}
+    else:
+        changes = sql_source.map_changes(since, version) if since < version else None
+    data = {
+        'version': version
+        ,'since': since
+        ,'full_reload': changes is None     # Fetch the map without `since` instead
+        ,**(changes or {'upserts': [], 'deleted': []})
+    }
+    desc = 'Retrieves restaurants changed since a data version, for clients holding an earlier map.'
+    return forge_json(map_node, data, desc, {'since': since}, host = host)
+
+
+def map_since(since: str | None) -> int | None:
+    '''Validates the map `since` parameter.
+
+    Raises:
+        ValueError: With a client-facing description when it is not a version number.
+
+    Returns:
+        int | None: Version, None for the full map.
+    '''
+    if since is None or since == '':
+        return None
+    if not since.isdigit():
+        raise ValueError('since must be a non-negative integer data version.')
+    return int(since)
+
+
+def topCuisines_payload(borough: str, host: str | None = None) -> dict:
+    data = data_source().top_cuisines(borough)
+    desc = 'Retrieves aggregated counts for cuisines in given borough.'
+    params = {'borough': borough}
+    return forge_json(topCuisines_node, data, desc, params, host = host)
+
+
+def cuisineDist_payload(host: str | None = None) -> dict:
+    data = data_source().cuisine_distribution()
+    desc = 'Retrieves percent distribution of all cuisines across NYC.'
+    return forge_json(cuisineDist_node, data, desc, host = host)
+
+
+def boroughSummary_payload(host: str | None = None) -> dict:
+    data = data_source().borough_summary()
+    desc = 'Retrieves summary statistics per each borough.'
+    return forge_json(boroughSummary_node, data, desc, host = host)
+
+
+def bundle_parts(include: str | None) -> str | None:
+    '''Normalizes the bundle `include` parameter.
+
+    Args:
+        include (str | None): Comma separated part names, empty or None for all parts.
+
+    Returns:
+        str | None: Requested parts in canonical order, or None when a name is unknown.
+    '''
+    requested = {p.strip() for p in (include or '').split(',') if p.strip()} or set(BUNDLE_PARTS)
+    if not requested <= set(BUNDLE_PARTS):
+        return None
+    return ','.join(p for p in BUNDLE_PARTS if p in requested)
+
+
+def bundle_payload(include: str, borough: str | None = None, host: str | None = None) -> dict:
+    '''Builds several endpoint results in one response from one database session.
+
+    Args:
+        include (str): Canonical part list from `bundle_parts()`.
+        borough (str | None, optional): Limit top cuisines to one borough, all boroughs when None.
+        host (str | None, optional): Requesting host. Defaults to the Flask request host.
+
+    Returns:
+        dict: `forge_json` envelope whose results are keyed by part name.
+    '''
+    source = data_source()
+    parts = include.split(',')
+    with source.scope(None) as session:
+        builders = {
+            'map': lambda: source.map_rows(session)
+            ,'top-cuisines': lambda: (
+                source.top_cuisines_all(session) if borough is None
+                else {borough: source.top_cuisines(borough, session)}
+            )
+            ,'cuisine-distributions': lambda: source.cuisine_distribution(session)
+            ,'borough-summaries': lambda: source.borough_summary(session)
+        }
+        data = {part: builders[part]() for part in parts}
+    desc = 'Retrieves several dashboard datasets in one response.'
+    params = {'include': include, 'borough': borough} if borough else {'include': include}
+    return forge_json(bundle_node, data, desc, params, host = host)
+
+
+def search_params(
+        q: str | None
+        ,borough: str | None = None
+        ,cuisine: str | None = None
+        ,limit: str | None = None
+        ,offset: str | None = None
+        ) -> dict:
+    '''Validates raw search query parameters.
+
+    Raises:
+        ValueError: With a client-facing description when a parameter is invalid.
+
+    Returns:
+        dict: Keyword arguments for `search_payload()`.
+    '''
+    q = (q or '').strip()
+    if not q or len(q) > 100:
+        raise ValueError('q must be 1 to 100 characters.')
+    if borough and borough not in C.REF_SEQS['BOROUGHS']:
+        raise ValueError('Invalid borough name.')
+    if cuisine and cuisine not in C.REF_SEQS['CUISINES']:
+        raise ValueError('Invalid cuisine name.')
+    limit = limit or '20'
+    if not limit.isdigit() or not SEARCH_LIMIT[0] <= int(limit) <= SEARCH_LIMIT[1]:
+        raise ValueError(f'limit must be an integer from {SEARCH_LIMIT[0]} to {SEARCH_LIMIT[1]}.')
+    offset = offset or '0'
+    if not offset.isdigit() or int(offset) > SEARCH_MAX_OFFSET:
+        raise ValueError(f'offset must be an integer from 0 to {SEARCH_MAX_OFFSET}.')
+    return {'q': q, 'borough': borough or None, 'cuisine': cuisine or None, 'limit': int(limit), 'offset': int(offset)}
+
+
+def search_payload(
+        q: str
+        ,borough: str | None = None
+        ,cuisine: str | None = None
+        ,limit: int = 20
+        ,offset: int = 0
+        ,host: str | None = None
+        ) -> dict:
+    '''Builds the search response, always from SQLite since the FTS5 index lives there.
+
+    Raises:
+        LookupError: The search index has not been built in this database.
+    '''
+    match = match_expression(q)
+    try:
+        data = sql_source.search(match, borough, cuisine, limit, offset) if match else {'total': 0, 'restaurants': [], 'facets': {'borough': {}, 'cuisine': {}}}
+    except OperationalError as e:
+        if SEARCH_TABLE not in str(e):
+            raise
+        raise LookupError('Search index has not been built yet, run the pipeline.') from e
+    desc = 'Searches restaurant names, best matches first, with borough and cuisine facets.'
+    params = {'q': q, 'borough': borough, 'cuisine': cuisine, 'limit': limit, 'offset': offset}
+    return forge_json(search_node, data, desc, {k: v for k, v in params.items() if v is not None}, host = host)
+
+
+def nearby_params(
+        lat: str | None
+        ,lng: str | None
+        ,k: str | None = None
+        ,radius: str | None = None
+        ,cuisine: str | None = None
+        ) -> dict:
+    '''Validates raw nearby query parameters.
+
+    Raises:
+        ValueError: With a client-facing description when a parameter is invalid.
+
+    Returns:
+        dict: Keyword arguments for `nearby_payload()`.
+    '''
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        raise ValueError('lat and lng must be numbers.')
+    if not (NYC_LAT[0] <= lat <= NYC_LAT[1] and NYC_LNG[0] <= lng <= NYC_LNG[1]):
+        raise ValueError('lat and lng must be inside New York City.')
+    k = k or '10'
+    if not k.isdigit() or not NEARBY_K[0] <= int(k) <= NEARBY_K[1]:
+        raise ValueError(f'k must be an integer from {NEARBY_K[0]} to {NEARBY_K[1]}.')
+    if radius:
+        try:
+            radius = float(radius)
+        except ValueError:
+            raise ValueError('radius must be a number of metres.')
+        if not 0 < radius <= NEARBY_MAX_RADIUS:
+            raise ValueError(f'radius must be above 0 and at most {NEARBY_MAX_RADIUS} metres.')
+    if cuisine and cuisine not in C.REF_SEQS['CUISINES']:
+        raise ValueError('Invalid cuisine name.')
+    return {'lat': lat, 'lng': lng, 'k': int(k), 'radius': radius or None, 'cuisine': cuisine or None}
+
+
+def nearby_payload(
+        lat: float
+        ,lng: float
+        ,k: int = 10
+        ,radius: float | None = None
+        ,cuisine: str | None = None
+        ,host: str | None = None
+        ) -> dict:
+    '''Builds the nearby response from this worker's spatial index.'''
+    index = spatial_index(data_version(), lambda: data_source().map_rows())
+    data = index.nearest(lat, lng, k, radius, cuisine)
+    desc = 'Retrieves the restaurants closest to a point, nearest first, with distances in metres.'
+    params = {'lat': lat, 'lng': lng, 'k': k, 'radius': radius, 'cuisine': cuisine}
+    return forge_json(nearby_node, data, desc, {key: v for key, v in params.items() if v is not None}, host = host)
+
+
+def trends_params(
+        borough: str | None = None
+        ,cuisine: str | None = None
+        ,by: str | None = None
+        ) -> dict:
+    '''Validates raw trends query parameters.
+
+    Raises:
+        ValueError: With a client-facing description when a parameter is invalid.
+
+    Returns:
+        dict: Keyword arguments for `trends_payload()`.
+    '''
+    if borough and borough not in C.REF_SEQS['BOROUGHS']:
+        raise ValueError('Invalid borough name.')
+    if cuisine and cuisine not in C.REF_SEQS['CUISINES']:
+        raise ValueError('Invalid cuisine name.')
+    if by and by not in TRENDS_BY:
+        raise ValueError(f'by must be one of {", ".join(TRENDS_BY)}.')
+    return {'borough': borough or None, 'cuisine': cuisine or None, 'by': by or None}
+
+
+def trends_payload(
+        borough: str | None = None
+        ,cuisine: str | None = None
+        ,by: str | None = None
+        ,host: str | None = None
+        ) -> dict:
+    '''Builds the monthly trends response, always from SQLite since the rollup lives there.'''
+    data = sql_source.trends(borough, cuisine, by)
+    desc = 'Retrieves monthly inspection and restaurant counts, optionally split by borough or cuisine.'
+    params = {'borough': borough, 'cuisine': cuisine, 'by': by}
+    return forge_json(trends_node, data, desc, {k: v for k, v in params.items() if v is not None}, host = host)
+
+
+def cuisineScores_params(
+        metric: str | None = None
+        ,borough: str | None = None
+        ,cuisine: str | None = None
+        ,limit: str | None = None
+        ) -> dict:
+    '''Validates raw cuisine scores query parameters.
+
+    Raises:
+        ValueError: With a client-facing description when a parameter is invalid.
+
+    Returns:
+        dict: Keyword arguments for `cuisineScores_payload()`.
+    '''
+    metric = metric or SCORE_METRICS[0]
+    if metric not in SCORE_METRICS:
+        raise ValueError(f'metric must be one of {", ".join(SCORE_METRICS)}.')
+    if borough and borough not in C.REF_SEQS['BOROUGHS']:
+        raise ValueError('Invalid borough name.')
+    if cuisine and cuisine not in C.REF_SEQS['CUISINES']:
+        raise ValueError('Invalid cuisine name.')
+    limit = limit or '10'
+    if not limit.isdigit() or not SCORES_LIMIT[0] <= int(limit) <= SCORES_LIMIT[1]:
+        raise ValueError(f'limit must be an integer from {SCORES_LIMIT[0]} to {SCORES_LIMIT[1]}.')
+    return {'metric': metric, 'borough': borough or None, 'cuisine': cuisine or None, 'limit': int(limit)}
+
+
+def cuisineScores_payload(
+        metric: str = SCORE_METRICS[0]
+        ,borough: str | None = None
+        ,cuisine: str | None = None
+        ,limit: int = 10
+        ,host: str | None = None
+        ) -> dict:
+    '''Builds the ranked cuisine scores response, always from SQLite since the scores live there.'''
+    data = sql_source.cuisine_scores(metric, borough, cuisine, limit)
+    desc = 'Retrieves cuisine density scores per borough (per 100k residents, location quotient, citywide share) ranked by one of them.'
+    params = {'metric': metric, 'borough': borough, 'cuisine': cuisine, 'limit': limit}
+    return forge_json(cuisineScores_node, data, desc, {k: v for k, v in params.items() if v is not None}, host = host)
+
+
+#################################################
+# Response Cache
+#################################################
+def render(payload: dict) -> bytes:
+    '''Serializes a payload exactly as `jsonify` does outside debug mode.'''
+    return f"{app.json.dumps(payload, separators = (',', ':'))}\n".encode('utf-8')
+
+
+def cached_payload(
+        route: str
+        ,build
+        ,**params
+        ) -> bytes:
+    '''Host-free endpoint response, served from `response_cache` or `shared_cache` when possible.
+
+    Args:
+        route (str): Endpoint node, first part of the cache key.
+        build (Callable): Payload builder, called as `build(**params, host = HOST_SLOT)` on a miss.
+        **params: Endpoint query parameters.
+
+    Returns:
+        bytes: JSON body with `HOST_SLOT` as its `home_route`.
+    '''
+    key = cache_key(route, params, data_version())
+    return cached(response_cache, key, lambda: render(build(**params, host = HOST_SLOT)), shared_cache)
+
+
+def cached_body(
+        route: str
+        ,build
+        ,host: str
+        ,**params
+        ) -> bytes:
+    '''Serialized endpoint response for the requesting host, see `cached_payload()`.
+
+    Args:
+        route (str): Endpoint node, first part of the cache key.
+        build (Callable): Payload builder, called as `build(**params, host = HOST_SLOT)` on a miss.
+        host (str): Requesting host, filled into the metadata after the lookup.
+        **params: Endpoint query parameters.
+
+    Returns:
+        bytes: JSON body.
+    '''
+    return with_host(cached_payload(route, build, **params), host)
+
+
+def json_response(body: bytes):
+    return app.response_class(body, mimetype = 'application/json')
+
+
+def warm_cache() -> int:
+    '''Pre-renders every data endpoint, typically right after a pipeline run.
+
+    Cached bodies are host-free, so one rendering serves every host name.
+
+    Returns:
+        int: Number of responses rendered.
+    '''
+    if not response_cache.max_bytes and shared_cache is None:
+        return 0
+    try:
+        data_version(refresh = True)    # Pick up the version the pipeline just recorded
+        rendered = 0
+        previous = data_version() - 1
+        cached_payload(map_node, map_payload)
+        if previous > 0:
+            cached_payload(map_node, map_delta_payload, since = previous)   # Clients one version behind
+            rendered += 1
+        cached_payload(cuisineDist_node, cuisineDist_payload)
+        cached_payload(boroughSummary_node, boroughSummary_payload)
+        for borough in C.REF_SEQS['BOROUGHS']:
+            cached_payload(topCuisines_node, topCuisines_payload, borough = borough)
+        cached_payload(bundle_node, bundle_payload, include = ','.join(BUNDLE_PARTS))
+        cached_payload(trends_node, trends_payload, borough = None, cuisine = None, by = None)
+        for borough in C.REF_SEQS['BOROUGHS']:
+            cached_payload(cuisineScores_node, cuisineScores_payload, metric = SCORE_METRICS[0], borough = borough, cuisine = None, limit = 10)
+        rendered += 5 + 2 * len(C.REF_SEQS['BOROUGHS'])
+        log.info('Response cache warmed with %s responses.', rendered)
+        return rendered
+    except Exception:
+        log.critical('Could not warm response cache.', exc_info = True)
+        raise
 
 
 #################################################
@@ -61,27 +497,25 @@ def home():
 def api_map():
     '''Endpoint for restaurant markers with details.
 
+    Query Parameters:
+        since (int): Data version the client holds, returns only what changed after it. Optional.
+
     Returns:
-        flask.Response: JSON response containing endpoint data.
+        flask.Response: JSON response containing endpoint data, with the data version in
+            the `X-Data-Version` header.
     '''
     try:
-        stmt = select(Restaurants).options(joinedload(Restaurants.borough), joinedload(Restaurants.cuisine))
-        log.debug('Executing map_node query.')
-        results = execute_query(stmt)
-        data = [
-            {
-                'id': r.id,
-                'name': r.name,
-                'lat': r.lat,
-                'lng': r.lng,
-                'borough': r.borough.borough,
-                'cuisine': r.cuisine.cuisine,
-                'inspection_date': dt.date.isoformat(r.inspection_date)
-            }
-        for r in results]
-        desc = 'Retrieves restaurant details for interactive heat map.'
-        data_nest = forge_json(map_node, data, desc)
-        return jsonify(data_nest)
+        try:
+            since = map_since(request.args.get('since'))
+        except ValueError as e:
+            log.warning('Invalid request parameter: %s', e)
+            abort(400, description = str(e))
+        if since is None:
+            response = json_response(cached_body(map_node, map_payload, request.host))
+        else:
+            response = json_response(cached_body(map_node, map_delta_payload, request.host, since = since))
+        response.headers['X-Data-Version'] = str(data_version())
+        return response
     except Exception:
         log.critical('Could not execute map_node query.', exc_info = True)
         raise
@@ -101,37 +535,9 @@ def api_topCuisines():
     try:
         boro_param = request.args.get('borough')
         if boro_param not in C.REF_SEQS['BOROUGHS']:
-            log.warning(f'Invalid request parameter: {boro_param}')
+            log.warning('Invalid request parameter: %s', boro_param)
             abort(400, description = 'Invalid borough name.')
-        counts = func.count(Restaurants.id)
-        stmt = (
-            select(
-                Cuisines.cuisine
-                ,counts.label('count')
-            ).join(
-                Restaurants
-            ).join(
-                Boroughs
-            ).where(
-                Boroughs.borough == boro_param
-            ).group_by(
-                Cuisines.cuisine
-            ).order_by(
-                counts.desc()
-            )
-        )
-        with get_session() as session:
-            results = session.execute(stmt)
-            data = [
-                {
-                    'cuisine': r.cuisine,
-                    'count': r.count
-                } 
-                for r in results]
-        desc = 'Retrieves aggregated counts for cuisines in given borough.'
-        params = {'borough': boro_param}
-        data_nest = forge_json(topCuisines_node, data, desc, params)
-        return jsonify(data_nest)
+        return json_response(cached_body(topCuisines_node, topCuisines_payload, request.host, borough = boro_param))
     except Exception:
         log.critical('Could not execute topCuisines_node query.', exc_info = True)
         raise
@@ -146,30 +552,7 @@ def api_cuisine_pie():
         flask.Response: JSON response containing endpoint data.
     '''
     try:
-        with get_session() as session:    
-            stmt_total = select(func.count(Restaurants.id))
-            total = session.scalar(stmt_total)
-            stmt = (
-                select(
-                    Cuisines.cuisine
-                    ,func.count(Restaurants.id).label('count')
-                ).join(
-                    Restaurants
-                ).group_by(
-                    Cuisines.cuisine
-                )
-            )
-            results = session.execute(stmt)
-            data = [
-                {
-                    'cuisine': r.cuisine
-                    ,'count': r.count
-                    ,'percent': (r.count / total * 100)
-                }
-            for r in results]
-        desc = 'Retrieves percent distribution of all cuisines across NYC.'
-        data_nest = forge_json(cuisineDist_node, data, desc)
-        return jsonify(data_nest)
+        return json_response(cached_body(cuisineDist_node, cuisineDist_payload, request.host))
     except Exception:
         log.critical('Could not execute cuisineDist_node query.', exc_info = True)
         raise
@@ -183,34 +566,227 @@ def api_borough_summary():
         flask.response: JSON response containing endpoint data.
     '''
     try:
-        stmt = (
-            select(
-                Boroughs.borough
-                ,func.count(Restaurants.id).label('restaurant_count')
-                ,Boroughs.population
-            ).join(
-                Restaurants
-            ).group_by(
-                Boroughs.borough
-            )
-        )
-        with get_session() as session:
-            results = session.execute(stmt)
-            data = [
-                {
-                    'borough': r.borough
-                    ,'restaurant_count': r.restaurant_count
-                    ,'population': r.population
-                }
-            for r in results]
-        desc = 'Retrieves summary statistics per each borough.'
-        data_nest = forge_json(boroughSummary_node, data, desc)
-        return jsonify(data_nest)
+        return json_response(cached_body(boroughSummary_node, boroughSummary_payload, request.host))
     except Exception:
         log.critical('Could not execute query for boroughSummary_node.', exc_info = True)
         raise
 
 
+# Endpoint for the whole dashboard in one call
+@app.route(bundle_node)
+def api_bundle():
+    '''Endpoint for any subset of the four data endpoints in one response.
+
+    Query Parameters:
+        include (str): Comma separated parts out of `map`, `top-cuisines`,
+            `cuisine-distributions` and `borough-summaries`. Defaults to all.
+        borough (str): Limit `top-cuisines` to one borough. Defaults to every borough.
+
+    Returns:
+        flask.Response: JSON response containing endpoint data keyed by part.
+    '''
+    try:
+        include = bundle_parts(request.args.get('include'))
+        if include is None:
+            log.warning('Invalid bundle include: %s', request.args.get('include'))
+            abort(400, description = f'include must be drawn from {", ".join(BUNDLE_PARTS)}.')
+        boro_param = request.args.get('borough') or None
+        if boro_param is not None and boro_param not in C.REF_SEQS['BOROUGHS']:
+            log.warning('Invalid request parameter: %s', boro_param)
+            abort(400, description = 'Invalid borough name.')
+        return json_response(cached_body(bundle_node, bundle_payload, request.host, include = include, borough = boro_param))
+    except Exception:
+        log.critical('Could not execute bundle_node query.', exc_info = True)
+        raise
+
+
+# Endpoint for restaurant name search
+@app.route(search_node)
+def api_search():
+    '''Endpoint for ranked restaurant name search, suitable for type-ahead.
+
+    Query Parameters:
+        q (str): Search text, the last word is matched as a prefix.
+        borough (str): Only restaurants in this borough. Optional.
+        cuisine (str): Only restaurants with this cuisine. Optional.
+        limit (int): Page size, 1 to 100. Defaults to 20.
+        offset (int): Matches skipped before the page. Defaults to 0.
+
+    Returns:
+        flask.Response: JSON response with the total, the page of restaurants and facet counts.
+    '''
+    try:
+        try:
+            params = search_params(*(request.args.get(k) for k in ('q', 'borough', 'cuisine', 'limit', 'offset')))
+        except ValueError as e:
+            log.warning('Invalid search request: %s', e)
+            abort(400, description = str(e))
+        try:
+            return jsonify(search_payload(**params))
+        except LookupError as e:
+            log.warning('%s', e)
+            abort(503, description = str(e))
+    except Exception:
+        log.critical('Could not execute search_node query.', exc_info = True)
+        raise
+
+
+# Endpoint for proximity lookups
+@app.route(nearby_node)
+def api_nearby():
+    '''Endpoint for the k restaurants nearest to a point.
+
+    Query Parameters:
+        lat (float): Latitude in degrees.
+        lng (float): Longitude in degrees.
+        k (int): Maximum results, 1 to 100. Defaults to 10.
+        radius (float): Only restaurants within this many metres. Optional.
+        cuisine (str): Only restaurants with this cuisine. Optional.
+
+    Returns:
+        flask.Response: JSON response with map rows plus `distance_m`, nearest first.
+    '''
+    try:
+        try:
+            params = nearby_params(*(request.args.get(k) for k in ('lat', 'lng', 'k', 'radius', 'cuisine')))
+        except ValueError as e:
+            log.warning('Invalid nearby request: %s', e)
+            abort(400, description = str(e))
+        return jsonify(nearby_payload(**params))
+    except Exception:
+        log.critical('Could not execute nearby_node query.', exc_info = True)
+        raise
+
+
+# Endpoint for monthly time series
+@app.route(trends_node)
+def api_trends():
+    '''Endpoint for monthly inspection and restaurant counts from the trends rollup.
+
+    Query Parameters:
+        borough (str): Only inspections in this borough. Optional.
+        cuisine (str): Only inspections of this cuisine. Optional.
+        by (str): `borough` or `cuisine` for one series per value. Defaults to one combined series.
+
+    Returns:
+        flask.Response: JSON response with the months and one or more aligned series.
+    '''
+    try:
+        try:
+            params = trends_params(*(request.args.get(k) for k in ('borough', 'cuisine', 'by')))
+        except ValueError as e:
+            log.warning('Invalid trends request: %s', e)
+            abort(400, description = str(e))
+        return json_response(cached_body(trends_node, trends_payload, request.host, **params))
+    except Exception:
+        log.critical('Could not execute trends_node query.', exc_info = True)
+        raise
+
+
+# Endpoint for per-capita cuisine rankings
+@app.route(cuisineScores_node)
+def api_cuisine_scores():
+    '''Endpoint for cuisine density scores per borough, ranked by one metric.
+
+    Query Parameters:
+        metric (str): `per_100k`, `location_quotient` or `citywide_percent`. Defaults to `per_100k`.
+        borough (str): Rank the cuisines of this borough. Optional.
+        cuisine (str): Rank the boroughs for this cuisine. Optional.
+        limit (int): Maximum rows, 1 to 100. Defaults to 10.
+
+    Returns:
+        flask.Response: JSON response with ranked borough/cuisine rows and all three scores.
+    '''
+    try:
+        try:
+            params = cuisineScores_params(*(request.args.get(k) for k in ('metric', 'borough', 'cuisine', 'limit')))
+        except ValueError as e:
+            log.warning('Invalid cuisine scores request: %s', e)
+            abort(400, description = str(e))
+        return json_response(cached_body(cuisineScores_node, cuisineScores_payload, request.host, **params))
+    except Exception:
+        log.critical('Could not execute cuisineScores_node query.', exc_info = True)
+        raise
+
+
+# Endpoint for bulk columnar download
+@app.route(snapshot_node)
+def api_snapshot():
+    '''Endpoint for the latest Parquet snapshot of the curated tables.
+
+    Returns:
+        flask.Response: Streamed zip of the borough-partitioned Parquet dataset.
+    '''
+    try:
+        archive = latest_snapshot(C.DB_CONFIG['SNAPSHOT_DIR'])
+        if archive is None:
+            log.warning('Snapshot requested before any export.')
+            abort(404, description = 'No snapshot has been exported yet.')
+        log.debug('Streaming snapshot %s.', archive.name)
+        response = send_file(
+            archive
+            ,mimetype = 'application/zip'
+            ,as_attachment = True
+            ,download_name = f'curryscorer_{archive.name}'
+            ,conditional = True
+        )
+        response.headers['X-Data-Version'] = str(int(archive.stem.lstrip('v')))
+        return response
+    except Exception:
+        log.critical('Could not serve snapshot_node download.', exc_info = True)
+        raise
+
+
+# Endpoint for response cache counters
+@app.route(cacheStats_node)
+def api_cache_stats():
+    '''Endpoint for this worker's response cache counters.
+
+    Returns:
+        flask.Response: JSON response containing hit/miss counters and memory use.
+    '''
+    try:
+        stats = {
+            **response_cache.stats()
+            ,'shared': shared_cache.stats() if shared_cache is not None else None
+            ,'data_version': data_version()
+        }
+        desc = 'Retrieves response cache statistics for the serving worker.'
+        return jsonify(forge_json(cacheStats_node, stats, desc))
+    except Exception:
+        log.critical('Could not read cache statistics.', exc_info = True)
+        raise
+
+
+# Endpoint for query plan diagnostics, only served in QUERY_AUDIT mode
+@app.route(queryPlans_node)
+def api_query_plans():
+    '''Endpoint for the SQL behind each data endpoint with its query plan and timings.
+
+    Query Parameters:
+        runs (int): Executions per endpoint for the timings, 1 to 20. Defaults to 3.
+
+    Returns:
+        flask.Response: JSON response with per-endpoint statements, plans and flags,
+            plus statement timings collected from live traffic.
+    '''
+    try:
+        if not C.DB_CONFIG['QUERY_AUDIT']:
+            abort(404)
+        runs = request.args.get('runs', '3')
+        if not runs.isdigit() or not 1 <= int(runs) <= 20:
+            log.warning('Invalid request parameter: %s', runs)
+            abort(400, description = 'runs must be an integer from 1 to 20.')
+        data = {
+            'endpoints': audit_endpoints(int(runs))
+            ,'live': query_timer.stats()
+        }
+        desc = 'Retrieves compiled SQL, EXPLAIN QUERY PLAN output and timings for the data endpoints.'
+        return jsonify(forge_json(queryPlans_node, data, desc, {'runs': int(runs)}))
+    except Exception:
+        log.critical('Could not audit query plans.', exc_info = True)
+        raise
+
 
 if __name__ == '__main__':
     print('This module is intended to be imported, not run directly.')
\ No newline at end of file
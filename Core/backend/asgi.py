@@ -0,0 +1,229 @@
+'''ASGI deployment of the data endpoints.
+
+Serves the same URLs and `forge_json` envelope as the Flask app, but as a native ASGI
+callable: the event loop multiplexes many open client connections per process while the
+blocking SQLAlchemy/read-model work runs on a bounded thread pool (`ASGI_THREADS`).
+
+Run with an ASGI server, e.g. `uvicorn asgi:app --workers 2`.
+'''
+# Import dependencies
+import asyncio
+from functools import partial
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+# Import subpackage dependencies
+from . import (
+    map_node
+    ,topCuisines_node
+    ,cuisineDist_node
+    ,boroughSummary_node
+    ,bundle_node
+    ,search_node
+    ,nearby_node
+    ,trends_node
+    ,cuisineScores_node
+    ,BUNDLE_PARTS
+    ,bundle_parts
+    ,map_payload
+    ,map_delta_payload
+    ,map_since
+    ,topCuisines_payload
+    ,cuisineDist_payload
+    ,boroughSummary_payload
+    ,bundle_payload
+    ,search_params
+    ,search_payload
+    ,nearby_params
+    ,nearby_payload
+    ,trends_params
+    ,trends_payload
+    ,cuisineScores_params
+    ,cuisineScores_payload
+    ,cached_body
+    ,render
+)
+from .cache import data_version
+
+# Import config file
+import config as C
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+# Bounded pool for blocking database work, created on first use
+_pool: dict[str, ThreadPoolExecutor | None] = {'executor': None}
+
+
+def executor() -> ThreadPoolExecutor:
+    if _pool['executor'] is None:
+        _pool['executor'] = ThreadPoolExecutor(max_workers = C.DB_CONFIG['ASGI_THREADS'], thread_name_prefix = 'asgi-db')
+    return _pool['executor']
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, description: str):
+        super().__init__(description)
+        self.status = status
+        self.description = description
+
+
+def map_handler(query: dict[str, list[str]], host: str) -> bytes:
+    try:
+        since = map_since(query.get('since', [None])[0])
+    except ValueError as e:
+        log.warning('Invalid request parameter: %s', e)
+        raise HttpError(400, str(e))
+    if since is None:
+        return cached_body(map_node, map_payload, host)
+    return cached_body(map_node, map_delta_payload, host, since = since)
+
+
+def top_cuisines_handler(query: dict[str, list[str]], host: str) -> bytes:
+    boro_param = query.get('borough', [None])[0]
+    if boro_param not in C.REF_SEQS['BOROUGHS']:
+        log.warning('Invalid request parameter: %s', boro_param)
+        raise HttpError(400, 'Invalid borough name.')
+    return cached_body(topCuisines_node, topCuisines_payload, host, borough = boro_param)
+
+
+def bundle_handler(query: dict[str, list[str]], host: str) -> bytes:
+    include = bundle_parts(query.get('include', [None])[0])
+    if include is None:
+        log.warning('Invalid bundle include: %s', query.get('include'))
+        raise HttpError(400, f'include must be drawn from {", ".join(BUNDLE_PARTS)}.')
+    boro_param = query.get('borough', [None])[0] or None
+    if boro_param is not None and boro_param not in C.REF_SEQS['BOROUGHS']:
+        log.warning('Invalid request parameter: %s', boro_param)
+        raise HttpError(400, 'Invalid borough name.')
+    return cached_body(bundle_node, bundle_payload, host, include = include, borough = boro_param)
+
+
+def search_handler(query: dict[str, list[str]], host: str) -> bytes:
+    try:
+        params = search_params(*(query.get(k, [None])[0] for k in ('q', 'borough', 'cuisine', 'limit', 'offset')))
+    except ValueError as e:
+        log.warning('Invalid search request: %s', e)
+        raise HttpError(400, str(e))
+    try:
+        return render(search_payload(**params, host = host))    # Uncached, every keystroke is a new key
+    except LookupError as e:
+        log.warning('%s', e)
+        raise HttpError(503, str(e))
+
+
+def nearby_handler(query: dict[str, list[str]], host: str) -> bytes:
+    try:
+        params = nearby_params(*(query.get(k, [None])[0] for k in ('lat', 'lng', 'k', 'radius', 'cuisine')))
+    except ValueError as e:
+        log.warning('Invalid nearby request: %s', e)
+        raise HttpError(400, str(e))
+    return render(nearby_payload(**params, host = host))    # Uncached, coordinates rarely repeat
+
+
+def trends_handler(query: dict[str, list[str]], host: str) -> bytes:
+    try:
+        params = trends_params(*(query.get(k, [None])[0] for k in ('borough', 'cuisine', 'by')))
+    except ValueError as e:
+        log.warning('Invalid trends request: %s', e)
+        raise HttpError(400, str(e))
+    return cached_body(trends_node, trends_payload, host, **params)
+
+
+def cuisine_scores_handler(query: dict[str, list[str]], host: str) -> bytes:
+    try:
+        params = cuisineScores_params(*(query.get(k, [None])[0] for k in ('metric', 'borough', 'cuisine', 'limit')))
+    except ValueError as e:
+        log.warning('Invalid cuisine scores request: %s', e)
+        raise HttpError(400, str(e))
+    return cached_body(cuisineScores_node, cuisineScores_payload, host, **params)
+
+
+# Same URLs as the Flask app (trailing slash optional there as well), sharing its response cache
+ROUTES = {
+    map_node: map_handler
+    ,topCuisines_node: top_cuisines_handler
+    ,cuisineDist_node: lambda query, host: cached_body(cuisineDist_node, cuisineDist_payload, host)
+    ,boroughSummary_node: lambda query, host: cached_body(boroughSummary_node, boroughSummary_payload, host)
+    ,bundle_node: bundle_handler
+    ,search_node: search_handler
+    ,nearby_node: nearby_handler
+    ,trends_node: trends_handler
+    ,cuisineScores_node: cuisine_scores_handler
+}
+
+
+def request_host(scope: dict) -> str:
+    '''Host as the client sees it, honouring one proxy hop like `ProxyFix(x_host = 1)`.'''
+    headers = dict(scope.get('headers') or [])
+    forwarded = headers.get(b'x-forwarded-host')
+    if forwarded:
+        return forwarded.decode('latin-1').split(',')[-1].strip()
+    host = headers.get(b'host')
+    if host:
+        return host.decode('latin-1')
+    server = scope.get('server') or ('localhost', None)
+    return server[0] if server[1] in (None, 80, 443) else f'{server[0]}:{server[1]}'
+
+
+async def send_json(send, status: int, body: bytes, headers: list[tuple[bytes, bytes]] = ()) -> None:
+    await send({
+        'type': 'http.response.start'
+        ,'status': status
+        ,'headers': [
+            (b'content-type', b'application/json')
+            ,(b'content-length', str(len(body)).encode())
+            ,(b'access-control-allow-origin', b'*')
+            ,*headers
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            executor()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _pool['executor'] is not None:
+                _pool['executor'].shutdown(wait = True)
+                _pool['executor'] = None
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    '''ASGI entry point for the data endpoints.'''
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return None
+
+    path = scope['path'] if scope['path'].endswith('/') else f"{scope['path']}/"
+    handler = ROUTES.get(path)
+    if handler is None:
+        return await send_json(send, 404, render({'error': 'Not found.'}))
+    if scope['method'] not in ('GET', 'HEAD'):
+        return await send_json(send, 405, render({'error': 'Method not allowed.'}))
+
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    loop = asyncio.get_running_loop()
+    try:
+        body = await loop.run_in_executor(executor(), partial(handler, query, request_host(scope)))
+    except HttpError as e:
+        return await send_json(send, e.status, render({'error': e.description}))
+    except Exception:
+        log.critical('Could not execute query for %s.', path, exc_info = True)
+        return await send_json(send, 500, render({'error': 'Internal server error.'}))
+    extra = [(b'x-data-version', str(data_version()).encode())] if path == map_node else []
+    await send_json(send, 200, body, extra)
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
@@ -0,0 +1,226 @@
+'''Query plan audit for the SQL behind the data endpoints.
+
+Runs each endpoint's reads against the live SQLite file, captures the SQL and parameters
+SQLAlchemy actually sends to the driver, and asks SQLite for its `EXPLAIN QUERY PLAN`.
+Steps that read a whole table or index (`SCAN`) or sort through a temporary b-tree
+(`USE TEMP B-TREE`, from GROUP BY / ORDER BY without a usable index) are flagged.
+
+Execution time is measured with `before_cursor_execute` / `after_cursor_execute` engine
+events, so it covers the driver call only; with SQLite that is the time to the first row,
+which for grouped or sorted queries already includes the whole aggregation.
+With `QUERY_AUDIT=1` the same timer is attached to the app's engine and keeps per-statement
+counters for live traffic as well.
+'''
+# Import dependencies
+import time
+import threading
+from contextlib import contextmanager
+from collections.abc import Generator
+from sqlalchemy import event, Engine
+
+# Import subpackage dependencies
+from Core.database import engine as default_engine, get_session
+from .queries import SqlSource
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+# Plan steps worth a second look
+FLAGS = ('SCAN', 'USE TEMP B-TREE')
+
+# Borough used for the single-borough top cuisines query
+AUDIT_BOROUGH = 'Manhattan'
+
+# Endpoint reads to audit, each called with an open session
+_source = SqlSource()
+ENDPOINT_READS = {
+    'map': lambda s: _source.map_rows(s)
+    ,'top-cuisines': lambda s: _source.top_cuisines(AUDIT_BOROUGH, s)
+    ,'top-cuisines-all': lambda s: _source.top_cuisines_all(s)
+    ,'cuisine-distributions': lambda s: _source.cuisine_distribution(s)
+    ,'borough-summaries': lambda s: _source.borough_summary(s)
+    ,'trends': lambda s: _source.trends(AUDIT_BOROUGH, by = 'cuisine', session = s)
+    ,'cuisine-scores': lambda s: _source.cuisine_scores('location_quotient', AUDIT_BOROUGH, session = s)
+}
+
+
+class QueryTimer():
+    def __init__(self):
+        '''
+        Times every statement an engine sends to the driver, keyed by SQL text.
+
+        Attributes:
+            queries (dict[str, dict]): Per-statement count, total and max seconds.
+        '''
+        self.queries: dict[str, dict] = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.info_key = f'query_timer_{id(self)}'
+
+    def before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault(self.info_key, []).append(time.perf_counter())
+
+    def after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        starts = conn.info.get(self.info_key)
+        if not starts:
+            return None     # Attached while this statement was already running
+        elapsed = time.perf_counter() - starts.pop()
+        with self.lock:
+            entry = self.queries.setdefault(statement, {'count': 0, 'total': 0.0, 'max': 0.0})
+            entry['count'] += 1
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+        captured = getattr(self.local, 'captured', None)
+        if captured is not None:
+            captured.append((statement, tuple(parameters) if not executemany else (), elapsed))
+
+    def attach(self, engine: Engine) -> None:
+        if not event.contains(engine, 'before_cursor_execute', self.before):
+            event.listen(engine, 'before_cursor_execute', self.before)
+            event.listen(engine, 'after_cursor_execute', self.after)
+
+    def detach(self, engine: Engine) -> None:
+        if event.contains(engine, 'before_cursor_execute', self.before):
+            event.remove(engine, 'before_cursor_execute', self.before)
+            event.remove(engine, 'after_cursor_execute', self.after)
+
+    @contextmanager
+    def capturing(self) -> Generator[list[tuple[str, tuple, float]]]:
+        '''Collects (statement, parameters, seconds) for statements run by this thread inside the block.'''
+        self.local.captured = []
+        try:
+            yield self.local.captured
+        finally:
+            self.local.captured = None
+
+    def reset(self) -> None:
+        with self.lock:
+            self.queries.clear()
+
+    def stats(self) -> list[dict]:
+        with self.lock:
+            rows = [
+                {
+                    'sql': sql
+                    ,'count': q['count']
+                    ,'total_ms': q['total'] * 1000
+                    ,'mean_ms': q['total'] / q['count'] * 1000
+                    ,'max_ms': q['max'] * 1000
+                }
+            for sql, q in self.queries.items()]
+        return sorted(rows, key = lambda r: r['total_ms'], reverse = True)
+
+
+# Live statement timings, attached to the app engine when QUERY_AUDIT is on
+query_timer = QueryTimer()
+
+
+def explain(
+        conn
+        ,statement: str
+        ,parameters: tuple = ()
+        ) -> list[dict]:
+    '''Runs `EXPLAIN QUERY PLAN` for one driver-level statement.
+
+    Args:
+        conn (Connection): Open SQLAlchemy connection to the SQLite file.
+        statement (str): SQL exactly as sent to the driver.
+        parameters (tuple, optional): Positional bind values. Defaults to ().
+
+    Returns:
+        list[dict]: Plan steps with their parent id, detail text and flag (None when unremarkable).
+    '''
+    rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return [
+        {
+            'id': r[0]
+            ,'parent': r[1]
+            ,'detail': r[3]
+            ,'flag': next((f for f in FLAGS if r[3].startswith(f) or f' {f}' in r[3]), None)
+        }
+    for r in rows]
+
+
+def audit_endpoints(
+        runs: int = 3
+        ,engine: Engine = default_engine
+        ) -> list[dict]:
+    '''Captures, explains and times the SQL behind every data endpoint.
+
+    Args:
+        runs (int, optional): Executions per endpoint, timings are averaged. Defaults to 3.
+        engine (Engine, optional): Engine to audit. Defaults to the app engine.
+
+    Returns:
+        list[dict]: One entry per endpoint with its wall time and, per statement, the SQL,
+            parameters, mean and max execution time, plan steps and flags.
+    '''
+    timer = QueryTimer()
+    timer.attach(engine)
+    try:
+        report = []
+        for name, read in ENDPOINT_READS.items():
+            runs_seen, walls = [], []
+            for _ in range(max(1, runs)):
+                start = time.perf_counter()
+                with timer.capturing() as captured, get_session() as session:
+                    read(session)
+                walls.append(time.perf_counter() - start)
+                runs_seen.append(captured)
+            statements = []
+            with engine.connect() as conn:
+                for i, (sql, params, _) in enumerate(runs_seen[0]):
+                    times = [run[i][2] for run in runs_seen if len(run) > i]
+                    plan = explain(conn, sql, params)
+                    statements.append({
+                        'sql': sql
+                        ,'parameters': list(params)
+                        ,'mean_ms': sum(times) / len(times) * 1000
+                        ,'max_ms': max(times) * 1000
+                        ,'plan': plan
+                        ,'flags': sorted({step['flag'] for step in plan if step['flag']})
+                    })
+            report.append({
+                'endpoint': name
+                ,'wall_ms': sum(walls) / len(walls) * 1000
+                ,'statements': statements
+            })
+            log.debug('Audited %s: %s statement(s).', name, len(statements))
+        return report
+    except Exception:
+        log.critical('Could not audit endpoint query plans.', exc_info = True)
+        raise
+    finally:
+        timer.detach(engine)
+
+
+def plan_lines(plan: list[dict]) -> list[str]:
+    '''Indents plan steps under their parents the way the sqlite3 shell prints them.'''
+    depth = {0: -1}
+    lines = []
+    for step in plan:
+        depth[step['id']] = depth.get(step['parent'], -1) + 1
+        mark = f'   <-- {step["flag"]}' if step['flag'] else ''
+        lines.append(f'{"  " * depth[step["id"]]}{step["detail"]}{mark}')
+    return lines
+
+
+def format_report(report: list[dict]) -> str:
+    '''Plain-text rendering of `audit_endpoints()` for benchmarks and the console.'''
+    out = []
+    for entry in report:
+        out.append(f'{entry["endpoint"]}  ({entry["wall_ms"]:.1f} ms per call)')
+        for s in entry['statements']:
+            flags = ', '.join(s['flags']) or 'ok'
+            out.append(f'  {s["mean_ms"]:>9.2f} ms  max {s["max_ms"]:>8.2f} ms  [{flags}]')
+            out.append(f'    {" ".join(s["sql"].split())}')
+            out.extend(f'      {line}' for line in plan_lines(s['plan']))
+    return '\n'.join(out)
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
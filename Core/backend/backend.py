@@ -1,4 +1,5 @@
 # Import dependencies
+from pathlib import Path
 from flask import request
 
 # Bring in custom logger
@@ -11,6 +12,7 @@ def forge_metadata(
         ,length: int
         ,desc: str
         ,params: dict
+        ,host: str | None = None
         ) -> dict:
     '''Helps create JSON via function passing.
 
@@ -19,14 +21,15 @@ def forge_metadata(
         length (int): Length of returned JSON.
         desc (str): API description.
         params (dict): Parameters passed in API call.
+        host (str | None, optional): Requesting host, read from the Flask request when None. Defaults to None.
 
     Returns:
         dict: Inner metadata nest.
     '''
-    log.debug('Inner wrapper for forge_json called.')
+    log.debug('Inner wrapper for forge_json called for %s.', route)    # Lazy args, skipped below DEBUG
     return {
         'current_route': route
-        ,'home_route': request.host
+        ,'home_route': request.host if host is None else host
         ,'data_points': length
         ,'info': desc or None
         ,'params': params or {}
@@ -39,6 +42,7 @@ def forge_json(
         ,nest: dict
         ,desc: str
         ,params: dict | None = None
+        ,host: str | None = None
         ) -> dict:
     '''Completes full JSON-esque packaging.
 
@@ -47,18 +51,38 @@ def forge_json(
         nest (dict): Returned JSON.
         desc (str): API description.
         params (dict | None, optional): Parameters passed in API call. Defaults to None.
+        host (str | None, optional): Requesting host, read from the Flask request when None. Defaults to None.
 
     Returns:
         dict: Full python style JSON ready for Flask export.
     '''
-    log.debug('Creating custom JSON Metadata.')
+    log.debug('Creating custom JSON Metadata for %s.', route)
     json_api = {
-        'metadata': forge_metadata(route, len(nest), desc, params)
+        'metadata': forge_metadata(route, len(nest), desc, params, host)
         ,'results': nest
     }
     return json_api
 
 
+# Locates the newest exported snapshot archive
+def latest_snapshot(snapshot_dir: Path) -> Path | None:
+    '''Finds the current snapshot zip written by the pipeline.
+
+    Args:
+        snapshot_dir (Path): Root directory for snapshots.
+
+    Returns:
+        Path | None: Archive named by `LATEST`, else the newest one, or None when nothing has been exported.
+    '''
+    pointer = snapshot_dir / 'LATEST'
+    try:
+        return snapshot_dir / f'{pointer.read_text().strip()}.zip'
+    except FileNotFoundError:
+        pass    # Exported before the pointer existed
+    archives = sorted(snapshot_dir.glob('v*.zip')) if snapshot_dir.exists() else []
+    return archives[-1] if archives else None
+
+
 # EOF
 
 if __name__ == '__main__':
@@ -0,0 +1,289 @@
+'''Response caches for the data endpoints.
+
+Payloads are stored pre-serialized, keyed by (route, normalized params, data version),
+so a repeat request skips the session, the SQL, the dict building and the JSON encoding.
+Bodies are host-free: `home_route` holds `HOST_SLOT` and `with_host()` fills in the
+requesting host on the way out, so one entry serves every host name.
+A new pipeline load bumps the data version, which retires every older key at once.
+
+Two tiers: a per-process `ResponseCache` in memory, backed by a `SharedCache` SQLite file
+on local disk that every worker on the host reads and writes, so whichever worker builds
+a response first hands it to the others.
+'''
+# Import dependencies
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+# Import subpackage dependencies
+from Core.database import current_version
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+# Seconds a looked-up data version is trusted before asking SQLite again
+VERSION_TTL = 5.0
+
+# Stand-in for the requesting host in cached bodies, see `with_host()`
+HOST_SLOT = '{home_route}'
+_HOST_FIELD = f'"home_route":{json.dumps(HOST_SLOT)}'.encode('utf-8')
+
+
+class ResponseCache():
+    def __init__(
+            self
+            ,max_bytes: int
+            ,ttl: float = 3600
+            ):
+        '''
+        Thread-safe LRU of serialized responses bounded by total body size.
+
+        Attributes:
+            max_bytes (int): Byte budget across all bodies, 0 disables caching.
+            ttl (float): Seconds an entry stays valid, 0 for no expiry.
+            size (int): Bytes currently held.
+            hits (int): Lookups answered from the cache.
+            misses (int): Lookups that had to build the response.
+            evictions (int): Entries dropped to stay under budget.
+        '''
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: OrderedDict[Hashable, tuple[bytes, float]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> bytes | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl and entry[1] < time.monotonic():
+                self.drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return None     # Larger than the whole budget, serve uncached
+        with self.lock:
+            if key in self.entries:
+                self.drop(key)
+            self.entries[key] = (body, time.monotonic() + self.ttl)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self.drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def drop(self, key: Hashable) -> None:
+        body, _ = self.entries.pop(key)
+        self.size -= len(body)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries)
+                ,'bytes': self.size
+                ,'max_bytes': self.max_bytes
+                ,'ttl': self.ttl
+                ,'hits': self.hits
+                ,'misses': self.misses
+                ,'evictions': self.evictions
+                ,'hit_rate': (self.hits / lookups) if lookups else None
+            }
+
+
+class SharedCache():
+    def __init__(
+            self
+            ,path: Path
+            ,ttl: float = 3600
+            ,journal_mode: str = 'WAL'
+            ):
+        '''
+        Cross-process key-value store of serialized responses in a small SQLite file.
+
+        WAL mode lets readers in every worker proceed while one writer commits, and each
+        upsert is atomic, so a reader sees either the old body or the new one. WAL relies on
+        shared memory between processes, so a file on a network share uses `DELETE` instead.
+        Rows carry their data version; lookups only match the current one and older
+        versions are deleted the first time a newer version is written.
+
+        Attributes:
+            path (Path): SQLite file, created on first use.
+            ttl (float): Seconds an entry stays valid, 0 for no expiry.
+            journal_mode (str): SQLite journal mode, `WAL` on local disk, `DELETE` on a network share.
+            hits (int): Lookups answered by this process from the shared file.
+            misses (int): Lookups this process could not answer from it.
+        '''
+        self.path = path
+        self.ttl = ttl
+        self.journal_mode = journal_mode
+        self.hits = 0
+        self.misses = 0
+        self.local = threading.local()
+        self.pruned_below = 0
+
+    def connect(self) -> sqlite3.Connection:
+        # One connection per thread, reopened after a fork
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            self.path.parent.mkdir(parents = True, exist_ok = True)
+            conn = sqlite3.connect(self.path, timeout = 5, isolation_level = None)
+            conn.execute(f'PRAGMA journal_mode={self.journal_mode};')
+            conn.execute('PRAGMA synchronous=NORMAL;')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, version INTEGER NOT NULL, body BLOB NOT NULL, expires REAL NOT NULL)'
+            )
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def encode(self, key: tuple) -> str:
+        route, args, _ = key
+        return json.dumps([route, args])
+
+    def get(self, key: tuple) -> bytes | None:
+        try:
+            row = self.connect().execute(
+                'SELECT body FROM responses WHERE key = ? AND version = ? AND (expires = 0 OR expires > ?)'
+                ,(self.encode(key), key[2], time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            log.warning('Shared cache read failed, building response locally.', exc_info = True)
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: tuple, body: bytes) -> None:
+        version = key[2]
+        expires = time.time() + self.ttl if self.ttl else 0
+        try:
+            conn = self.connect()
+            conn.execute(
+                'INSERT INTO responses (key, version, body, expires) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET version = excluded.version, body = excluded.body, expires = excluded.expires '
+                'WHERE excluded.version >= responses.version'   # A worker still on the old version never clobbers a newer body
+                ,(self.encode(key), version, body, expires)
+            )
+            if version > self.pruned_below:
+                conn.execute('DELETE FROM responses WHERE version < ? OR (expires != 0 AND expires < ?)', (version, time.time()))
+                self.pruned_below = version
+        except sqlite3.Error:
+            log.warning('Shared cache write failed, response cached locally only.', exc_info = True)
+
+    def stats(self) -> dict:
+        try:
+            entries, size = self.connect().execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses').fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        return {
+            'path': str(self.path)
+            ,'entries': entries
+            ,'bytes': size
+            ,'hits': self.hits
+            ,'misses': self.misses
+        }
+
+
+# Last known data version, shared by every request thread
+_version: dict[str, int | float] = {'value': 0, 'expires': 0.0}
+
+
+def data_version(refresh: bool = False) -> int:
+    '''Current pipeline data version, re-read from SQLite at most every `VERSION_TTL` seconds.
+
+    Args:
+        refresh (bool, optional): Bypass the short-lived copy. Defaults to False.
+
+    Returns:
+        int: Data version used in cache keys.
+    '''
+    now = time.monotonic()
+    if refresh or now >= _version['expires']:
+        _version['value'] = current_version()
+        _version['expires'] = now + VERSION_TTL
+    return _version['value']
+
+
+def cache_key(
+        route: str
+        ,params: dict
+        ,version: int
+        ) -> tuple:
+    '''Builds a cache key, treating params as order-insensitive and dropping empty values.'''
+    args = tuple(sorted((k, str(v)) for k, v in params.items() if v is not None))
+    return (route, args, version)
+
+
+def with_host(body: bytes, host: str) -> bytes:
+    '''Fills the requesting host into a cached body rendered with `HOST_SLOT`.
+
+    The metadata comes before the results, so the first match is always `home_route`.
+
+    Args:
+        body (bytes): Cached JSON body.
+        host (str): Requesting host.
+
+    Returns:
+        bytes: Body as if it had been rendered for `host`.
+    '''
+    return body.replace(_HOST_FIELD, f'"home_route":{json.dumps(host)}'.encode('utf-8'), 1)
+
+
+def cached(
+        cache: ResponseCache
+        ,key: tuple
+        ,build: Callable[[], bytes]
+        ,shared: SharedCache | None = None
+        ) -> bytes:
+    '''Returns the cached body for `key`, building and storing it on a miss.
+
+    Args:
+        cache (ResponseCache): In-process cache, consulted first.
+        key (tuple): Key from `cache_key()`.
+        build (Callable[[], bytes]): Produces the serialized body on a miss.
+        shared (SharedCache | None, optional): Cross-worker tier behind `cache`. Defaults to None.
+
+    Returns:
+        bytes: Serialized response body.
+    '''
+    body = cache.get(key) if cache.max_bytes else None
+    if body is not None:
+        return body
+    body = shared.get(key) if shared is not None else None
+    if body is None:
+        body = build()
+        if shared is not None:
+            shared.put(key, body)
+    if cache.max_bytes:
+        cache.put(key, body)
+    return body
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
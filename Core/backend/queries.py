@@ -0,0 +1,459 @@
+# Import dependencies
+import re
+import datetime as dt
+from contextlib import nullcontext
+from sqlalchemy import func, select, text, Select, TextClause
+from sqlalchemy.orm import joinedload, Session as SessionType
+
+# Import subpackage dependencies
+from Core.database import Restaurants, Boroughs, Cuisines, ChangeLog, InspectionTrends, CuisineScores, SEARCH_TABLE, get_session
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+#################################################
+# Statement Builders
+#################################################
+def map_stmt() -> Select:
+    return select(Restaurants).options(joinedload(Restaurants.borough), joinedload(Restaurants.cuisine))
+
+
+def complete_versions_stmt(since: int) -> Select:
+    # Versions after `since` whose change set is complete, a fresh build or a compacted version breaks the chain
+    return select(func.count()).where(
+        ChangeLog.restaurant_id == ChangeLog.MARKER
+        ,ChangeLog.op == 'V'
+        ,ChangeLog.version > since
+    )
+
+
+def changed_ids_stmt(since: int) -> Select:
+    return select(ChangeLog.restaurant_id).distinct().where(
+        ChangeLog.version > since
+        ,ChangeLog.restaurant_id != ChangeLog.MARKER
+    )
+
+
+def top_cuisines_stmt(borough: str) -> Select:
+    counts = func.count(Restaurants.id)
+    return (
+        select(
+            Cuisines.cuisine
+            ,counts.label('count')
+        ).join(
+            Restaurants
+        ).join(
+            Boroughs
+        ).where(
+            Boroughs.borough == borough
+        ).group_by(
+            Cuisines.cuisine
+        ).order_by(
+            counts.desc()
+            ,Cuisines.cuisine   # Ties by name, as the read model orders them
+        )
+    )
+
+
+def top_cuisines_all_stmt() -> Select:
+    counts = func.count(Restaurants.id)
+    return (
+        select(
+            Boroughs.borough
+            ,Cuisines.cuisine
+            ,counts.label('count')
+        ).select_from(
+            Restaurants
+        ).join(
+            Boroughs
+        ).join(
+            Cuisines
+        ).group_by(
+            Boroughs.borough
+            ,Cuisines.cuisine
+        ).order_by(
+            Boroughs.borough
+            ,counts.desc()
+            ,Cuisines.cuisine
+        )
+    )
+
+
+def cuisine_total_stmt() -> Select:
+    return select(func.count(Restaurants.id))
+
+
+def cuisine_counts_stmt() -> Select:
+    return (
+        select(
+            Cuisines.cuisine
+            ,func.count(Restaurants.id).label('count')
+        ).join(
+            Restaurants
+        ).group_by(
+            Cuisines.cuisine
+        ).order_by(
+            Cuisines.cuisine
+        )
+    )
+
+
+def borough_summary_stmt() -> Select:
+    return (
+        select(
+            Boroughs.borough
+            ,func.count(Restaurants.id).label('restaurant_count')
+            ,Boroughs.population
+        ).join(
+            Restaurants
+        ).group_by(
+            Boroughs.borough
+        ).order_by(
+            Boroughs.borough
+        )
+    )
+
+
+def trends_stmt(
+        borough: str | None = None
+        ,cuisine: str | None = None
+        ,by: str | None = None
+        ) -> Select:
+    # Monthly sums from the rollup, one series per borough or cuisine when split `by` one
+    split = {'borough': Boroughs.borough, 'cuisine': Cuisines.cuisine}.get(by)
+    keys = [InspectionTrends.month] if split is None else [InspectionTrends.month, split]
+    stmt = (
+        select(
+            *keys
+            ,func.sum(InspectionTrends.inspections).label('inspections')
+            ,func.sum(InspectionTrends.restaurants).label('restaurants')
+        ).join(
+            Boroughs, Boroughs.borough_id == InspectionTrends.borough_id
+        ).join(
+            Cuisines, Cuisines.cuisine_id == InspectionTrends.cuisine_id
+        ).group_by(
+            *keys
+        ).order_by(
+            *keys
+        )
+    )
+    if borough is not None:
+        stmt = stmt.where(Boroughs.borough == borough)
+    if cuisine is not None:
+        stmt = stmt.where(Cuisines.cuisine == cuisine)
+    return stmt
+
+
+def cuisine_scores_stmt(
+        metric: str
+        ,borough: str | None = None
+        ,cuisine: str | None = None
+        ,limit: int = 10
+        ) -> Select:
+    # Highest scores first; with a borough this walks one (borough_id, metric) index backwards
+    stmt = (
+        select(
+            Boroughs.borough
+            ,Cuisines.cuisine
+            ,CuisineScores.restaurants
+            ,CuisineScores.per_100k
+            ,CuisineScores.location_quotient
+            ,CuisineScores.citywide_percent
+        ).join(
+            Boroughs, Boroughs.borough_id == CuisineScores.borough_id
+        ).join(
+            Cuisines, Cuisines.cuisine_id == CuisineScores.cuisine_id
+        ).order_by(
+            getattr(CuisineScores, metric).desc()
+        ).limit(
+            limit
+        )
+    )
+    # Names resolve to ids first, so the filter is an equality on the indexed key column
+    if borough is not None:
+        stmt = stmt.where(CuisineScores.borough_id == select(Boroughs.borough_id).where(Boroughs.borough == borough).scalar_subquery())
+    if cuisine is not None:
+        stmt = stmt.where(CuisineScores.cuisine_id == select(Cuisines.cuisine_id).where(Cuisines.cuisine == cuisine).scalar_subquery())
+    return stmt
+
+
+# Matching restaurant ids with their bm25 rank, shared by the search statements
+SEARCH_HITS = f'''
+    WITH hits AS (
+        SELECT rowid AS id, rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match
+    )
+    SELECT {{columns}}
+    FROM hits
+    JOIN restaurants AS r ON r.id = hits.id
+    JOIN boroughs AS b ON b.borough_id = r.borough_id
+    JOIN cuisines AS c ON c.cuisine_id = r.cuisine_id
+'''
+
+
+def search_stmt() -> TextClause:
+    columns = 'r.id, r.name, b.borough, c.cuisine, r.lat, r.lng, date(r.inspection_date) AS inspection_date, hits.rank'
+    return text(
+        SEARCH_HITS.format(columns = columns)
+        + 'WHERE (:borough IS NULL OR b.borough = :borough) AND (:cuisine IS NULL OR c.cuisine = :cuisine) '
+        + 'ORDER BY hits.rank, r.id LIMIT :limit OFFSET :offset'
+    )
+
+
+def search_facet_stmt(facet: str) -> TextClause:
+    # Each facet is counted under the other facet's filter only, so it keeps listing its alternatives
+    column, other = ('b.borough', 'c.cuisine') if facet == 'borough' else ('c.cuisine', 'b.borough')
+    return text(
+        SEARCH_HITS.format(columns = f'{column} AS value, COUNT(*) AS count')
+        + f'WHERE (:other IS NULL OR {other} = :other) GROUP BY {column} ORDER BY count DESC, value'
+    )
+
+
+def match_expression(query: str, prefix: bool = True) -> str | None:
+    '''Turns free text into an FTS5 query that matches every word, the last one as a prefix.
+
+    Words are quoted so FTS5 operators and punctuation in user input are taken literally.
+
+    Args:
+        query (str): Raw search text.
+        prefix (bool, optional): Treat the last word as a prefix for type-ahead. Defaults to True.
+
+    Returns:
+        str | None: FTS5 MATCH expression, None when the text has no searchable words.
+    '''
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    if prefix:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+#################################################
+# SQL Data Source
+#################################################
+class SqlSource():
+    '''
+    Answers the API endpoints straight from SQLite through SQLAlchemy.
+
+    Every method takes an optional open session so several results can share one.
+    The memory-mapped `ReadModel` exposes the same methods and result shapes.
+    '''
+    name = 'sql'
+
+    def scope(self, session: SessionType | None):
+        return nullcontext(session) if session is not None else get_session()
+
+    # Bound parameters per IN (...) batch, well under SQLite's variable limit
+    id_batch = 500
+
+    def map_row(self, r: Restaurants) -> dict:
+        return {
+            'id': r.id,
+            'name': r.name,
+            'lat': r.lat,
+            'lng': r.lng,
+            'borough': r.borough.borough,
+            'cuisine': r.cuisine.cuisine,
+            'inspection_date': dt.date.isoformat(r.inspection_date)
+        }
+
+    def map_rows(self, session: SessionType | None = None) -> list[dict]:
+        log.debug('Executing map_node query.')
+        with self.scope(session) as s:
+            results = s.scalars(map_stmt()).all()
+            return [self.map_row(r) for r in results]
+
+    def map_changes(self, since: int, version: int, session: SessionType | None = None) -> dict | None:
+        '''Map rows that changed after data version `since`.
+
+        Args:
+            since (int): Version the client already holds.
+            version (int): Current data version.
+            session (SessionType | None, optional): Open session to reuse. Defaults to None.
+
+        Returns:
+            dict | None: `upserts` (current rows of inserted or updated restaurants) and `deleted`
+                ids, or None when the change log cannot bridge `since` to `version`.
+        '''
+        with self.scope(session) as s:
+            if s.scalar(complete_versions_stmt(since)) != version - since:
+                return None
+            ids = s.scalars(changed_ids_stmt(since)).all()
+            upserts = []
+            for start in range(0, len(ids), self.id_batch):
+                batch = ids[start:start + self.id_batch]
+                upserts.extend(self.map_row(r) for r in s.scalars(map_stmt().where(Restaurants.id.in_(batch))).unique())
+            present = {r['id'] for r in upserts}
+            return {
+                'upserts': sorted(upserts, key = lambda r: r['id'])
+                ,'deleted': sorted(i for i in ids if i not in present)
+            }
+
+    def top_cuisines(self, borough: str, session: SessionType | None = None) -> list[dict]:
+        with self.scope(session) as s:
+            results = s.execute(top_cuisines_stmt(borough))
+            return [
+                {
+                    'cuisine': r.cuisine,
+                    'count': r.count
+                }
+            for r in results]
+
+    def top_cuisines_all(self, session: SessionType | None = None) -> dict[str, list[dict]]:
+        '''Top cuisines for every borough from one grouped query instead of one per borough.'''
+        with self.scope(session) as s:
+            grouped = {}
+            for r in s.execute(top_cuisines_all_stmt()):
+                grouped.setdefault(r.borough, []).append({'cuisine': r.cuisine, 'count': r.count})
+            return grouped
+
+    def cuisine_distribution(self, session: SessionType | None = None) -> list[dict]:
+        with self.scope(session) as s:
+            total = s.scalar(cuisine_total_stmt())
+            results = s.execute(cuisine_counts_stmt())
+            return [
+                {
+                    'cuisine': r.cuisine
+                    ,'count': r.count
+                    ,'percent': (r.count / total * 100)
+                }
+            for r in results]
+
+    def search(
+            self
+            ,match: str
+            ,borough: str | None = None
+            ,cuisine: str | None = None
+            ,limit: int = 20
+            ,offset: int = 0
+            ,session: SessionType | None = None
+            ) -> dict:
+        '''Ranked, paginated restaurant name search with borough and cuisine facets.
+
+        Args:
+            match (str): FTS5 expression from `match_expression()`.
+            borough (str | None, optional): Only restaurants in this borough. Defaults to None.
+            cuisine (str | None, optional): Only restaurants with this cuisine. Defaults to None.
+            limit (int, optional): Page size. Defaults to 20.
+            offset (int, optional): Rows skipped before the page. Defaults to 0.
+            session (SessionType | None, optional): Open session to reuse. Defaults to None.
+
+        Returns:
+            dict: `total` matches under both filters, the `restaurants` page best match first,
+                and `facets` counts per borough and per cuisine.
+        '''
+        with self.scope(session) as s:
+            page = s.execute(search_stmt(), {'match': match, 'borough': borough, 'cuisine': cuisine, 'limit': limit, 'offset': offset})
+            restaurants = [
+                {
+                    'id': r.id
+                    ,'name': r.name
+                    ,'lat': r.lat
+                    ,'lng': r.lng
+                    ,'borough': r.borough
+                    ,'cuisine': r.cuisine
+                    ,'inspection_date': r.inspection_date
+                    ,'rank': r.rank
+                }
+            for r in page]
+            facets = {
+                facet: {r.value: r.count for r in s.execute(search_facet_stmt(facet), {'match': match, 'other': other})}
+            for facet, other in (('borough', cuisine), ('cuisine', borough))}
+        total = sum(n for b, n in facets['borough'].items() if borough is None or b == borough)
+        return {'total': total, 'restaurants': restaurants, 'facets': facets}
+
+    def trends(
+            self
+            ,borough: str | None = None
+            ,cuisine: str | None = None
+            ,by: str | None = None
+            ,session: SessionType | None = None
+            ) -> dict:
+        '''Monthly inspection and restaurant counts from the `inspection_trends` rollup.
+
+        A restaurant has one borough and one cuisine per inspection, so summing the rollup's
+        restaurant counts across either never counts a restaurant twice in a month.
+
+        Args:
+            borough (str | None, optional): Only inspections in this borough. Defaults to None.
+            cuisine (str | None, optional): Only inspections of this cuisine. Defaults to None.
+            by (str | None, optional): `borough` or `cuisine` for one series per value, one
+                combined series when None. Defaults to None.
+            session (SessionType | None, optional): Open session to reuse. Defaults to None.
+
+        Returns:
+            dict: Sorted `months` and `series`, each with its `borough` and `cuisine` (None when
+                combined) and `inspections` / `restaurants` lists aligned with `months`, zero
+                where a series has no inspections that month.
+        '''
+        with self.scope(session) as s:
+            rows = s.execute(trends_stmt(borough, cuisine, by)).all()
+        months = sorted({r.month for r in rows})
+        position = {m: i for i, m in enumerate(months)}
+        series = {}
+        for r in rows:
+            name = r[1] if by else None
+            if name not in series:
+                series[name] = {
+                    'borough': name if by == 'borough' else borough
+                    ,'cuisine': name if by == 'cuisine' else cuisine
+                    ,'inspections': [0] * len(months)
+                    ,'restaurants': [0] * len(months)
+                }
+            series[name]['inspections'][position[r.month]] = r.inspections
+            series[name]['restaurants'][position[r.month]] = r.restaurants
+        return {'months': months, 'series': [series[k] for k in sorted(series, key = lambda k: k or '')]}
+
+    def cuisine_scores(
+            self
+            ,metric: str = 'per_100k'
+            ,borough: str | None = None
+            ,cuisine: str | None = None
+            ,limit: int = 10
+            ,session: SessionType | None = None
+            ) -> list[dict]:
+        '''Cuisine x borough density scores ranked by one metric, read from `cuisine_scores`.
+
+        Args:
+            metric (str, optional): `per_100k`, `location_quotient` or `citywide_percent`. Defaults to `per_100k`.
+            borough (str | None, optional): Rank the cuisines of this borough. Defaults to None.
+            cuisine (str | None, optional): Rank the boroughs for this cuisine. Defaults to None.
+            limit (int, optional): Maximum rows. Defaults to 10.
+            session (SessionType | None, optional): Open session to reuse. Defaults to None.
+
+        Returns:
+            list[dict]: Rows with their 1-based `rank`, best first; undefined scores are None and rank last.
+        '''
+        with self.scope(session) as s:
+            results = s.execute(cuisine_scores_stmt(metric, borough, cuisine, limit))
+            return [
+                {
+                    'rank': rank
+                    ,'borough': r.borough
+                    ,'cuisine': r.cuisine
+                    ,'restaurants': r.restaurants
+                    ,'per_100k': r.per_100k
+                    ,'location_quotient': r.location_quotient
+                    ,'citywide_percent': r.citywide_percent
+                }
+            for rank, r in enumerate(results, start = 1)]
+
+    def borough_summary(self, session: SessionType | None = None) -> list[dict]:
+        with self.scope(session) as s:
+            results = s.execute(borough_summary_stmt())
+            return [
+                {
+                    'borough': r.borough
+                    ,'restaurant_count': r.restaurant_count
+                    ,'population': r.population
+                }
+            for r in results]
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
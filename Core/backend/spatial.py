@@ -0,0 +1,182 @@
+'''In-memory spatial index for "restaurants near a point" queries.
+
+Coordinates are projected to metres on a local equirectangular plane centred on NYC
+(error well under 1% across the five boroughs) and bucketed into a uniform grid of
+`CELL_M` square cells. Points are stored sorted by row-major cell id with CSR offsets, so
+every row of cells in a search window is one contiguous slice and a query only touches
+the handful of cells around the point. Pure NumPy, built once per data version and then
+only read.
+'''
+# Import dependencies
+import math
+import threading
+import numpy as np
+from collections.abc import Callable
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+# Projection origin and metres per degree of latitude
+ORIGIN = (40.7, -73.95)
+M_PER_DEG = 111_320.0
+
+# Grid cell edge in metres, a few dozen restaurants per cell in dense areas
+CELL_M = 250.0
+
+# Same generous NYC box the ingest schema enforces, queries outside it are rejected
+NYC_LAT = (40.47, 40.93)
+NYC_LNG = (-74.27, -73.68)
+
+
+def project(
+        lat: np.ndarray | float
+        ,lng: np.ndarray | float
+        ) -> tuple[np.ndarray, np.ndarray]:
+    '''Projects degrees to metres east and north of `ORIGIN`.'''
+    x = (np.asarray(lng, dtype = np.float64) - ORIGIN[1]) * M_PER_DEG * math.cos(math.radians(ORIGIN[0]))
+    y = (np.asarray(lat, dtype = np.float64) - ORIGIN[0]) * M_PER_DEG
+    return x, y
+
+
+class GridIndex():
+    def __init__(
+            self
+            ,rows: list[dict]
+            ,version: int = 0
+            ,cell: float = CELL_M
+            ):
+        '''
+        Uniform grid over restaurant coordinates answering k-nearest and radius queries.
+
+        Attributes:
+            version (int): Data version the index was built from.
+            rows (list[dict]): Map rows, reordered by grid cell.
+            cuisines (list[str]): Cuisine names present, positions are the codes in `cuisine`.
+            x, y (np.ndarray): Projected coordinates in metres, float64.
+            cuisine (np.ndarray): Cuisine code per point, int16.
+            starts (np.ndarray): CSR offsets, points of cell `c` are `starts[c]:starts[c + 1]`.
+        '''
+        self.version = version
+        self.cell = cell
+        self.cuisines = sorted({r['cuisine'] for r in rows})
+        codes = {c: i for i, c in enumerate(self.cuisines)}
+        x, y = project([r['lat'] for r in rows], [r['lng'] for r in rows])
+        x0, y0 = project(NYC_LAT[0], NYC_LNG[0])
+        x1, y1 = project(NYC_LAT[1], NYC_LNG[1])
+        self.x0, self.y0 = float(x0), float(y0)
+        self.ncols = int((x1 - x0) // cell) + 1
+        self.nrows = int((y1 - y0) // cell) + 1
+        cx, cy = self.cell_of(x, y)
+        cell_id = cy * self.ncols + cx
+        order = np.argsort(cell_id, kind = 'stable')
+        self.rows = [rows[i] for i in order.tolist()]
+        self.x = x[order]
+        self.y = y[order]
+        self.cuisine = np.array([codes.get(r['cuisine'], -1) for r in self.rows], dtype = np.int16)
+        self.starts = np.zeros(self.ncols * self.nrows + 1, dtype = np.int64)
+        np.cumsum(np.bincount(cell_id, minlength = self.ncols * self.nrows), out = self.starts[1:])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def cell_of(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Points outside the box are clamped into the border cells
+        cx = np.clip(((x - self.x0) // self.cell).astype(np.int64), 0, self.ncols - 1)
+        cy = np.clip(((y - self.y0) // self.cell).astype(np.int64), 0, self.nrows - 1)
+        return cx, cy
+
+    def window(self, cx: int, cy: int, r: int) -> np.ndarray:
+        '''Positions of every point in the (2r + 1)² cells around (cx, cy), one slice per cell row.'''
+        a, b = max(cx - r, 0), min(cx + r, self.ncols - 1)
+        rows = range(max(cy - r, 0), min(cy + r, self.nrows - 1) + 1)
+        slices = [np.arange(self.starts[row * self.ncols + a], self.starts[row * self.ncols + b + 1]) for row in rows]
+        return np.concatenate(slices) if slices else np.zeros(0, dtype = np.int64)
+
+    def nearest(
+            self
+            ,lat: float
+            ,lng: float
+            ,k: int = 10
+            ,radius: float | None = None
+            ,cuisine: str | None = None
+            ) -> list[dict]:
+        '''Closest restaurants to a point.
+
+        Grows a square window of cells around the point until it holds `k` matches that are
+        closer than the window's inner edge, so no nearer point can sit outside it.
+
+        Args:
+            lat (float): Latitude in degrees.
+            lng (float): Longitude in degrees.
+            k (int, optional): Maximum results. Defaults to 10.
+            radius (float | None, optional): Only points within this many metres. Defaults to None.
+            cuisine (str | None, optional): Only restaurants with this cuisine. Defaults to None.
+
+        Returns:
+            list[dict]: Map rows plus `distance_m`, nearest first.
+        '''
+        code = None
+        if cuisine is not None:
+            if cuisine not in self.cuisines:
+                return []
+            code = self.cuisines.index(cuisine)
+        qx, qy = project(lat, lng)
+        qx, qy = float(qx), float(qy)
+        cx, cy = (int(v) for v in self.cell_of(np.array(qx), np.array(qy)))
+        max_r = max(self.ncols, self.nrows)
+        r = min(math.ceil(radius / self.cell), max_r) if radius is not None else 1
+        while True:
+            idx = self.window(cx, cy, r)
+            if code is not None:
+                idx = idx[self.cuisine[idx] == code]
+            d2 = (self.x[idx] - qx) ** 2 + (self.y[idx] - qy) ** 2
+            if radius is not None:
+                keep = d2 <= radius ** 2
+                idx, d2 = idx[keep], d2[keep]
+            # Everything within r cells of the query is inside the window
+            if radius is not None or r >= max_r or (len(d2) >= k and np.partition(d2, k - 1)[k - 1] <= (r * self.cell) ** 2):
+                break
+            r *= 2
+        if len(d2) > k:
+            top = np.argpartition(d2, k - 1)[:k]
+            idx, d2 = idx[top], d2[top]
+        order = np.lexsort((idx, d2))
+        return [{**self.rows[i], 'distance_m': round(math.sqrt(d), 1)} for i, d in zip(idx[order].tolist(), d2[order].tolist())]
+
+
+# Per-process index, rebuilt when the data version moves on
+_current: dict[str, GridIndex | None] = {'index': None}
+_lock = threading.Lock()
+
+
+def spatial_index(
+        version: int
+        ,load: Callable[[], list[dict]]
+        ) -> GridIndex:
+    '''Returns the grid for `version`, building it once per process and data version.
+
+    Args:
+        version (int): Current data version.
+        load (Callable[[], list[dict]]): Supplies the map rows on a rebuild.
+
+    Returns:
+        GridIndex: Shared, read-only index.
+    '''
+    index = _current['index']
+    if index is not None and index.version == version:
+        return index
+    with _lock:     # One thread builds while the others wait for it
+        index = _current['index']
+        if index is None or index.version != version:
+            index = GridIndex(load(), version)
+            _current['index'] = index
+            log.info('Spatial index built for version %s with %s restaurants.', version, len(index))
+    return index
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
@@ -2,9 +2,11 @@
 from contextlib import contextmanager
 from datetime import datetime as dt
 from collections.abc import Sequence, Generator
-from sqlalchemy import create_engine, event, Engine, ForeignKey, String, Numeric, Select, Row
+from sqlalchemy import create_engine, event, func, select, Engine, ForeignKey, Index, String, Float, Select, Row
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Mapped, mapped_column, relationship, Session as SessionType
 from sqlalchemy.sql import Executable
+from sqlalchemy.schema import CreateTable, CreateIndex
 
 # Import configuration
 import config as C
@@ -14,6 +16,12 @@ from Core.log_config import init_log
 log = init_log(__name__)
 
 
+# Decimal places kept when float32 coordinates are widened, by the load and the read model alike.
+# Rounding only strips widening noise: float32 steps are ~3.8e-6° in latitude and ~7.6e-6° in
+# longitude around NYC, so stored coordinates are good to roughly half a metre
+COORD_DECIMALS = 6
+
+
 # Create ORM base class
 class Base(DeclarativeBase):
     pass
@@ -96,8 +104,8 @@ class Restaurants(Base):
     borough_id: Mapped[str] = mapped_column(String(2), ForeignKey('boroughs.borough_id'), nullable = False)
     cuisine_id: Mapped[str] = mapped_column(ForeignKey('cuisines.cuisine_id'), nullable = False)
     inspection_date: Mapped[dt] = mapped_column(nullable = False)
-    lat: Mapped[float] = mapped_column(Numeric(14, 12), nullable = False)
-    lng: Mapped[float] = mapped_column(Numeric(14, 12), nullable = False)
+    lat: Mapped[float] = mapped_column(Float, nullable = False)    # REAL affinity, read back as float without Decimal
+    lng: Mapped[float] = mapped_column(Float, nullable = False)
 
     # Relationships with reference tables, accessable through gateway now
     borough: Mapped['Boroughs'] = relationship(back_populates = 'restaurants')
@@ -108,6 +116,121 @@ class Restaurants(Base):
         return f'<RestaurantTable(id={self.id}, name="{self.name}")>'
 
 
+# Load history, one row per completed pipeline load
+class DataVersions(Base):
+    '''
+    Represents the data_versions log table in the database.
+
+    Attributes:
+        version (Integer): PK, monotonically increasing data version.
+        loaded_at (DateTime): When the load completed.
+        mode (String): `fresh` or `update`.
+        row_count (Integer): Rows in the restaurants table after the load.
+    '''
+    # Table name
+    __tablename__ = 'data_versions'
+
+    # Columns
+    version: Mapped[int] = mapped_column(primary_key = True)
+    loaded_at: Mapped[dt] = mapped_column(nullable = False)
+    mode: Mapped[str] = mapped_column(nullable = False)
+    row_count: Mapped[int] = mapped_column(nullable = False)
+
+    def __repr__(self):
+        return f'<DataVersionTable(version={self.version}, mode={self.mode})>'
+
+
+# Per-version change sets behind the map delta feed
+class ChangeLog(Base):
+    '''
+    Represents the change_log table in the database.
+
+    Attributes:
+        version (Integer): PK, data version the change was loaded in.
+        restaurant_id (Integer): PK, restaurant that changed, `MARKER` for the version's marker row.
+        op (String): `I` inserted, `U` updated, `D` deleted; marker rows hold `V` (change set
+            complete) or `F` (fresh build, no delta across it).
+    '''
+    # Table name
+    __tablename__ = 'change_log'
+    __table_args__ = {'sqlite_with_rowid': False}   # Clustered on (version, restaurant_id), no separate rowid b-tree
+
+    # Marker rows use an id no restaurant can have
+    MARKER = 0
+
+    # Columns
+    version: Mapped[int] = mapped_column(primary_key = True, autoincrement = False)
+    restaurant_id: Mapped[int] = mapped_column(primary_key = True, autoincrement = False)
+    op: Mapped[str] = mapped_column(String(1), nullable = False)
+
+    def __repr__(self):
+        return f'<ChangeLogTable(version={self.version}, restaurant_id={self.restaurant_id}, op={self.op})>'
+
+
+# Monthly inspection rollup behind the trends endpoint, kept across fresh builds
+class InspectionTrends(Base):
+    '''
+    Represents the inspection_trends rollup table in the database.
+
+    Attributes:
+        month (String): PK, inspection month as `YYYY-MM`.
+        borough_id (String): PK, borough of the inspected restaurants.
+        cuisine_id (String): PK, cuisine of the inspected restaurants.
+        inspections (Integer): Distinct (restaurant, inspection date) pairs in the month.
+        restaurants (Integer): Distinct restaurants inspected in the month.
+    '''
+    # Table name
+    __tablename__ = 'inspection_trends'
+    __table_args__ = {'sqlite_with_rowid': False}   # Clustered on (month, borough_id, cuisine_id), time series read in order
+
+    # Columns, no foreign keys so the rollup survives reference tables being rebuilt
+    month: Mapped[str] = mapped_column(String(7), primary_key = True)
+    borough_id: Mapped[str] = mapped_column(String(2), primary_key = True)
+    cuisine_id: Mapped[str] = mapped_column(primary_key = True)
+    inspections: Mapped[int] = mapped_column(nullable = False)
+    restaurants: Mapped[int] = mapped_column(nullable = False)
+
+    def __repr__(self):
+        return f'<InspectionTrendsTable(month={self.month}, borough_id={self.borough_id}, cuisine_id={self.cuisine_id})>'
+
+
+# Cuisine x borough density scores, recomputed on every load
+class CuisineScores(Base):
+    '''
+    Represents the cuisine_scores table in the database.
+
+    Attributes:
+        borough_id (String): PK, FK reference to Boroughs table.
+        cuisine_id (String): PK, FK reference to Cuisines table.
+        restaurants (Integer): Restaurants of the cuisine in the borough.
+        per_100k (Float): Restaurants per 100,000 residents, null without a population.
+        location_quotient (Float): Cuisine's share of the borough's restaurants over its share
+            citywide, above 1 where the cuisine is over-represented, null for an empty borough.
+        citywide_percent (Float): Percent of the cuisine's restaurants citywide that are in the borough.
+    '''
+    # Table name
+    __tablename__ = 'cuisine_scores'
+    __table_args__ = (
+        # One index per ranking, each lookup reads the borough's or cuisine's rows already ordered
+        Index('ix_cuisine_scores_borough_per_100k', 'borough_id', 'per_100k')
+        ,Index('ix_cuisine_scores_borough_location_quotient', 'borough_id', 'location_quotient')
+        ,Index('ix_cuisine_scores_borough_citywide_percent', 'borough_id', 'citywide_percent')
+        ,Index('ix_cuisine_scores_cuisine', 'cuisine_id')
+        ,{'sqlite_with_rowid': False}
+    )
+
+    # Columns
+    borough_id: Mapped[str] = mapped_column(String(2), ForeignKey('boroughs.borough_id'), primary_key = True)
+    cuisine_id: Mapped[str] = mapped_column(ForeignKey('cuisines.cuisine_id'), primary_key = True)
+    restaurants: Mapped[int] = mapped_column(nullable = False)
+    per_100k: Mapped[float | None] = mapped_column(Float, nullable = True)
+    location_quotient: Mapped[float | None] = mapped_column(Float, nullable = True)
+    citywide_percent: Mapped[float] = mapped_column(Float, nullable = False)
+
+    def __repr__(self):
+        return f'<CuisineScoresTable(borough_id={self.borough_id}, cuisine_id={self.cuisine_id})>'
+
+
 # Create IMPORTANT ENGINE to be used across namespaces
 engine = create_engine(C.DB_CONFIG['ENGINE_URI'])
 
@@ -171,6 +294,108 @@ def execute_query(
             raise
 
 
+# Latest data version, used to name exports and invalidate derived data
+def current_version() -> int:
+    '''Reads the latest pipeline data version.
+
+    Returns:
+        int: Latest version, 0 when nothing has been recorded yet.
+    '''
+    try:
+        with get_session() as session:
+            return session.scalar(select(func.max(DataVersions.version))) or 0
+    except OperationalError:
+        log.warning('No data_versions table found, defaulting to version 0.')
+        return 0
+
+
+# Column types that predate native REAL coordinates
+LEGACY_COORD_TYPES = ('NUMERIC', 'DECIMAL')
+
+
+def migrate_coordinates(bind: Engine = engine) -> bool:
+    '''Rebuilds a `restaurants` table created with `Numeric(14, 12)` coordinates so they are REAL.
+
+    SQLite cannot change a column's declared type, so the table is copied into the current
+    schema inside one transaction: renamed aside, recreated, filled with `CAST(... AS REAL)`
+    and the old copy dropped. Nothing references `restaurants`, so foreign keys stay valid.
+
+    Args:
+        bind (Engine, optional): Engine of the database to migrate. Defaults to the app engine.
+
+    Returns:
+        bool: True when the table was rebuilt, False when there was nothing to do.
+    '''
+    table = Restaurants.__table__
+    with bind.connect() as conn:
+        columns = {r[1]: r[2].upper() for r in conn.exec_driver_sql(f'PRAGMA table_info({table.name})')}
+    if not columns.get('lat', '').startswith(LEGACY_COORD_TYPES):
+        return False
+
+    log.info('Migrating %s coordinates from %s to REAL.', table.name, columns['lat'])
+    names = ', '.join(c.name for c in table.columns)
+    values = ', '.join(f'CAST({c.name} AS REAL)' if c.name in ('lat', 'lng') else c.name for c in table.columns)
+    raw = bind.raw_connection()
+    try:
+        dbapi = raw.driver_connection
+        isolation = dbapi.isolation_level
+        dbapi.isolation_level = None    # Issue BEGIN/COMMIT ourselves so the DDL is part of the transaction
+        try:
+            dbapi.execute('BEGIN IMMEDIATE')
+            dbapi.execute(f'ALTER TABLE {table.name} RENAME TO _{table.name}_legacy')
+            dbapi.execute(str(CreateTable(table).compile(bind)))
+            for index in table.indexes:
+                dbapi.execute(str(CreateIndex(index).compile(bind)))
+            dbapi.execute(f'INSERT INTO {table.name} ({names}) SELECT {values} FROM _{table.name}_legacy')
+            dbapi.execute(f'DROP TABLE _{table.name}_legacy')
+            dbapi.execute('COMMIT')
+        except Exception:
+            dbapi.execute('ROLLBACK')
+            log.critical('Coordinate migration failed, table left unchanged.', exc_info = True)
+            raise
+        finally:
+            dbapi.isolation_level = isolation
+    finally:
+        raw.close()
+    log.info('Coordinate migration complete.')
+    return True
+
+
+# FTS5 index over restaurant names, external content read from `restaurants` by rowid
+SEARCH_TABLE = 'restaurants_fts'
+
+
+def build_search_index(bind: Engine = engine) -> bool:
+    '''Creates the restaurant name search index if needed and rebuilds it from `restaurants`.
+
+    The index only stores tokens (`content = 'restaurants'`), so a rebuild after each load is
+    all it takes to stay in sync; there are no triggers to slow down bulk inserts. Prefix
+    indexes for 2-4 characters keep type-ahead queries fast.
+
+    Args:
+        bind (Engine, optional): Engine of the database to index. Defaults to the app engine.
+
+    Returns:
+        bool: True when the index was rebuilt, False when this SQLite build lacks FTS5.
+    '''
+    try:
+        with bind.begin() as conn:
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                "name, content = 'restaurants', content_rowid = 'id', "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+            )
+            conn.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+        log.info('Restaurant search index rebuilt.')
+        return True
+    except OperationalError as e:
+        if 'fts5' not in str(e):
+            log.critical('Could not build restaurant search index.', exc_info = True)
+            raise
+        log.warning('SQLite was built without FTS5, restaurant search is unavailable.')
+        return False
+
+
 # EOF
 
 if __name__ == '__main__':
@@ -0,0 +1,180 @@
+'''On-disk checkpoints for pipeline stages.
+
+Layout of `<CHECKPOINT_DIR>/`:
+    run.json                     mode and state of the current or last run
+    <stage>/manifest.json        fingerprint, creation time and frame names
+    <stage>/<frame>.feather      one Feather (Arrow IPC) file per DataFrame
+
+A stage's fingerprint hashes its inputs: config values, source file stats, the code of the
+modules it runs and the identity of the upstream checkpoint it consumed. When a rerun
+computes the same fingerprint the stage is skipped and its frames are read back instead.
+'''
+# Import dependencies
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+from pathlib import Path
+from datetime import datetime as dt, timedelta as td
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+STAGES = ('extract', 'transform', 'load')
+
+
+class CheckpointMissing(RuntimeError):
+    '''Raised when a run skips a stage whose outputs are not available as a checkpoint.'''
+
+
+def fingerprint(*parts) -> str:
+    '''Stable digest of JSON-serializable inputs (paths and other objects via `str`).'''
+    blob = json.dumps(parts, sort_keys = True, default = str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()[:16]
+
+
+def file_stat(path: Path) -> tuple | None:
+    '''Size and modification time of an input file, None when it does not exist.'''
+    try:
+        st = path.stat()
+        return (str(path), st.st_size, st.st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+
+def source_digest(*modules) -> str:
+    '''Digest of module source files so code changes invalidate downstream checkpoints.'''
+    h = hashlib.sha256()
+    for module in modules:
+        h.update(Path(module.__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+
+class CheckpointStore():
+    def __init__(
+            self
+            ,root: Path
+            ,max_age: td | None = None
+            ):
+        '''
+        Persists stage outputs so a failed or repeated run resumes from the last good stage.
+
+        Attributes:
+            root (Path): Checkpoint directory.
+            max_age (timedelta | None): Checkpoints older than this are ignored. None keeps them indefinitely.
+        '''
+        self.root = root
+        self.max_age = max_age
+
+    def save(
+            self
+            ,stage: str
+            ,frames: dict[str, pd.DataFrame]
+            ,key: str
+            ,meta: dict | None = None
+            ) -> dict:
+        '''Writes a stage's frames and manifest, replacing the previous checkpoint atomically.
+
+        Args:
+            stage (str): Stage name.
+            frames (dict[str, pd.DataFrame]): Outputs to persist, may be empty.
+            key (str): Input fingerprint of the stage.
+            meta (dict | None, optional): Extra JSON values kept in the manifest. Defaults to None.
+
+        Returns:
+            dict: Written manifest.
+        '''
+        try:
+            self.root.mkdir(parents = True, exist_ok = True)
+            staging = self.root / f'.{stage}.tmp'
+            shutil.rmtree(staging, ignore_errors = True)
+            staging.mkdir()
+            for name, df in frames.items():
+                df.reset_index(drop = True).to_feather(staging / f'{name}.feather')
+            manifest = {
+                'stage': stage
+                ,'fingerprint': key
+                ,'created': dt.now().isoformat()
+                ,'frames': list(frames)
+                ,'meta': meta or {}
+            }
+            (staging / 'manifest.json').write_text(json.dumps(manifest, indent = 2))
+            final = self.root / stage
+            shutil.rmtree(final, ignore_errors = True)
+            os.replace(staging, final)
+            log.debug('Checkpoint saved for %s stage.', stage)
+            return manifest
+        except Exception:
+            log.critical('Could not save %s checkpoint.', stage, exc_info = True)
+            raise
+
+    def manifest(self, stage: str) -> dict | None:
+        path = self.root / stage / 'manifest.json'
+        try:
+            return json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def load(
+            self
+            ,stage: str
+            ,key: str
+            ) -> tuple[dict[str, pd.DataFrame], dict] | None:
+        '''Reads a stage's frames back when its fingerprint matches and it has not expired.
+
+        Args:
+            stage (str): Stage name.
+            key (str): Fingerprint the caller computed for the stage's current inputs.
+
+        Returns:
+            tuple[dict[str, pd.DataFrame], dict] | None: Frames and manifest, or None on a miss.
+        '''
+        manifest = self.manifest(stage)
+        if manifest is None or manifest['fingerprint'] != key:
+            return None
+        if self.max_age is not None and dt.now() - dt.fromisoformat(manifest['created']) > self.max_age:
+            log.info('Checkpoint for %s stage is older than %s, ignoring it.', stage, self.max_age)
+            return None
+        try:
+            frames = {name: pd.read_feather(self.root / stage / f'{name}.feather') for name in manifest['frames']}
+        except Exception:
+            log.warning('Checkpoint for %s stage is unreadable, rerunning it.', stage, exc_info = True)
+            return None
+        return frames, manifest
+
+    def clear(self, stage: str) -> None:
+        shutil.rmtree(self.root / stage, ignore_errors = True)
+
+    def begin(self, mode: str) -> None:
+        '''Records that a run in `mode` (`fresh` or `update`) has started.'''
+        self.root.mkdir(parents = True, exist_ok = True)
+        tmp = self.root / '.run.json.tmp'
+        tmp.write_text(json.dumps({'mode': mode, 'started': dt.now().isoformat(), 'finished': None}))
+        os.replace(tmp, self.root / 'run.json')
+
+    def finish(self) -> None:
+        '''Marks the current run as complete.'''
+        state = self.run_state() or {}
+        tmp = self.root / '.run.json.tmp'
+        tmp.write_text(json.dumps({**state, 'finished': dt.now().isoformat()}))
+        os.replace(tmp, self.root / 'run.json')
+
+    def run_state(self) -> dict | None:
+        try:
+            return json.loads((self.root / 'run.json').read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def pending(self) -> str | None:
+        '''Mode of a run that started but never finished, None when there is nothing to resume.'''
+        state = self.run_state()
+        return state['mode'] if state and not state.get('finished') else None
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
@@ -1,15 +1,22 @@
 # Import dependencies
+import asyncio
 import pandas as pd
 from time import sleep
 from pathlib import Path
+from collections.abc import Iterable
 
 # Import subpackage requirements
 from . import extract as E
+from .registry import DATASETS, DatasetSpec, register
+from ..schema import apply_schema
 
 # Bring in custom logger
 from Core.log_config import init_log
 log = init_log(__name__)
 
+# Registry re-exported so new sources are added with `extract.register(DatasetSpec(...))`
+__all__ = ['DATASETS', 'DatasetSpec', 'register', 'extraction', 'get_addData', 'fetch_dataset', 'gather_datasets', 'extract_all']
+
 
 def extraction(
         dataSet: str
@@ -18,65 +25,24 @@ def extraction(
     '''Base extraction method for datasets in this project.
 
     Args:
-        dataSet (str): Dataset requested.
+        dataSet (str): Registered dataset requested.
         config (dict[str, int  |  str]): Config dictionary for API requests.
 
     Returns:
         pd.DataFrame: Extracted data.
     '''
-    # Core extraction method used for all NYC Open Data API Calls
-    # Encompasses query filtering and basic df creation
-    log.debug('Grabbing config constants.')
-    cutoff_years = config['DATE_CUTOFF']
-    limit = config['ROW_LIMIT']
-    key = config['KEY']
-
-    # Cond'l: Get Restaurant Inspections dataset from NYC Department of Health and Mental Hygiene (NYC Open)
-    if dataSet == 'dohmh':
-        log.debug('DOHMH Dataset selected.')
-    # Build select statement with aliases
-        select = (
-            'camis AS id,'
-            'dba AS name,'
-            'boro AS borough,'
-            'cuisine_description AS cuisine,'
-            'inspection_date,'
-            'latitude AS lat,'
-            'longitude AS lng'
-        )
-        # Parameters to send with API Call
-        params = {
-            '$select': select
-            ,'$where': E.where_filter(cutoff_years)
-            ,'$limit': limit
-            ,'$$app_token': key
-        }
-        # Endpoint for API Call
-        url = 'https://data.cityofnewyork.us/resource/43nn-pn8j.csv'
-
-    # Cond'l: Get NYC Common Fast Food dataset (NYC Open)
-    elif dataSet == 'fastfood':
-        log.debug('FastFoods Dataset selected.')
-        # Build select statement with aliases
-        select = 'distinct restaurant AS name'
-        # Parameters to send with API Call
-        params = {
-            '$select': select
-            ,'$limit': limit
-            ,'$$app_token': key
-        }
-        # Endpoint for API Call
-        url = 'https://data.cityofnewyork.us/resource/qgc5-ecnb.csv'
-
-    # Return extracted and file-formatted data
+    # Core extraction method used for all Socrata API calls, the query comes from the dataset's spec
+    spec = DATASETS[dataSet]
+    log.debug(f'{spec.name} dataset selected.')
     log.debug('Sending API request.')
-    return E.get_df(url, params, config)
+    return E.get_df(spec.url(config), spec.params(config), config)
 
 
 def get_addData(
         dataSet: str
         ,csv: Path
         ,api_config: dict[str, int | str]
+        ,throttled: bool = False
         ) -> pd.DataFrame:
     '''Gets additional data after main source. Sleeps and validates CSV existance.
 
@@ -84,6 +50,7 @@ def get_addData(
         dataSet (str): Dataset requested.
         csv (Path): Where CSV lives or will live.
         api_config (dict[str, int  |  str]): Config dictionary for API requests.
+        throttled (bool, optional): Skip the blind `SLEEP` and rely on the per-host limiter. Defaults to False.
 
     Returns:
         pd.DataFrame: New data requested.
@@ -100,8 +67,9 @@ def get_addData(
         # Else extract a new csv (so sleep first between this and the first API call)
         else:
             # Save new df to prevent future API calls on this route and return df
-            log.info(f'Sleeping between API calls for {sleeping} seconds...')
-            sleep(sleeping)
+            if not throttled:
+                log.info(f'Sleeping between API calls for {sleeping} seconds...')
+                sleep(sleeping)
             df = extraction(dataSet, api_config)
             df.to_csv(csv, header = True, index = False)
             return df
@@ -110,6 +78,82 @@ def get_addData(
         raise
 
 
+def fetch_dataset(
+        spec: DatasetSpec
+        ,db_config: dict[str, Path | str]
+        ,api_config: dict[str, int | str]
+        ) -> pd.DataFrame:
+    '''Fetches one dataset, applies its schema straight away and then its hooks.
+
+    Args:
+        spec (DatasetSpec): Registered dataset.
+        db_config (dict[str, Path | str]): Config dictionary holding local CSV paths.
+        api_config (dict[str, int  |  str]): Config dictionary for API requests.
+
+    Returns:
+        pd.DataFrame: Coerced and validated data.
+    '''
+    if spec.resource is None:
+        raw = pd.read_csv(db_config[spec.csv])
+    elif spec.csv is not None:
+        raw = get_addData(spec.name, db_config[spec.csv], api_config, True)
+    else:
+        raw = extraction(spec.name, api_config)
+    df, _ = apply_schema(raw, spec.schema)
+    for hook in spec.hooks:
+        df = hook(df)
+    return df
+
+
+async def gather_datasets(
+        db_config: dict[str, Path | str]
+        ,api_config: dict[str, int | str]
+        ,names: Iterable[str] | None = None
+        ) -> dict[str, pd.DataFrame]:
+    '''Fetches the registered source datasets concurrently.
+
+    Blocking fetches and CSV reads are offloaded to threads, while API calls to the same
+    host are spaced by the shared per-host limiter (`RATE_LIMIT`) instead of a fixed sleep
+    and reuse the pooled connections of one shared session. Each dataset is validated
+    against its schema as soon as it lands, so a bad batch fails the run before the others finish.
+
+    Args:
+        db_config (dict[str, Path | str]): Config dictionary holding local CSV paths.
+        api_config (dict[str, int  |  str]): Config dictionary for API requests.
+        names (Iterable[str] | None, optional): Datasets to fetch. Defaults to every registered one.
+
+    Returns:
+        dict[str, pd.DataFrame]: Extracted data keyed by dataset name.
+    '''
+    log.debug('Scheduling concurrent extraction.')
+    jobs = {
+        name: asyncio.to_thread(fetch_dataset, DATASETS[name], db_config, api_config)
+    for name in (DATASETS if names is None else names)}
+    results = await asyncio.gather(*jobs.values())
+    return dict(zip(jobs.keys(), results))
+
+
+def extract_all(
+        db_config: dict[str, Path | str]
+        ,api_config: dict[str, int | str]
+        ,names: Iterable[str] | None = None
+        ) -> dict[str, pd.DataFrame]:
+    '''Synchronous entry point for `gather_datasets()`.
+
+    Args:
+        db_config (dict[str, Path | str]): Config dictionary holding local CSV paths.
+        api_config (dict[str, int  |  str]): Config dictionary for API requests.
+        names (Iterable[str] | None, optional): Datasets to fetch. Defaults to every registered one.
+
+    Returns:
+        dict[str, pd.DataFrame]: Extracted data keyed by dataset name.
+    '''
+    try:
+        return asyncio.run(gather_datasets(db_config, api_config, names))
+    except Exception:
+        log.critical('Concurrent extraction failed.', exc_info = True)
+        raise
+
 
 # EOF
 
@@ -2,7 +2,11 @@
 import pandas as pd
 import requests
 import io
+import time
+import threading
 import datetime as dt
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 # Bring in custom logger
@@ -10,6 +14,75 @@ from Core.log_config import init_log
 log = init_log(__name__)
 
 
+class HostThrottle():
+    def __init__(self):
+        '''
+        Thread-safe per-host rate limiter.
+
+        Each call reserves the next free start slot for its host and sleeps until it,
+        so concurrent fetches to the same host are spaced out instead of burst.
+
+        Attributes:
+            slots (dict[str, float]): Next free `time.monotonic()` slot per host.
+        '''
+        self.lock = threading.Lock()
+        self.slots: dict[str, float] = {}
+
+    def wait(
+            self
+            ,url: str
+            ,rate: float | None
+            ) -> float:
+        '''Blocks until a request to `url`'s host is allowed.
+
+        Args:
+            url (str): Request URL, only the host is used.
+            rate (float | None): Max requests per second for the host. Falsy disables throttling.
+
+        Returns:
+            float: Seconds waited.
+        '''
+        if not rate:
+            return 0.0
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.slots.get(host, now))
+            self.slots[host] = slot + 1 / rate
+        delay = slot - now
+        if delay > 0:
+            log.debug(f'Throttling {host} for {delay:.2f} seconds.')
+            time.sleep(delay)
+        return delay
+
+
+# Shared across every extraction thread in the process
+throttle = HostThrottle()
+
+# One pooled session for every fetch, keep-alive connections are reused across datasets on a host
+_session: dict[str, requests.Session | None] = {'http': None}
+_session_lock = threading.Lock()
+
+
+def http_session(pool_size: int = 10) -> requests.Session:
+    '''Process-wide `requests.Session` whose connection pool is shared by all extraction threads.
+
+    Args:
+        pool_size (int, optional): Connections kept open per host. Defaults to 10.
+
+    Returns:
+        requests.Session: Session created on first use.
+    '''
+    with _session_lock:
+        if _session['http'] is None:
+            http = requests.Session()
+            adapter = HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size)
+            http.mount('https://', adapter)
+            http.mount('http://', adapter)
+            _session['http'] = http
+        return _session['http']
+
+
 def get_df(
         url: str
         ,params: dict[str, int | str]
@@ -30,8 +103,9 @@ def get_df(
     def get_df_with_retry(url, params, config):
         log.debug('Entering tenacity retry loop.')
         try:
+            throttle.wait(url, config.get('RATE_LIMIT'))
             log.debug('Sending API request.')
-            response = requests.get(url, params, timeout = config['TIMEOUT'])
+            response = http_session(config.get('POOL_SIZE', 10)).get(url, params = params, timeout = config['TIMEOUT'])
             response.raise_for_status() # Raise on bad response status
         except requests.exceptions.RequestException:
             log.warning('Request exception error.', exc_info = True)
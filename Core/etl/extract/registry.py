@@ -0,0 +1,126 @@
+'''Declarative registry of the source datasets.
+
+Each source is one `DatasetSpec`: where it comes from (a Socrata resource, a local CSV, or
+a resource cached to a CSV), the query sent with it, the schema its rows must pass and optional
+hooks run on the validated frame. `gather_datasets()` fetches every
+registered spec concurrently, so a new NYC Open dataset or another city's feed is a new
+`register()` call plus its `Schema`, not another branch in the extraction code.
+'''
+# Import dependencies
+import pandas as pd
+from dataclasses import dataclass
+from collections.abc import Callable
+
+# Import subpackage requirements
+from .extract import where_filter
+from ..schema import SCHEMAS, Schema
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+@dataclass(frozen = True)
+class DatasetSpec():
+    '''
+    How to obtain and validate one source dataset.
+
+    Attributes:
+        name (str): Dataset name, key of its frame in the pipeline and its checkpoint.
+        schema (Schema): Columns and dtypes the rows are coerced to.
+        resource (str | None): Socrata resource id, fetched as `{base_url}/{resource}.csv`.
+            None for a local-only dataset read from `csv`.
+        select (str | None): SoQL `$select`, with the aliases the schema expects.
+        where (Callable[[dict], str] | None): Builds the SoQL `$where` from `API_CONFIG`.
+        csv (str | None): `DB_CONFIG` key of a local CSV. The source itself for local-only
+            datasets, otherwise a cache written on first fetch and read on later runs.
+        base_url (str | None): Resource root, for feeds outside `API_CONFIG['BASE_URL']`.
+        hooks (tuple[Callable[[pd.DataFrame], pd.DataFrame], ...]): Applied in order to the validated
+            frame, e.g. to derive columns a feed lacks before the transform stage sees it.
+    '''
+    name: str
+    schema: Schema
+    resource: str | None = None
+    select: str | None = None
+    where: Callable[[dict], str] | None = None
+    csv: str | None = None
+    base_url: str | None = None
+    hooks: tuple[Callable[[pd.DataFrame], pd.DataFrame], ...] = ()
+
+    def url(self, api_config: dict[str, int | str]) -> str:
+        return f'{self.base_url or api_config["BASE_URL"]}/{self.resource}.csv'
+
+    def params(self, api_config: dict[str, int | str]) -> dict[str, int | str]:
+        # SoQL parameters, unset clauses are left out
+        params = {
+            '$select': self.select
+            ,'$where': self.where(api_config) if self.where is not None else None
+            ,'$limit': api_config['ROW_LIMIT']
+            ,'$$app_token': api_config['KEY']
+        }
+        return {k: v for k, v in params.items() if v is not None}
+
+
+# Every dataset the pipeline extracts, in registration order
+DATASETS: dict[str, DatasetSpec] = {}
+
+
+def register(spec: DatasetSpec) -> DatasetSpec:
+    '''Adds a dataset to the registry.
+
+    Args:
+        spec (DatasetSpec): Dataset to extract on every run.
+
+    Raises:
+        ValueError: A dataset with the same name is already registered, or the spec has no source.
+
+    Returns:
+        DatasetSpec: The registered spec.
+    '''
+    if spec.name in DATASETS:
+        raise ValueError(f'Dataset {spec.name!r} is already registered.')
+    if spec.resource is None and spec.csv is None:
+        raise ValueError(f'Dataset {spec.name!r} needs a resource or a csv.')
+    DATASETS[spec.name] = spec
+    log.debug(f'Registered dataset {spec.name}.')
+    return spec
+
+
+# Restaurant Inspections from the NYC Department of Health and Mental Hygiene (NYC Open)
+register(DatasetSpec(
+    'dohmh'
+    ,SCHEMAS['dohmh']
+    ,resource = '43nn-pn8j'
+    ,select = (
+        'camis AS id,'
+        'dba AS name,'
+        'boro AS borough,'
+        'cuisine_description AS cuisine,'
+        'inspection_date,'
+        'latitude AS lat,'
+        'longitude AS lng'
+    )
+    ,where = lambda config: where_filter(config['DATE_CUTOFF'])
+))
+
+# NYC Common Fast Food chains (NYC Open), rarely changes so it is cached to a CSV
+register(DatasetSpec(
+    'fastfood'
+    ,SCHEMAS['fastfood']
+    ,resource = 'qgc5-ecnb'
+    ,select = 'distinct restaurant AS name'
+    ,csv = 'FASTFOOD_CSV'
+))
+
+# Borough populations, built by hand from census tables
+register(DatasetSpec(
+    'population'
+    ,SCHEMAS['population']
+    ,csv = 'POPULATION_CSV'
+))
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
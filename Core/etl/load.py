@@ -1,64 +1,228 @@
 # Import dependencies
+import time
+import sqlite3
+import numpy as np
 import pandas as pd
-from sqlalchemy import select, insert
+from sqlalchemy import func, select, delete
 from sqlalchemy.orm import DeclarativeMeta
+from sqlalchemy.exc import OperationalError
+from sqlalchemy import MetaData, Table
+from sqlalchemy.schema import CreateIndex, CreateTable
+from contextlib import contextmanager, nullcontext
+from collections.abc import Generator
 from datetime import datetime as dt, timedelta as td
 
 # Import subpackage dependencies
-from Core.database import Boroughs, Restaurants, get_session, execute_query
+from Core.database import engine, Boroughs, Restaurants, DataVersions, ChangeLog, InspectionTrends, COORD_DECIMALS, get_session
 
 # Bring in custom logger
 from Core.log_config import init_log
 log = init_log(__name__)
 
 
+# How SQLAlchemy stores DateTime values in SQLite
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# Rows bound per executemany call when no CHUNK_SIZE is configured
+BULK_BATCH = 50_000
+
+
+def db_records(
+        df: pd.DataFrame
+        ) -> list[dict]:
+    '''Converts a frame with compact dtypes into plain Python rows for the driver.
+
+    Args:
+        df (pd.DataFrame): Data using the schema's compact dtypes.
+
+    Returns:
+        list[dict]: One dict per row, float32 columns widened and rounded.
+    '''
+    wide = {c: df[c].astype(np.float64).round(COORD_DECIMALS) for c in df.columns if df[c].dtype == np.float32}
+    return df.assign(**wide).to_dict('records')
+
+
+def db_column(
+        series: pd.Series
+        ) -> list:
+    '''Converts one column into Python values the sqlite3 driver binds directly.
+
+    Datetimes become SQLAlchemy's SQLite storage strings, float32 is widened and rounded like
+    `db_records()`, categoricals yield their values and missing values become None.
+
+    Args:
+        series (pd.Series): Column using the schema's compact dtypes.
+
+    Returns:
+        list: One value per row.
+    '''
+    null = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        stamps = np.datetime_as_string(series.to_numpy(dtype = 'datetime64[us]'), unit = 'us')
+        values = np.char.replace(stamps, 'T', ' ').astype(object)  # DATETIME_FORMAT, without a per-row strftime
+    elif series.dtype == np.float32:
+        values = series.to_numpy(dtype = np.float64).round(COORD_DECIMALS).astype(object)
+    else:
+        values = series.to_numpy(dtype = object)
+    if null.any():
+        values[null] = None
+    return values.tolist()
+
+
+@contextmanager
+def raw_transaction(
+        spill: bool = True
+        ) -> Generator[sqlite3.Connection]:
+    '''Driver connection inside one explicit transaction, so DDL and bulk DML commit together.
+
+    Args:
+        spill (bool, optional): Let SQLite write dirty pages to the file before the commit.
+            A spill takes the exclusive lock, which blocks readers in rollback-journal mode
+            until the commit; False keeps them in memory so readers see the old rows meanwhile.
+            Defaults to True.
+
+    Yields:
+        Generator[sqlite3.Connection]: The pooled sqlite3 connection, committed on success.
+    '''
+    raw = engine.raw_connection()
+    try:
+        dbapi = raw.driver_connection
+        isolation = dbapi.isolation_level
+        dbapi.isolation_level = None    # Explicit BEGIN/COMMIT instead of the driver's implicit ones
+        if not spill:
+            dbapi.execute('PRAGMA cache_spill = OFF')
+        try:
+            dbapi.execute('BEGIN')
+            yield dbapi
+            dbapi.execute('COMMIT')
+        except Exception:
+            dbapi.execute('ROLLBACK')
+            raise
+        finally:
+            dbapi.isolation_level = isolation
+            if not spill:
+                dbapi.execute('PRAGMA cache_spill = ON')
+    finally:
+        raw.close()
+
+
+def reset_tables(
+        dbapi: sqlite3.Connection
+        ,metadata: MetaData
+        ,keep: tuple[Table, ...] = ()
+        ) -> None:
+    '''Drops and recreates the schema's tables inside the caller's transaction.
+
+    Unlike `drop_all()`/`create_all()`, which commit as they go, nothing is visible to other
+    connections until the caller commits, so a rebuild never exposes empty or missing tables.
+
+    Args:
+        dbapi (sqlite3.Connection): Connection from `raw_transaction()`.
+        metadata (MetaData): Schema to rebuild.
+        keep (tuple[Table, ...], optional): Tables left as they are, created only if missing. Defaults to ().
+    '''
+    for table in reversed(metadata.sorted_tables):  # Children before the tables they reference
+        if table not in keep:
+            dbapi.execute(f'DROP TABLE IF EXISTS {table.name}')
+    for table in metadata.sorted_tables:
+        dbapi.execute(str(CreateTable(table, if_not_exists = True).compile(engine)))
+        for index in table.indexes:
+            dbapi.execute(str(CreateIndex(index, if_not_exists = True).compile(engine)))
+
+
+def bulk_insert(
+        dbapi: sqlite3.Connection
+        ,table: str
+        ,df: pd.DataFrame
+        ,names: list[str]
+        ,chunk_size: int | None = None
+        ) -> None:
+    # Streams row tuples from the frame's columns, only one batch of tuples alive at a time
+    sql = f'INSERT INTO {table} ({", ".join(names)}) VALUES ({", ".join("?" * len(names))})'
+    step = chunk_size or BULK_BATCH
+    cursor = dbapi.cursor()
+    for offset in range(0, len(df), step):
+        batch = df.iloc[offset:offset + step]
+        cursor.executemany(sql, zip(*(db_column(batch[n]) for n in names)))
+
+
 def fresh_table(
         tableClass: DeclarativeMeta
         ,df: pd.DataFrame
+        ,chunk_size: int | None = None
+        ,dbapi: sqlite3.Connection | None = None
         ) -> int:
-    '''Creates new table, expects blank table.
+    '''Bulk loads a freshly created, empty table.
+
+    Rows go straight from the frame's columns to the driver's `executemany` in batches of
+    `chunk_size`, inside one transaction. Secondary indexes are dropped first and rebuilt
+    once after the insert rather than updated row by row.
 
     Args:
         tableClass (DeclarativeMeta): Staged table.
         df (pd.DataFrame): Data to write to table.
+        chunk_size (int | None, optional): Rows converted and inserted per batch. Defaults to BULK_BATCH.
+        dbapi (sqlite3.Connection | None, optional): Open transaction to load within, a new one when None. Defaults to None.
 
     Returns:
         int: Rows changed.
     '''
     log.debug('Building fresh table.')
-    try:    # Try to delete the table and insert it from scratch
-        stmt = insert(tableClass)
-        vals = df.to_dict('records')
-        execute_query(stmt, vals) # Combining of insert() from core w/ session.execute() utilizes ORM layer
-        log.debug('Table built successfully.')
-        return f'{len(vals)} rows added.'
+    table = tableClass.__table__
+    start = time.perf_counter()
+    try:
+        with raw_transaction() if dbapi is None else nullcontext(dbapi) as dbapi:
+            for index in table.indexes:
+                dbapi.execute(f'DROP INDEX IF EXISTS {index.name}')
+            bulk_insert(dbapi, table.name, df, [c.name for c in table.columns if c.name in df.columns], chunk_size)
+            for index in table.indexes:
+                dbapi.execute(str(CreateIndex(index).compile(engine)))
+        elapsed = time.perf_counter() - start
+        log.info(
+            'Bulk loaded %s rows into %s in %.3fs (%.0f rows/s).'
+            ,len(df), table.name, elapsed, len(df) / elapsed if elapsed else float('inf')
+        )
+        return f'{len(df)} rows added.'
     except Exception:
         log.critical('Could not build fresh table.', exc_info = True)
         raise
 
 
+def next_version() -> int:
+    '''Version the next `record_version()` call will write, used to tag its change set.'''
+    with get_session() as session:
+        return (session.scalar(select(func.max(DataVersions.version))) or 0) + 1
+
+
 def delete_expiredRows(
         tableClass: type[Restaurants]
         ,cutoff_years: int
+        ,version: int | None = None
         ) -> int:
     '''Deletes expired rows from child table.
 
     Args:
         tableClass (type[Restaurants]): Staged table.
         cutoff_years (int): Max number of years before cutoff.
+        version (int | None, optional): Data version to record the deletions under in `change_log`. Defaults to None.
 
     Returns:
         int: Rows changed.
     '''
     log.debug('Deleting expired rows.')
-    cutoff_date = dt.now() - td(days = cutoff_years * 365)
+    table = tableClass.__table__.name
+    cutoff_date = (dt.now() - td(days = cutoff_years * 365)).strftime(DATETIME_FORMAT)
     try:
-        with get_session() as session:
-            stmt = select(tableClass).where(tableClass.inspection_date < cutoff_date)
-            restaurants = session.scalars(stmt).all()
-            [session.delete(r) for r in restaurants]
+        with raw_transaction() as dbapi:
+            if version is not None:
+                dbapi.execute(
+                    f"INSERT OR REPLACE INTO {ChangeLog.__tablename__} (version, restaurant_id, op) "
+                    f"SELECT ?, id, 'D' FROM {table} WHERE inspection_date < ?"
+                    ,(version, cutoff_date)
+                )
+            deleted = dbapi.execute(f'DELETE FROM {table} WHERE inspection_date < ?', (cutoff_date,)).rowcount
         log.debug('Rows deleted successfully.')
-        return f'{len(restaurants)} rows deleted.'
+        return f'{deleted} rows deleted.'
     except Exception:
         log.critical('Could not delete expired rows.', exc_info = True)
         raise
@@ -67,28 +231,45 @@ def delete_expiredRows(
 def update_restaurants(
         tableClass: type[Restaurants]
         ,data_df: pd.DataFrame
+        ,version: int | None = None
         ) -> int:
-    '''Updated rows from child table.
+    '''Upserts rows into child table with set-based SQL.
+
+    The frame is bulk inserted into a temporary staging table; one statement records which
+    ids are new or differ from the stored row, and one upsert applies exactly those.
 
     Args:
         tableClass (type[Restaurants]): Staged table.
         data_df (pd.DataFrame): Data for writing to table.
+        version (int | None, optional): Data version to record the changes under in `change_log`. Defaults to None.
 
     Returns:
         int: Rows changed.
     '''
     log.debug('Updating rows.')
+    table = tableClass.__table__
+    names = [c.name for c in table.columns if c.name in data_df.columns]
+    values = [n for n in names if n != 'id']
+    differs = ' OR '.join(f'r.{n} IS NOT i.{n}' for n in values)
     try:
-        with get_session() as session:
-            rows_affected = 0
-            for _, row in data_df.iterrows():
-                stmt = select(tableClass).where(tableClass.id == row['id'])
-                existing_row = session.execute(stmt).scalar_one_or_none()
-                if existing_row is None:
-                    session.add(tableClass(**row.to_dict())) 
-                    rows_affected += 1
+        with raw_transaction() as dbapi:
+            dbapi.execute(f'CREATE TEMP TABLE _incoming AS SELECT {", ".join(names)} FROM {table.name} WHERE 0')
+            bulk_insert(dbapi, '_incoming', data_df, names)
+            if version is not None:
+                dbapi.execute(
+                    f"INSERT OR REPLACE INTO {ChangeLog.__tablename__} (version, restaurant_id, op) "
+                    f"SELECT ?, i.id, CASE WHEN r.id IS NULL THEN 'I' ELSE 'U' END "
+                    f"FROM _incoming AS i LEFT JOIN {table.name} AS r ON r.id = i.id WHERE r.id IS NULL OR {differs}"
+                    ,(version,)
+                )
+            changed = dbapi.execute(
+                f'INSERT INTO {table.name} ({", ".join(names)}) SELECT {", ".join(names)} FROM _incoming WHERE true '
+                f'ON CONFLICT(id) DO UPDATE SET {", ".join(f"{n} = excluded.{n}" for n in values)} '
+                f'WHERE {" OR ".join(f"{n} IS NOT excluded.{n}" for n in values)}'
+            ).rowcount
+            dbapi.execute('DROP TABLE _incoming')
         log.debug('Rows updated successfully.')
-        return f'{rows_affected} rows updated.'
+        return f'{changed} rows updated.'
     except Exception:
         log.critical('Could not update rows.', exc_info = True)
         raise
@@ -111,7 +292,7 @@ def update_population(
     try:    # Try to update table based on borough names to new population values
         with get_session() as session:
             rows_affected = 0
-            for _, r in data_df.iterrows():
+            for r in db_records(data_df):
                 stmt = select(tableClass).where(tableClass.borough == r['borough'])
                 result = session.execute(stmt).scalar_one_or_none()
                 if result:
@@ -124,6 +305,176 @@ def update_population(
         raise
 
 
+def trends_watermark(
+        tableClass: type[InspectionTrends]
+        ) -> str | None:
+    '''Newest month in the trends table, the first one `update_trends()` will replace.
+
+    Args:
+        tableClass (type[InspectionTrends]): Rollup table.
+
+    Returns:
+        str | None: `YYYY-MM`, None before the first load.
+    '''
+    try:
+        with get_session() as session:
+            return session.scalar(select(func.max(tableClass.month)))
+    except OperationalError:
+        return None     # No table yet, the first load creates it
+
+
+def update_trends(
+        tableClass: type[InspectionTrends]
+        ,data_df: pd.DataFrame
+        ) -> int:
+    '''Folds a load's monthly rollup into the trends table without recomputing its history.
+
+    The newest month already stored was still in progress when it was rolled up, so that
+    month and anything after it are replaced from this extract; earlier months are final and
+    their rows are neither read nor rewritten, which lets the table hold more history than
+    the extract's `DATE_CUTOFF` window. The transform stage already starts the rollup at
+    `trends_watermark()`; rows before it, e.g. from an older checkpoint, are dropped here.
+
+    Args:
+        tableClass (type[InspectionTrends]): Rollup table.
+        data_df (pd.DataFrame): Rows from `monthly_inspections()`.
+
+    Returns:
+        int: Rows written.
+    '''
+    log.debug('Updating inspection trends.')
+    table = tableClass.__table__
+    names = [c.name for c in table.columns]
+    try:
+        with raw_transaction() as dbapi:
+            watermark = dbapi.execute(f'SELECT max(month) FROM {table.name}').fetchone()[0]
+            if watermark is not None:
+                data_df = data_df[data_df['month'] >= watermark]
+                dbapi.execute(f'DELETE FROM {table.name} WHERE month >= ?', (watermark,))
+            bulk_insert(dbapi, table.name, data_df, names)
+        log.info(f'Inspection trends updated, {len(data_df)} rows from {watermark or "the first extract"} on.')
+        return len(data_df)
+    except Exception:
+        log.critical('Could not update inspection trends.', exc_info = True)
+        raise
+
+
+def score_inputs(
+        dbapi: sqlite3.Connection | None = None
+        ) -> tuple[pd.DataFrame, pd.DataFrame]:
+    '''Reads what `cuisine_scores()` needs from the loaded tables.
+
+    Args:
+        dbapi (sqlite3.Connection | None, optional): Open transaction to read uncommitted rows from,
+            a new session when None. Defaults to None.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: Restaurant counts per (borough_id, cuisine_id) and
+            each borough's population.
+    '''
+    counts_stmt = (
+        select(Restaurants.borough_id, Restaurants.cuisine_id, func.count(Restaurants.id).label('restaurants'))
+            .group_by(Restaurants.borough_id, Restaurants.cuisine_id)
+    )
+    boroughs_stmt = select(Boroughs.borough_id, Boroughs.population).order_by(Boroughs.borough_id)
+    if dbapi is None:
+        with get_session() as session:
+            counts = session.execute(counts_stmt).all()
+            boroughs = session.execute(boroughs_stmt).all()
+    else:
+        counts = dbapi.execute(str(counts_stmt.compile(engine))).fetchall()
+        boroughs = dbapi.execute(str(boroughs_stmt.compile(engine))).fetchall()
+    return (
+        pd.DataFrame(counts, columns = ['borough_id', 'cuisine_id', 'restaurants'])
+        ,pd.DataFrame(boroughs, columns = ['borough_id', 'population'])
+    )
+
+
+def replace_table(
+        tableClass: DeclarativeMeta
+        ,df: pd.DataFrame
+        ,dbapi: sqlite3.Connection | None = None
+        ) -> int:
+    '''Swaps a derived table's contents for a freshly computed frame in one transaction.
+
+    Args:
+        tableClass (DeclarativeMeta): Derived table.
+        df (pd.DataFrame): Complete new contents.
+        dbapi (sqlite3.Connection | None, optional): Open transaction to write within, a new one when None. Defaults to None.
+
+    Returns:
+        int: Rows written.
+    '''
+    log.debug('Replacing table contents.')
+    table = tableClass.__table__
+    try:
+        with raw_transaction() if dbapi is None else nullcontext(dbapi) as dbapi:
+            dbapi.execute(f'DELETE FROM {table.name}')
+            bulk_insert(dbapi, table.name, df, [c.name for c in table.columns if c.name in df.columns])
+        log.info(f'Replaced {table.name} with {len(df)} rows.')
+        return len(df)
+    except Exception:
+        log.critical('Could not replace table contents.', exc_info = True)
+        raise
+
+
+def record_version(
+        mode: str
+        ,version: int | None = None
+        ) -> int:
+    '''Logs a completed load as a new data version.
+
+    Also writes the version's marker row in `change_log` (`F` after a fresh build, `V` after
+    an update), which is how readers tell a version whose change set is complete.
+
+    Args:
+        mode (str): `fresh` or `update`.
+        version (int | None, optional): Version reserved with `next_version()`, next free one when None.
+
+    Returns:
+        int: The new data version.
+    '''
+    log.debug('Recording data version.')
+    try:
+        with get_session() as session:
+            row_count = session.scalar(select(func.count(Restaurants.id)))
+            entry = DataVersions(version = version, loaded_at = dt.now(), mode = mode, row_count = row_count)
+            session.add(entry)
+            session.flush()
+            version = entry.version
+            session.merge(ChangeLog(version = version, restaurant_id = ChangeLog.MARKER, op = 'F' if mode == 'fresh' else 'V'))
+        log.info(f'Recorded data version {version} ({row_count} restaurants).')
+        return version
+    except Exception:
+        log.critical('Could not record data version.', exc_info = True)
+        raise
+
+
+def compact_change_log(
+        keep: int
+        ) -> int:
+    '''Drops change sets older than the newest `keep` versions.
+
+    Clients whose `since` falls before the retained window are told to reload in full.
+
+    Args:
+        keep (int): Versions whose change sets are kept.
+
+    Returns:
+        int: Rows deleted.
+    '''
+    try:
+        with get_session() as session:
+            latest = session.scalar(select(func.max(DataVersions.version))) or 0
+            deleted = session.execute(delete(ChangeLog).where(ChangeLog.version <= latest - keep)).rowcount
+        if deleted:
+            log.info(f'Compacted change log, {deleted} rows at or below version {latest - keep} removed.')
+        return deleted
+    except Exception:
+        log.critical('Could not compact change log.', exc_info = True)
+        raise
+
+
 # EOF
 
 if __name__ == '__main__':
@@ -0,0 +1,208 @@
+'''Declarative schemas for the source datasets.
+
+Each extract is checked and coerced in one vectorized pass as soon as it arrives:
+missing columns fail immediately, values are cast to compact dtypes (int32 ids, float32
+coordinates, categorical enums), out-of-range and disallowed null rows are rejected and
+counted, and a batch whose rejected share exceeds its budget fails before any transform
+or database work starts.
+'''
+# Import dependencies
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+
+# Import config file
+import config as C
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+# NYC bounding box, generous enough for every borough's shoreline
+NYC_LAT = (40.47, 40.93)
+NYC_LNG = (-74.27, -73.68)
+
+INT32 = (np.iinfo(np.int32).min, np.iinfo(np.int32).max)
+
+# Cheap checks run first so a broken batch fails before dates and strings are parsed
+CHECK_ORDER = {'int32': 0, 'float32': 0, 'category': 1, 'string': 2, 'datetime': 3}
+
+
+class SchemaError(ValueError):
+    '''Raised when an extract cannot be trusted and the run should stop early.'''
+
+
+@dataclass(frozen = True)
+class Field():
+    '''
+    One expected column.
+
+    Attributes:
+        name (str): Column name after the extract's aliases.
+        dtype (str): `int32`, `float32`, `datetime`, `category` or `string`.
+        nulls (str): `drop` rejects null rows, `fail` fails the batch, `keep` allows them.
+        bounds (tuple[float, float] | None): Inclusive numeric range.
+        categories (tuple[str, ...] | None): Closed set for `category` columns, other values are rejected.
+    '''
+    name: str
+    dtype: str
+    nulls: str = 'drop'
+    bounds: tuple[float, float] | None = None
+    categories: tuple[str, ...] | None = None
+
+
+@dataclass(frozen = True)
+class Schema():
+    '''
+    Expected shape of one source dataset.
+
+    Attributes:
+        name (str): Dataset name.
+        fields (tuple[Field, ...]): Columns kept, in output order.
+        max_reject (float): Share of rows that may be rejected before the batch fails.
+    '''
+    name: str
+    fields: tuple[Field, ...]
+    max_reject: float = 0.05
+
+
+@dataclass
+class SchemaReport():
+    '''Outcome of `apply_schema()`, rejected counts are per field and may overlap.'''
+    dataset: str
+    rows_in: int
+    rows_out: int
+    rejected: dict[str, int] = field(default_factory = dict)
+
+    def __str__(self) -> str:
+        detail = ', '.join(f'{k}={v}' for k, v in self.rejected.items() if v) or 'none'
+        return f'{self.dataset}: {self.rows_out}/{self.rows_in} rows kept, rejected by field: {detail}'
+
+
+SCHEMAS = {
+    'dohmh': Schema(
+        'dohmh'
+        ,(
+            Field('id', 'int32', nulls = 'fail', bounds = (1, INT32[1]))
+            ,Field('name', 'string')
+            ,Field('borough', 'category', categories = C.REF_SEQS['BOROUGHS'])    # DOHMH uses '0' for unknown
+            ,Field('cuisine', 'category')
+            ,Field('inspection_date', 'datetime')
+            ,Field('lat', 'float32', bounds = NYC_LAT)  # Ungeocoded inspections come through as 0; float32 keeps ~0.5 m
+            ,Field('lng', 'float32', bounds = NYC_LNG)
+        )
+        ,max_reject = 0.25
+    )
+    ,'fastfood': Schema(
+        'fastfood'
+        ,(Field('name', 'string'),)
+        ,max_reject = 0.5
+    )
+    ,'population': Schema(
+        'population'
+        ,(
+            Field('borough', 'category', nulls = 'fail', categories = C.REF_SEQS['BOROUGHS'])
+            ,Field('population', 'int32', nulls = 'fail', bounds = (0, INT32[1]))
+        )
+        ,max_reject = 0.0
+    )
+}
+
+
+def coerce(
+        series: pd.Series
+        ,spec: Field
+        ) -> pd.Series:
+    '''Casts a column to its compact dtype, turning unparseable values into nulls.
+
+    Args:
+        series (pd.Series): Raw column.
+        spec (Field): Column schema.
+
+    Returns:
+        pd.Series: Coerced column.
+    '''
+    if spec.dtype in ('int32', 'float32'):
+        values = pd.to_numeric(series, errors = 'coerce')
+        if spec.dtype == 'int32':
+            values = values.where((values % 1 == 0) & values.between(*INT32))    # Fractions and overflow are unparseable
+        return values
+    if spec.dtype == 'datetime':
+        return pd.to_datetime(series, errors = 'coerce', format = 'ISO8601')
+    if spec.dtype == 'category':
+        return series.astype(pd.CategoricalDtype(spec.categories) if spec.categories else 'category')
+    if spec.dtype == 'string':
+        return series.where(series.isna(), series.astype(str))
+    raise ValueError(f'Unknown schema dtype {spec.dtype!r}.')
+
+
+def finalize(
+        series: pd.Series
+        ,spec: Field
+        ) -> pd.Series:
+    # Narrow numeric columns once rejected rows are gone
+    if spec.dtype == 'int32':
+        return series.astype('Int32' if series.isna().any() else np.int32)
+    if spec.dtype == 'float32':
+        return series.astype(np.float32)
+    return series
+
+
+def apply_schema(
+        df: pd.DataFrame
+        ,schema: Schema
+        ) -> tuple[pd.DataFrame, SchemaReport]:
+    '''Validates and coerces an extract against its schema.
+
+    Args:
+        df (pd.DataFrame): Raw extract.
+        schema (Schema): Expected shape.
+
+    Raises:
+        SchemaError: Missing columns, nulls where `nulls = 'fail'`, or too many rejected rows.
+
+    Returns:
+        tuple[pd.DataFrame, SchemaReport]: Coerced frame with only the schema's columns, and the report.
+    '''
+    missing = [f.name for f in schema.fields if f.name not in df.columns]
+    if missing:
+        raise SchemaError(f'{schema.name}: missing columns {missing}, got {list(df.columns)}.')
+
+    n_rows = len(df)
+    keep = np.ones(n_rows, dtype = bool)
+    columns, rejected = {}, {}
+    for spec in sorted(schema.fields, key = lambda f: CHECK_ORDER[f.dtype]):
+        raw = df[spec.name]
+        raw_null = raw.isna().to_numpy()
+        if spec.nulls == 'fail' and raw_null.any():
+            raise SchemaError(f'{schema.name}: {int(raw_null.sum())} null values in required column {spec.name!r}.')
+        values = coerce(raw, spec)
+        null = values.isna().to_numpy()
+        bad = null & ~raw_null  # Unparseable or outside the category set
+        if spec.bounds is not None:
+            bad |= ~null & ~values.between(*spec.bounds).to_numpy()
+        if spec.nulls == 'drop':
+            bad |= raw_null
+        elif spec.nulls == 'fail' and bad.any():
+            raise SchemaError(f'{schema.name}: {int(bad.sum())} invalid values in required column {spec.name!r}.')
+        rejected[spec.name] = int(bad.sum())
+        if n_rows and rejected[spec.name] / n_rows > schema.max_reject:
+            raise SchemaError(f'{schema.name}: {rejected[spec.name]}/{n_rows} rows invalid in column {spec.name!r}.')    # No need to check the rest
+        keep &= ~bad
+        columns[spec.name] = values
+
+    kept = int(keep.sum())
+    report = SchemaReport(schema.name, n_rows, kept, {f.name: rejected[f.name] for f in schema.fields})
+    if n_rows and (n_rows - kept) / n_rows > schema.max_reject:
+        raise SchemaError(f'Rejected share above {schema.max_reject:.0%}. {report}')
+    out = pd.DataFrame({f.name: columns[f.name] for f in schema.fields}).loc[keep]
+    out = out.assign(**{f.name: finalize(out[f.name], f) for f in schema.fields}).reset_index(drop = True)
+    log.info('Schema check %s.', report)
+    return out, report
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
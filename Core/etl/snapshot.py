@@ -0,0 +1,162 @@
+# Import dependencies
+import os
+import shutil
+import zipfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from sqlalchemy import select
+
+# Import subpackage dependencies
+from Core.database import engine, Boroughs, Cuisines, Restaurants
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+def snapshot_name(version: int) -> str:
+    '''Directory/archive stem for a given data version.
+
+    Args:
+        version (int): Pipeline data version.
+
+    Returns:
+        str: Stem such as `v000012`.
+    '''
+    return f'v{version:06d}'
+
+
+def curated_frame() -> pd.DataFrame:
+    '''Reads the curated restaurants table joined to its reference tables.
+
+    Returns:
+        pd.DataFrame: Denormalized restaurants with borough population and cuisine names.
+    '''
+    stmt = (
+        select(
+            Restaurants.id
+            ,Restaurants.name
+            ,Boroughs.borough
+            ,Boroughs.population
+            ,Cuisines.cuisine
+            ,Restaurants.inspection_date
+            ,Restaurants.lat
+            ,Restaurants.lng
+        ).join(
+            Boroughs
+        ).join(
+            Cuisines
+        ).order_by(
+            Restaurants.id
+        )
+    )
+    df = pd.read_sql(stmt, engine, parse_dates = ['inspection_date'])
+    return df.astype({'lat': 'float64', 'lng': 'float64', 'cuisine': 'category'})   # Categorical -> dictionary-encoded in Arrow
+
+
+def export_snapshot(
+        version: int
+        ,snapshot_dir: Path
+        ,keep: int = 3
+        ) -> Path:
+    '''Writes a versioned Parquet snapshot partitioned by borough, plus a zip for download.
+
+    Layout:
+        <snapshot_dir>/v000012/borough=<name>/*.parquet
+        <snapshot_dir>/v000012.zip
+        <snapshot_dir>/LATEST       name of the current snapshot
+
+    A version is staged under temporary names, renamed to its own versioned names and only
+    then made current by swapping `LATEST`, so the published snapshot is never missing or
+    half-written. A version whose archive already exists is not written again.
+
+    Args:
+        version (int): Pipeline data version.
+        snapshot_dir (Path): Root directory for snapshots.
+        keep (int, optional): Number of most recent snapshots to retain, at least 1. Defaults to 3.
+
+    Raises:
+        ValueError: `keep` is below 1.
+
+    Returns:
+        Path: Zip archive of the snapshot.
+    '''
+    log.debug('Exporting Parquet snapshot.')
+    if keep < 1:
+        raise ValueError(f'keep must be at least 1, got {keep}.')
+    try:
+        snapshot_dir.mkdir(parents = True, exist_ok = True)
+        name = snapshot_name(version)
+        final_dir = snapshot_dir / name
+        archive = snapshot_dir / f'{name}.zip'
+        rows = None
+        if not archive.exists():
+            # The archive is renamed last, so a directory without one was never published
+            shutil.rmtree(final_dir, ignore_errors = True)
+            staging = snapshot_dir / f'.{name}.tmp'
+            shutil.rmtree(staging, ignore_errors = True)
+
+            table = pa.Table.from_pandas(curated_frame(), preserve_index = False)
+            pq.write_to_dataset(
+                table
+                ,root_path = staging
+                ,partition_cols = ['borough']
+                ,compression = 'zstd'
+                ,use_dictionary = ['cuisine']
+                ,basename_template = 'part-{i}.parquet'
+            )
+
+            # Archive is stored (not deflated), the Parquet pages are already compressed
+            archive_tmp = snapshot_dir / f'.{name}.zip.tmp'
+            with zipfile.ZipFile(archive_tmp, 'w', compression = zipfile.ZIP_STORED) as zf:
+                for file in sorted(staging.rglob('*.parquet')):
+                    zf.write(file, Path(name) / file.relative_to(staging))
+            os.replace(staging, final_dir)
+            os.replace(archive_tmp, archive)
+            rows = table.num_rows
+
+        # Switch the pointer last, readers follow it to a complete snapshot
+        pointer = snapshot_dir / '.LATEST.tmp'
+        pointer.write_text(name)
+        os.replace(pointer, snapshot_dir / 'LATEST')
+        prune_snapshots(snapshot_dir, keep)
+        log.info(f'Snapshot {name} written with {rows} rows.' if rows is not None else f'Snapshot {name} already written, republished.')
+        return archive
+    except Exception:
+        log.critical('Could not export Parquet snapshot.', exc_info = True)
+        raise
+
+
+def prune_snapshots(
+        snapshot_dir: Path
+        ,keep: int
+        ) -> int:
+    '''Removes all but the newest `keep` snapshots, never the one `LATEST` names.
+
+    Args:
+        snapshot_dir (Path): Root directory for snapshots.
+        keep (int): Number of snapshots to retain, at least 1.
+
+    Raises:
+        ValueError: `keep` is below 1.
+
+    Returns:
+        int: Snapshots removed.
+    '''
+    if keep < 1:
+        raise ValueError(f'keep must be at least 1, got {keep}.')
+    pointer = snapshot_dir / 'LATEST'
+    current = pointer.read_text().strip() if pointer.exists() else None
+    stale = [a for a in sorted(snapshot_dir.glob('v*.zip'))[:-keep] if a.stem != current]
+    for archive in stale:
+        archive.unlink(missing_ok = True)   # Archive first, a directory without one is never served
+        shutil.rmtree(archive.with_suffix(''), ignore_errors = True)
+    return len(stale)
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
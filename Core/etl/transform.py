@@ -1,6 +1,13 @@
 # Import dependencies
+import tempfile
+import numpy as np
 import pandas as pd
-from collections.abc import Callable
+import pyarrow as pa
+import pyarrow.compute as pc
+from pathlib import Path
+from itertools import repeat
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
 
 # Bring in custom logger
 from Core.log_config import init_log
@@ -55,6 +62,7 @@ def clean_df(
         df: pd.DataFrame
         ,junkFood_names: list[str]
         ,ethnic_cuisines: list[str]
+        ,keep_index: bool = False
     ) -> pd.DataFrame:
     '''Cleanses DataFrame using predefined metrics.
 
@@ -62,6 +70,7 @@ def clean_df(
         df (pd.DataFrame): Data to be cleaned.
         junkFood_names (list[str]): Static list of names to remove
         ethnic_cuisines (list[str]): Static list of cuisines to keep.
+        keep_index (bool, optional): Keep the incoming index instead of resetting it. Defaults to False.
 
     Returns:
         pd.DataFrame: Cleaned dataframe.
@@ -71,11 +80,11 @@ def clean_df(
     return (
         df
             .assign(inspection_date = pd.to_datetime(df['inspection_date']))    # Convert to datetime
-            .sort_values('inspection_date', ascending = False)  # Sort by inspection date
+            .sort_values('inspection_date', ascending = False, kind = 'mergesort')  # Stable sort by inspection date so ties keep source order
             .drop_duplicates(subset = ['id'], keep = 'first')   # Drop duplicate locations keeping most recent
             .loc[:, ['id', 'name', 'borough', 'cuisine', 'inspection_date', 'lat', 'lng']]  # Re-arrange columns
             .pipe(lambda x: x[~x['name'].isin(junkFood_names) & x['cuisine'].isin(ethnic_cuisines)])    # Drop by static lists
-            .reset_index(drop = True)
+            .pipe(lambda x: x if keep_index else x.reset_index(drop = True))
     )
 
 
@@ -102,6 +111,240 @@ def normalize_table(
     return denorm_df.rename(columns = {target_col: f'{target_col}_id'})
 
 
+def id_dtypes(
+        borough_map: dict[str, str]
+        ,cuisine_map: dict[str, str]
+    ) -> dict[str, pd.CategoricalDtype]:
+    '''Fixed categorical dtypes for the normalized key columns, so every path yields the same frame.'''
+    return {
+        'borough_id': pd.CategoricalDtype(list(borough_map.values()))
+        ,'cuisine_id': pd.CategoricalDtype(list(cuisine_map.values()))
+    }
+
+
+def transform_restaurants(
+        df: pd.DataFrame
+        ,junkFood_names: list[str]
+        ,ethnic_cuisines: Iterable[str]
+        ,borough_map: dict[str, str]
+        ,cuisine_map: dict[str, str]
+        ,keep_index: bool = False
+    ) -> pd.DataFrame:
+    '''Cleans and normalizes the DOHMH extract into the `restaurants` table shape.
+
+    Args:
+        df (pd.DataFrame): Raw DOHMH extract.
+        junkFood_names (list[str]): Static list of names to remove.
+        ethnic_cuisines (Iterable[str]): Static list of cuisines to keep.
+        borough_map (dict[str, str]): Borough mapping from `create_dict()`.
+        cuisine_map (dict[str, str]): Cuisine mapping from `create_dict()`.
+        keep_index (bool, optional): Keep the incoming index instead of resetting it. Defaults to False.
+
+    Returns:
+        pd.DataFrame: Normalized restaurants table.
+    '''
+    main_df = clean_df(df, junkFood_names, list(ethnic_cuisines), keep_index)
+    main_df = normalize_table(main_df, borough_map, 'borough')
+    main_df = normalize_table(main_df, cuisine_map, 'cuisine')
+    return main_df.astype(id_dtypes(borough_map, cuisine_map))
+
+
+def monthly_inspections(
+        df: pd.DataFrame
+        ,junkFood_names: list[str]
+        ,ethnic_cuisines: Iterable[str]
+        ,borough_map: dict[str, str]
+        ,cuisine_map: dict[str, str]
+        ,start: pd.Timestamp | None = None
+    ) -> pd.DataFrame:
+    '''Rolls the raw DOHMH extract up to inspection and restaurant counts per month, borough and cuisine.
+
+    Uses every inspection in the extract, not just the latest one per restaurant, with the same
+    name and cuisine filters as the `restaurants` table. The extract has one row per violation,
+    so an inspection is a distinct (restaurant, inspection date) pair.
+
+    Args:
+        df (pd.DataFrame): Raw DOHMH extract.
+        junkFood_names (list[str]): Static list of names to remove.
+        ethnic_cuisines (Iterable[str]): Static list of cuisines to keep.
+        borough_map (dict[str, str]): Borough mapping from `create_dict()`.
+        cuisine_map (dict[str, str]): Cuisine mapping from `create_dict()`.
+        start (pd.Timestamp | None, optional): Drop inspections before this, so a month the
+            extract only partly covers is not rolled up. Defaults to None.
+
+    Returns:
+        pd.DataFrame: `inspection_trends` rows, ordered by month, borough_id and cuisine_id.
+    '''
+    log.debug('Rolling up monthly inspections.')
+    inspections = (
+        df
+            .loc[~df['name'].isin(junkFood_names) & df['cuisine'].isin(list(ethnic_cuisines)), ['id', 'borough', 'cuisine', 'inspection_date']]
+            .assign(inspection_date = lambda x: pd.to_datetime(x['inspection_date']))
+            .pipe(lambda x: x if start is None else x[x['inspection_date'] >= start])
+            .drop_duplicates(subset = ['id', 'inspection_date'])    # Collapse violation rows to one per inspection
+    )
+    return (
+        pd.DataFrame({
+            'month': inspections['inspection_date'].dt.to_period('M').astype(str)
+            ,'borough_id': inspections['borough'].map(borough_map)
+            ,'cuisine_id': inspections['cuisine'].map(cuisine_map)
+            ,'id': inspections['id']
+        })
+            .dropna(subset = ['borough_id', 'cuisine_id'])  # Unmapped boroughs have no series to join
+            .astype({'borough_id': str, 'cuisine_id': str})     # Categorical keys would group every unseen combination
+            .groupby(['month', 'borough_id', 'cuisine_id'], sort = True, observed = True)
+            .agg(inspections = ('id', 'size'), restaurants = ('id', 'nunique'))
+            .reset_index()
+    )
+
+
+def cuisine_scores(
+        counts: pd.DataFrame
+        ,boroughs: pd.DataFrame
+    ) -> pd.DataFrame:
+    '''Scores every cuisine in every borough from one restaurant count matrix.
+
+    Counts are pivoted to a cuisine x borough matrix and each score is one broadcast NumPy
+    expression over it, so the whole table costs a handful of array operations per refresh.
+
+    Args:
+        counts (pd.DataFrame): `borough_id`, `cuisine_id` and `restaurants`, one row per pair present.
+        boroughs (pd.DataFrame): `borough_id` and `population`.
+
+    Returns:
+        pd.DataFrame: `cuisine_scores` rows, with a zero-count row for each borough a cuisine is
+            missing from and NaN where a score is undefined.
+    '''
+    log.debug('Computing cuisine density scores.')
+    matrix = (
+        counts
+            .pivot_table(index = 'cuisine_id', columns = 'borough_id', values = 'restaurants', aggfunc = 'sum', fill_value = 0, observed = True)
+            .reindex(columns = boroughs['borough_id'], fill_value = 0)
+    )
+    n = matrix.to_numpy(dtype = np.float64)     # Cuisines down, boroughs across
+    population = boroughs.set_index('borough_id')['population'].reindex(matrix.columns).to_numpy(dtype = np.float64)
+    borough_totals = n.sum(axis = 0)
+    cuisine_totals = n.sum(axis = 1, keepdims = True)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        per_100k = n / population * 100_000
+        location_quotient = (n / borough_totals) / (cuisine_totals / n.sum())
+        citywide_percent = n / cuisine_totals * 100
+    rows, cols = n.shape
+    return pd.DataFrame({
+        'borough_id': np.tile(matrix.columns.to_numpy(dtype = object), rows)
+        ,'cuisine_id': np.repeat(matrix.index.to_numpy(dtype = object), cols)
+        ,'restaurants': n.ravel().astype(np.int64)
+        ,'per_100k': np.where(np.isfinite(per_100k), per_100k, np.nan).ravel()
+        ,'location_quotient': np.where(np.isfinite(location_quotient), location_quotient, np.nan).ravel()
+        ,'citywide_percent': citywide_percent.ravel()
+    })
+
+
+def write_ipc(
+        table: pa.Table
+        ,path: Path
+    ) -> Path:
+    '''Writes an Arrow table to an uncompressed IPC file so readers can memory-map it.
+
+    Args:
+        table (pa.Table): Data to write.
+        path (Path): Destination file.
+
+    Returns:
+        Path: Written file.
+    '''
+    with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+def transform_shard(
+        source: Path
+        ,shard: int
+        ,junkFood_names: list[str]
+        ,ethnic_cuisines: list[str]
+        ,borough_map: dict[str, str]
+        ,cuisine_map: dict[str, str]
+    ) -> Path:
+    '''Worker routine for `parallel_transform()`.
+
+    Memory-maps the staged Arrow IPC file, keeps only this shard's rows and writes the
+    transformed shard back as IPC, so no full-frame copies cross the process boundary.
+
+    Args:
+        source (Path): Staged Arrow IPC file with `_row` and `_shard` columns.
+        shard (int): Shard number handled by this worker.
+        junkFood_names (list[str]): Static list of names to remove.
+        ethnic_cuisines (list[str]): Static list of cuisines to keep.
+        borough_map (dict[str, str]): Borough mapping from `create_dict()`.
+        cuisine_map (dict[str, str]): Cuisine mapping from `create_dict()`.
+
+    Returns:
+        Path: Arrow IPC file holding the transformed shard.
+    '''
+    with pa.memory_map(str(source), 'r') as src:
+        table = pa.ipc.open_file(src).read_all()    # Zero-copy view over the mapped file
+        mask = pc.equal(table.column('_shard'), shard)
+        shard_df = table.filter(mask).drop_columns(['_shard']).to_pandas().set_index('_row')
+    result = transform_restaurants(shard_df, junkFood_names, ethnic_cuisines, borough_map, cuisine_map, keep_index = True)
+    out = source.with_name(f'shard_{shard}.arrow')
+    return write_ipc(pa.Table.from_pandas(result.reset_index(), preserve_index = False), out)
+
+
+def parallel_transform(
+        df: pd.DataFrame
+        ,junkFood_names: list[str]
+        ,ethnic_cuisines: Iterable[str]
+        ,borough_map: dict[str, str]
+        ,cuisine_map: dict[str, str]
+        ,workers: int
+    ) -> pd.DataFrame:
+    '''Runs `transform_restaurants()` over `id`-hashed shards in a process pool.
+
+    Every duplicate of an `id` lands in the same shard, so per-shard de-duplication is exact.
+    Shards are merged back on (inspection_date desc, source row) which reproduces the serial
+    path's stable ordering, making the output identical to `transform_restaurants()`.
+
+    Args:
+        df (pd.DataFrame): Raw DOHMH extract.
+        junkFood_names (list[str]): Static list of names to remove.
+        ethnic_cuisines (Iterable[str]): Static list of cuisines to keep.
+        borough_map (dict[str, str]): Borough mapping from `create_dict()`.
+        cuisine_map (dict[str, str]): Cuisine mapping from `create_dict()`.
+        workers (int): Number of worker processes and shards.
+
+    Returns:
+        pd.DataFrame: Normalized restaurants table.
+    '''
+    log.debug(f'Transforming in parallel across {workers} workers.')
+    shard_ids = pd.util.hash_pandas_object(df['id'], index = False).to_numpy() % workers
+    staged = df.assign(_row = np.arange(len(df), dtype = np.int64), _shard = shard_ids.astype(np.int32))
+    with tempfile.TemporaryDirectory(prefix = 'curryscorer_transform_') as tmp:
+        source = write_ipc(pa.Table.from_pandas(staged, preserve_index = False), Path(tmp) / 'source.arrow')
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            paths = list(pool.map(
+                transform_shard
+                ,repeat(source)
+                ,range(workers)
+                ,repeat(list(junkFood_names))
+                ,repeat(list(ethnic_cuisines))
+                ,repeat(borough_map)
+                ,repeat(cuisine_map)
+            ))
+        shards = []
+        for path in paths:
+            with pa.OSFile(str(path), 'rb') as src:
+                shards.append(pa.ipc.open_file(src).read_pandas())
+    # Deterministic merge matching the serial sort order
+    return (
+        pd.concat(shards, ignore_index = True)
+            .sort_values(['inspection_date', '_row'], ascending = [False, True], kind = 'mergesort')
+            .drop(columns = '_row')
+            .astype(id_dtypes(borough_map, cuisine_map))    # Shard categories differ, align them again
+            .reset_index(drop = True)
+    )
+
+
 # EOF
 
 if __name__ == '__main__':
@@ -1,5 +1,238 @@
 # Import dependencies
+import os
+import json
+import queue
+import atexit
 import logging as log
+import logging.handlers as log_handlers
+from pathlib import Path
+
+
+# Shared formatter settings
+LOG_FORMAT = '%(asctime)s %(name)s: %(levelname)s - %(message)s'
+DATE_FORMAT = '%m-%d-%y %H:%M:%S'
+
+# One bounded queue and one background writer shared by every logger in the process
+QUEUE_SIZE = 10_000
+_queue: queue.Queue = queue.Queue(maxsize = QUEUE_SIZE)
+_state: dict = {'listener': None, 'handlers': None, 'settings': None, 'fallback': None}
+
+
+def log_mode() -> str:
+    '''Logging mode from the `LOG_MODE` environment variable.
+
+    Returns:
+        str: `queue` (default) for the shared background writer, `sync` for per-logger handlers.
+    '''
+    return os.environ.get('LOG_MODE', 'queue').lower()
+
+
+class JsonFormatter(log.Formatter):
+    '''Formats records as one JSON object per line.'''
+    def format(self, record: log.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, DATE_FORMAT)
+            ,'logger': record.name
+            ,'level': record.levelname
+            ,'msg': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class DeferredQueueHandler(log_handlers.QueueHandler):
+    '''Enqueues records untouched so message formatting happens on the writer thread.
+
+    When the queue is full (writer not started yet, or falling behind) the record is written
+    synchronously to the console instead of growing the backlog without limit.
+    '''
+    def prepare(self, record: log.LogRecord) -> log.LogRecord:
+        return record
+
+    def enqueue(self, record: log.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if _state['fallback'] is None:
+                _state['fallback'] = log.StreamHandler()
+                _state['fallback'].setFormatter(log.Formatter(LOG_FORMAT, datefmt = DATE_FORMAT))
+            _state['fallback'].handle(record)
+
+
+class BoundedQueueListener(log_handlers.QueueListener):
+    '''Waits for room for the stop sentinel, the writer thread is still draining the queue.'''
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def process_path(path: Path | str) -> Path:
+    '''Per-process log file, `app.log` becomes `app.<pid>.log`.
+
+    Rotating handlers in separate processes (gunicorn workers, the ETL) cannot coordinate a
+    rename of one shared file, so each process rotates its own.
+
+    Args:
+        path (Path | str): Shared log file name.
+
+    Returns:
+        Path: File name carrying the current process id.
+    '''
+    path = Path(path)
+    return path.with_name(f'{path.stem}.{os.getpid()}{path.suffix}')
+
+
+def prune_process_logs(path: Path | str) -> int:
+    '''Deletes the per-process files, backups included, of processes that have exited.
+
+    Every worker restart and pipeline run starts a new `app.<pid>.log` set, so without this
+    the rotation bound applies per process but the directory grows forever. Only POSIX can
+    probe a pid safely, and only processes on this host are seen as alive.
+
+    Args:
+        path (Path | str): Shared log file name the per-process files derive from.
+
+    Returns:
+        int: Files deleted.
+    '''
+    if os.name != 'posix':
+        return 0
+    path = Path(path)
+    removed = 0
+    for file in path.parent.glob(f'{path.stem}.*{path.suffix}*'):
+        pid = file.name[len(path.stem) + 1:].split('.', 1)[0]
+        if not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            os.kill(int(pid), 0)
+            continue    # Still running
+        except PermissionError:
+            continue    # Running under another user
+        except ProcessLookupError:
+            pass
+        file.unlink(missing_ok = True)
+        removed += 1
+    return removed
+
+
+def build_handlers(
+        path: Path | str | None = 'app.log'
+        ,rotate: str | None = None
+        ,max_bytes: int = 5 * 2**20
+        ,backups: int = 5
+        ,when: str = 'midnight'
+        ,json_lines: bool = False
+        ) -> list[log.Handler]:
+    '''Creates the console and file handlers used by the writer thread.
+
+    Args:
+        path (Path | str | None, optional): Log file, None for console only. Defaults to `app.log`.
+        rotate (str | None, optional): `size` or `time` to rotate a per-process file (see
+            `process_path()`), `watched` to append to the shared file and reopen it after an
+            external rotation (logrotate), or None for no rotation. Defaults to None.
+        max_bytes (int, optional): Size threshold for `size` rotation. Defaults to 5 MiB.
+        backups (int, optional): Rotated files kept. Defaults to 5.
+        when (str, optional): Interval for `time` rotation. Defaults to `midnight`.
+        json_lines (bool, optional): Write the file as JSON lines. Defaults to False.
+
+    Returns:
+        list[log.Handler]: Configured handlers.
+    '''
+    formatter = log.Formatter(LOG_FORMAT, datefmt = DATE_FORMAT)
+    ch = log.StreamHandler()
+    ch.setFormatter(formatter)
+    handlers = [ch]
+    if path:
+        Path(path).parent.mkdir(parents = True, exist_ok = True)
+        if rotate == 'size':
+            fh = log_handlers.RotatingFileHandler(process_path(path), maxBytes = max_bytes, backupCount = backups, encoding = 'utf-8')
+        elif rotate == 'time':
+            fh = log_handlers.TimedRotatingFileHandler(process_path(path), when = when, backupCount = backups, encoding = 'utf-8')
+        elif rotate == 'watched':
+            fh = log_handlers.WatchedFileHandler(path, encoding = 'utf-8')
+        else:
+            fh = log.FileHandler(path, encoding = 'utf-8')
+        fh.setFormatter(JsonFormatter() if json_lines else formatter)
+        handlers.append(fh)
+    return handlers
+
+
+def start_listener(handlers: list[log.Handler]) -> log_handlers.QueueListener:
+    '''(Re)starts the shared background writer with the given handlers.
+
+    Args:
+        handlers (list[log.Handler]): Handlers the writer thread dispatches to.
+
+    Returns:
+        log_handlers.QueueListener: Running listener.
+    '''
+    old = _state['listener']
+    if old is not None:
+        old.stop()  # Drains anything already queued through the old handlers
+        for h in _state['handlers']:
+            h.close()
+    listener = BoundedQueueListener(_queue, *handlers, respect_handler_level = True)
+    listener.start()
+    _state['listener'] = listener
+    _state['handlers'] = handlers
+    return listener
+
+
+def configure_logging(settings: dict) -> None:
+    '''Points the shared writer at its final destination once storage paths are known.
+
+    Args:
+        settings (dict): `LOG_CONFIG` style dictionary with `PATH`, `ROTATE`, `MAX_BYTES`,
+            `BACKUPS`, `WHEN` and `JSON` keys.
+    '''
+    if log_mode() != 'queue':
+        return None
+    _state['settings'] = settings
+    if settings.get('PATH') and settings.get('ROTATE') in ('size', 'time'):
+        prune_process_logs(settings['PATH'])
+    start_listener(build_handlers(
+        settings.get('PATH')
+        ,settings.get('ROTATE')
+        ,settings.get('MAX_BYTES', 5 * 2**20)
+        ,settings.get('BACKUPS', 5)
+        ,settings.get('WHEN', 'midnight')
+        ,settings.get('JSON', False)
+    ))
+
+
+def log_to(path: Path | str) -> None:
+    '''Moves the writer's file to `path`, keeping the other settings, when it writes elsewhere.
+
+    Args:
+        path (Path | str): Log file for the rest of this process, e.g. a pipeline run's.
+    '''
+    settings = _state['settings']
+    if log_mode() != 'queue' or settings is None or Path(settings.get('PATH') or '') == Path(path):
+        return None
+    configure_logging({**settings, 'PATH': Path(path)})
+
+
+def stop_logging() -> None:
+    '''Flushes and stops the background writer.'''
+    if _state['listener'] is None and not _queue.empty():
+        start_listener(build_handlers())    # Never configured, flush to the default destinations
+    if _state['listener'] is not None:
+        _state['listener'].stop()
+        _state['listener'] = None
+
+
+# Forked workers (e.g. gunicorn with preload) do not inherit the writer thread
+def _restart_in_child() -> None:
+    _queue.__init__(QUEUE_SIZE)     # Fresh locks, records still queued are the parent's to write
+    if _state['listener'] is not None:
+        _state['listener'] = None
+        configure_logging(_state['settings'])
+
+
+atexit.register(stop_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child = _restart_in_child)
+
 
 def init_log(
         name: str = None
@@ -8,35 +241,42 @@ def init_log(
         ) -> log.Logger:
     '''Creates centralized logger.
 
+    In `queue` mode (default, see `LOG_MODE`) every logger gets one non-blocking
+    `QueueHandler` feeding a single background writer through a bounded queue, and the
+    file is the one set by `configure_logging()` or `log_to()`. In `sync` mode each logger gets its
+    own console and file handlers as before.
+
     Args:
         name (str, optional): Defaults to None.
         log_level (int, optional): Defaults to `log.INFO`. Levels are 0, 10, 20, 30, 40, 50.
-        file (str, optional): Defaults to `app.log`
+        file (str, optional): Log file in `sync` mode, see `log_to()` for `queue` mode. Defaults to `app.log`
 
     Returns:
-        log.Logger: Master logger for project. 
+        log.Logger: Master logger for project.
     '''
     # Create or get the logger
     logger = log.getLogger(name)
-    
+
     # Avoid adding handlers multiple times if already configured
     if logger.hasHandlers():
         return logger
 
-    # Set the log level to INFO
+    # Set the log level, disabled levels are rejected before any record is built
     logger.setLevel(log_level)
-    
+
+    if log_mode() == 'queue':
+        # Records buffer in the queue until configure_logging() starts the writer, overflow goes to the console
+        logger.addHandler(DeferredQueueHandler(_queue))
+        return logger
+
     # Create a stream handler (logs to console)
     ch = log.StreamHandler()
     ch.setLevel(log_level)
-    
+
     # Create a formatter with date/time, logger name, level, and message
-    formatter = log.Formatter(
-        '%(asctime)s %(name)s: %(levelname)s - %(message)s',
-        datefmt='%m-%d-%y %H:%M:%S'
-    )
+    formatter = log.Formatter(LOG_FORMAT, datefmt = DATE_FORMAT)
     ch.setFormatter(formatter)
-    
+
     # Add the handler to the logger
     logger.addHandler(ch)
 
@@ -46,11 +286,11 @@ def init_log(
         fh.setLevel(log_level)
         fh.setFormatter(formatter)
         logger.addHandler(fh)
-    
+
     return logger
 
 
 # EOF
 
 if __name__ == '__main__':
-    print('This module is intended to be imported, not run directly.')
\ No newline at end of file
+    print('This module is intended to be imported, not run directly.')
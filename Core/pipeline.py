@@ -0,0 +1,271 @@
+# Import dependencies
+import time
+import pandas as pd
+from pathlib import Path
+from collections.abc import Iterable
+from datetime import datetime as dt, timedelta as td
+
+# Import Directory Modules for Core Building
+from .etl import extract as E, transform as T, load as L, snapshot as S, schema as SC, checkpoint as CP
+from .database import engine, Base, Boroughs, Cuisines, Restaurants, DataVersions, InspectionTrends, CuisineScores, migrate_coordinates, build_search_index
+
+from .readmodel import export_read_model
+
+# Bring in custom logger
+from .log_config import init_log, log_to
+
+
+class Pipeline():
+    def __init__(
+            self
+            ,db_config: dict[str, Path | str | td]
+            ,api_config: dict[str, int | str]
+            ,ref_seqs: dict[str, tuple]
+            ,log_file: Path | str
+            ):
+        '''
+        ETL Pipeline for managing the CurryScorer database.
+
+        This class orchestrates the Extract, Transform, and Load (ETL) process
+        for the CurryScorer project. It dynamically determines whether to perform
+        a fresh ETL or update an existing database based on metadata.
+
+        Attributes:
+            db_config (dict): Configuration for the database engine and paths.
+            api_config (dict): Configuration for API calls.
+            ref_seqs (dict): Reference sequences for transformations.
+            data (dict): Stores intermediate datasets during the ETL process.
+            checkpoints (CheckpointStore | None): Stage checkpoints, None when `CHECKPOINT_DIR` is unset.
+            force (set[str]): Stages rerun even when a matching checkpoint exists.
+            stats (list[dict]): Wall time, row count and source (`run` or `checkpoint`) per stage of the last run.
+        '''
+        log_to(log_file)    # Queue mode: the process writer follows the run's log file
+        self.log = init_log(__name__, file = log_file)
+        self.log.info('Initializing pipeline.')
+        self.db_config = db_config
+        self.api_config = api_config
+        self.ref_seqs = ref_seqs
+        self.data: dict[str, pd.DataFrame | dict] = {}
+        self.checkpoints = CP.CheckpointStore(db_config['CHECKPOINT_DIR'], db_config.get('CHECKPOINT_MAX_AGE')) if db_config.get('CHECKPOINT_DIR') else None
+        self.force: set[str] = set()
+        self.outputs: dict[str, str] = {}   # Identity of each stage's output in this run, feeds downstream fingerprints
+        self.resumed: set[str] = set()
+        self.stats: list[dict] = []
+        self.metadata() # Call inital metadata setup to test for database attributes
+
+    def metadata(self):
+        self.log.info('Setting up metadata.')
+        try:
+            # Checks for existing database and logs it's timestamp if possible
+            self.log.debug('Checking for existing database.')
+            self.exists = True
+            self.last_edit = dt.fromtimestamp(self.db_config['PATH'].stat().st_mtime)   # Last modified date
+            self.log.debug('Database found!')
+        except FileNotFoundError:  
+            # If no database found, set attributes for initial setup scenario
+            self.log.debug('No existing database found.')
+            self.exists = False
+            self.last_edit = dt.now()
+        except Exception and not FileNotFoundError:
+            # If there's an error outside accepted bounds raise
+            self.log.critical('Could not instantiate metadata.', exc_info = True)
+            raise
+        finally:
+            # Finally establish all 
+            self.since_edit = dt.now() - self.last_edit  # Time since last update
+            self.needs_update = True if self.since_edit > self.db_config['UPDATE_INTERVAL'] else False
+            self.log.info('Metadata setup complete.')
+        return self
+    
+    def resume(self, stage: str, key: str) -> dict | None:
+        # Restores a stage's outputs from a matching checkpoint, unless the stage is forced
+        if self.checkpoints is None or stage in self.force:
+            return None
+        hit = self.checkpoints.load(stage, key)
+        if hit is None:
+            return None
+        frames, manifest = hit
+        self.data.update(frames)
+        self.outputs[stage] = CP.fingerprint(key, manifest['created'])
+        self.resumed.add(stage)
+        self.log.info(f'Resumed {stage} stage from checkpoint created {manifest["created"]}.')
+        return manifest
+
+    def checkpoint(self, stage: str, key: str, names: Iterable[str] = (), meta: dict | None = None):
+        # Persists a finished stage so later runs can resume after it
+        if self.checkpoints is None:
+            self.outputs[stage] = CP.fingerprint(key, dt.now())
+            return None
+        manifest = self.checkpoints.save(stage, {n: self.data[n] for n in names}, key, meta)
+        self.outputs[stage] = CP.fingerprint(key, manifest['created'])
+
+    def stage_key(self, stage: str, new_db: bool = True) -> str:
+        # Fingerprint of a stage's inputs, downstream stages chain on the upstream output identity
+        if stage == 'extract':
+            return CP.fingerprint(
+                'extract'
+                ,{k: self.api_config.get(k) for k in ('BASE_URL', 'DATE_CUTOFF', 'ROW_LIMIT')}
+                ,{
+                    # Local sources by content stamp, CSV caches of API resources by path
+                    name: CP.file_stat(self.db_config[spec.csv]) if spec.resource is None else str(self.db_config[spec.csv])
+                for name, spec in E.DATASETS.items() if spec.csv is not None}
+                ,CP.source_digest(E, E.registry, SC)
+            )
+        if stage == 'transform':
+            return CP.fingerprint('transform', self.outputs.get('extract'), new_db, self.ref_seqs, CP.source_digest(T))
+        return CP.fingerprint('load', self.outputs.get('transform'), new_db)
+
+    def extract(self):
+        # Extracts data when needed, and checks for existing data when possible
+        key = self.stage_key('extract')
+        if self.resume('extract', key):
+            return self
+        self.log.info('Extracting datasets...')
+        self.data.update(E.extract_all(self.db_config, self.api_config))    # Datasets fetched concurrently
+        self.checkpoint('extract', key, tuple(E.DATASETS))
+        self.log.info('Extraction complete.')
+        return self
+    
+    def transform(self, new_db: bool = True):
+        # Bulked transformations broken down into helper functions for cleaning and normalization
+        # Top level customization brough into pipeline for abstraction visibility
+        key = self.stage_key('transform', new_db)
+        if self.resume('transform', key):
+            return self
+        self.log.info('Tranforming datasets...')
+        borough_map = T.create_dict(self.ref_seqs['BOROUGHS'], lambda num: f'B{num}')
+        cuisine_map = T.create_dict(self.ref_seqs['CUISINES'], lambda num: f'C{num}')
+        fastfood_names = self.data['fastfood']['name'].to_list()
+        workers = self.db_config.get('TRANSFORM_WORKERS', 0)
+        if workers > 1:
+            # Sharded multi-process path, output identical to the serial path
+            self.data['restaurants'] = T.parallel_transform(self.data['dohmh'], fastfood_names, cuisine_map.keys(), borough_map, cuisine_map, workers)
+        else:
+            self.data['restaurants'] = T.transform_restaurants(self.data['dohmh'], fastfood_names, cuisine_map.keys(), borough_map, cuisine_map)
+        # Inspections rolled up by month; the first month is only partly inside the cutoff window,
+        # and months before the stored watermark are final, so neither is grouped again
+        cutoff = pd.Timestamp.now() - pd.Timedelta(days = self.api_config['DATE_CUTOFF'] * 365)
+        start = cutoff.normalize() + pd.offsets.MonthBegin()
+        watermark = L.trends_watermark(InspectionTrends)
+        if watermark is not None:
+            start = max(start, pd.Timestamp(watermark))
+        self.data['trends'] = T.monthly_inspections(self.data['dohmh'], fastfood_names, cuisine_map.keys(), borough_map, cuisine_map, start = start)
+        if new_db:
+            # Full routine to be run for new databases
+            self.log.warning('Full transformation subroutine selected. Creating reference tables.')
+            self.data['boroughs'] = T.create_ref_table(borough_map, 'borough').merge(self.data['population'], how = 'left', on = 'borough')
+            self.data['cuisines'] = T.create_ref_table(cuisine_map, 'cuisine')
+        self.checkpoint('transform', key, ('restaurants', 'trends', 'boroughs', 'cuisines') if new_db else ('restaurants', 'trends'))
+        self.log.info('Tranformation complete.')
+        return self
+
+    def load(self, new_db: bool = True):
+        # Checks if it's loading in a brand new database or not
+        key = self.stage_key('load', new_db)
+        manifest = self.resume('load', key)
+        if manifest:
+            self.version = manifest['meta']['version']  # These exact rows are already in the database
+            return self
+        if new_db:
+            self.log.info('Loading in new data...')
+            # Clears partial loads and old data, but keeps the version history so versions stay monotonic
+            # and the inspection rollup so trends keep months older than the extract.
+            # One transaction: web workers keep reading the previous tables until it commits
+            kept = (DataVersions.__table__, InspectionTrends.__table__)
+            chunk_size = self.db_config.get('CHUNK_SIZE')
+            with L.raw_transaction(spill = False) as dbapi:
+                L.reset_tables(dbapi, Base.metadata, kept)
+                L.fresh_table(Boroughs, self.data['boroughs'], chunk_size, dbapi)
+                L.fresh_table(Cuisines, self.data['cuisines'], chunk_size, dbapi)
+                L.fresh_table(Restaurants, self.data['restaurants'], chunk_size, dbapi)
+                L.replace_table(CuisineScores, T.cuisine_scores(*L.score_inputs(dbapi)), dbapi)
+        else:
+            self.log.info('Updating existing data...')
+            Base.metadata.create_all(engine)    # Adds any tables introduced since the database was built
+            migrate_coordinates(engine)     # Databases built before coordinates were stored as REAL
+            version = L.next_version()  # Tags this load's change set
+            L.delete_expiredRows(Restaurants, self.api_config['DATE_CUTOFF'], version)
+            L.update_restaurants(Restaurants, self.data['restaurants'], version)
+            L.update_population(Boroughs, self.data['population'])
+            L.replace_table(CuisineScores, T.cuisine_scores(*L.score_inputs()))  # Scores follow the loaded rows, not the extract
+        L.update_trends(InspectionTrends, self.data['trends'])
+        build_search_index(engine)
+        self.version = L.record_version('fresh' if new_db else 'update', None if new_db else version)
+        L.compact_change_log(self.db_config.get('CHANGE_LOG_KEEP', 12))
+        S.export_snapshot(self.version, self.db_config['SNAPSHOT_DIR'], self.db_config['SNAPSHOT_KEEP'])
+        export_read_model(self.version, self.db_config['READ_MODEL_DIR'])
+        self.checkpoint('load', key, meta = {'version': self.version})
+        self.log.info('Loading complete.')
+        return self
+
+    def plan(self, mode: str = 'auto') -> tuple[bool | None, str]:
+        # Decides between a fresh build, an update or nothing, resuming an unfinished run first in auto mode
+        pending = self.checkpoints.pending() if self.checkpoints is not None else None
+        if mode == 'full':
+            return True, 'full rebuild requested'
+        if mode == 'delta':
+            return (False, 'delta refresh requested') if self.exists else (True, 'no database yet, building fresh')
+        if pending:
+            return pending == 'fresh', f'resuming unfinished {pending} run'
+        if not self.exists:
+            return True, 'no database yet, building fresh'
+        if self.needs_update or self.force:
+            return False, f'database is {self.since_edit} old' if self.needs_update else 'stages forced'
+        return None, f'database is {self.since_edit} old, within UPDATE_INTERVAL'
+
+    def run(
+            self
+            ,force: Iterable[str] = ()
+            ,mode: str = 'auto'
+            ,stages: Iterable[str] = CP.STAGES
+            ):
+        # Runs according to boolean metadata determined during startup, resuming an unfinished run first
+        self.log.debug('Pipeline dynamic run started...')
+        forced = [CP.STAGES.index(s) for s in force]
+        self.force = set(CP.STAGES[min(forced):]) if forced else set()  # Forcing a stage reruns everything after it
+        if mode == 'full':
+            self.force = set(CP.STAGES)     # A full refresh never reuses checkpoints
+        new_db, reason = self.plan(mode)
+        self.log.info(f'Run plan: {reason}.')
+        if new_db is None or mode == 'noop':
+            self.log.info('Pipeline run complete.')
+            return self
+        selected = [s for s in CP.STAGES if s in set(stages)]
+        track = self.checkpoints is not None and 'load' in selected   # Only runs that load can be resumed
+        if track and not self.checkpoints.pending():
+            self.checkpoints.begin('fresh' if new_db else 'update')
+        calls = {
+            'extract': self.extract
+            ,'transform': lambda: self.transform(new_db = new_db)
+            ,'load': lambda: self.load(new_db = new_db)
+        }
+        rows = {
+            'extract': lambda: len(self.data['dohmh'])
+            ,'transform': lambda: len(self.data['restaurants'])
+            ,'load': lambda: len(self.data['restaurants'])
+        }
+        self.stats = []
+        for stage in CP.STAGES[:CP.STAGES.index(selected[-1]) + 1] if selected else ():
+            if stage not in selected:
+                # Upstream stage left out, its outputs must come from a checkpoint
+                if not self.resume(stage, self.stage_key(stage, new_db)):
+                    raise CP.CheckpointMissing(f'No usable {stage} checkpoint, include the {stage} stage.')
+                continue
+            start = time.perf_counter()
+            calls[stage]()
+            self.stats.append({
+                'stage': stage
+                ,'seconds': time.perf_counter() - start
+                ,'rows': rows[stage]()
+                ,'source': 'checkpoint' if stage in self.resumed else 'run'
+            })
+        if track:
+            self.checkpoints.finish()
+        self.log.info('Pipeline run complete.')
+        return self
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
\ No newline at end of file
@@ -0,0 +1,290 @@
+'''Compact columnar read model of the restaurants table.
+
+Written by the pipeline after every load and memory-mapped read-only by API workers,
+so the OS page cache is shared across gunicorn processes. SQLite stays the source of truth.
+
+Layout of `<READ_MODEL_DIR>/v000012/`:
+    id.npy            int64    restaurant ids, ascending
+    lat.npy, lng.npy  float32  coordinates
+    borough.npy       uint8    index into meta['boroughs']
+    cuisine.npy       uint8    index into meta['cuisines']
+    date.npy          int32    inspection date as days since 1970-01-01
+    name_offsets.npy  uint32   n + 1 offsets into names.bin
+    names.bin         bytes    UTF-8 string pool of restaurant names
+    meta.json                  version, row count, reference tables
+`<READ_MODEL_DIR>/LATEST` holds the name of the current version directory. Published
+directories are never rewritten, only deleted once superseded for longer than the grace period,
+since deleting files other workers still map is unsafe on network shares (SMB/CIFS).
+'''
+# Import dependencies
+import os
+import json
+import time
+import shutil
+import numpy as np
+from pathlib import Path
+from contextlib import nullcontext
+from sqlalchemy import select
+
+# Import subpackage dependencies
+from Core.database import Restaurants, Boroughs, Cuisines, COORD_DECIMALS, get_session
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+#################################################
+# Export
+#################################################
+def export_read_model(
+        version: int
+        ,root: Path
+        ,keep: int = 2
+        ,grace: float = 600
+        ) -> Path:
+    '''Exports the restaurants table to the memory-mappable read model layout.
+
+    Args:
+        version (int): Pipeline data version.
+        root (Path): Read model root directory.
+        keep (int, optional): Number of versions retained on disk. Defaults to 2.
+        grace (float, optional): Seconds an older version survives after its successor was
+            published, so requests that mapped it finish first. Defaults to 600.
+
+    Returns:
+        Path: Directory holding the new version.
+    '''
+    log.debug('Exporting read model.')
+    try:
+        with get_session() as session:
+            boroughs = session.execute(select(Boroughs.borough_id, Boroughs.borough, Boroughs.population).order_by(Boroughs.borough_id)).all()
+            cuisines = session.execute(select(Cuisines.cuisine_id, Cuisines.cuisine).order_by(Cuisines.cuisine_id)).all()
+            rows = session.execute(
+                select(
+                    Restaurants.id
+                    ,Restaurants.name
+                    ,Restaurants.borough_id
+                    ,Restaurants.cuisine_id
+                    ,Restaurants.inspection_date
+                    ,Restaurants.lat
+                    ,Restaurants.lng
+                ).order_by(
+                    Restaurants.id
+                )
+            ).all()
+        if len(boroughs) > 255 or len(cuisines) > 255:
+            raise ValueError('Reference tables exceed uint8 code space.')
+
+        borough_codes = {r.borough_id: i for i, r in enumerate(boroughs)}
+        cuisine_codes = {r.cuisine_id: i for i, r in enumerate(cuisines)}
+        ids, names, b_ids, c_ids, dates, lats, lngs = zip(*rows) if rows else ((),) * 7
+        encoded = [n.encode('utf-8') for n in names]
+        offsets = np.zeros(len(encoded) + 1, dtype = np.uint32)
+        np.cumsum([len(n) for n in encoded], out = offsets[1:])
+        columns = {
+            'id': np.array(ids, dtype = np.int64)
+            ,'lat': np.array(lats, dtype = np.float32)
+            ,'lng': np.array(lngs, dtype = np.float32)
+            ,'borough': np.array([borough_codes[b] for b in b_ids], dtype = np.uint8)
+            ,'cuisine': np.array([cuisine_codes[c] for c in c_ids], dtype = np.uint8)
+            ,'date': np.array(dates, dtype = 'datetime64[D]').astype(np.int32)
+            ,'name_offsets': offsets
+        }
+        meta = {
+            'version': version
+            ,'rows': len(rows)
+            ,'boroughs': [r.borough for r in boroughs]
+            ,'populations': [r.population for r in boroughs]
+            ,'cuisines': [r.cuisine for r in cuisines]
+        }
+
+        # Stage then publish so readers only ever map complete versions
+        root.mkdir(parents = True, exist_ok = True)
+        name = f'v{version:06d}'
+        staging = root / f'.{name}.tmp'
+        shutil.rmtree(staging, ignore_errors = True)
+        staging.mkdir()
+        for col, arr in columns.items():
+            np.save(staging / f'{col}.npy', arr)
+        (staging / 'names.bin').write_bytes(b''.join(encoded))
+        (staging / 'meta.json').write_text(json.dumps(meta))
+        final = root / name
+        if final.exists():
+            final = root / f'{name}.{time.time_ns()}'   # Re-export of a published version, which workers may map
+        os.replace(staging, final)
+        pointer = root / '.LATEST.tmp'
+        pointer.write_text(final.name)
+        os.replace(pointer, root / 'LATEST')
+
+        # Workers re-read LATEST before every lookup, so a version superseded for `grace` seconds is unmapped
+        published = sorted(p for p in root.glob('v*') if p.is_dir())
+        for stale, successor in zip(published[:-keep], published[1:]) if keep > 0 else ():
+            if time.time() - successor.stat().st_mtime >= grace:
+                shutil.rmtree(stale, ignore_errors = True)
+        log.info(f'Read model {final.name} written with {len(rows)} rows.')
+        return final
+    except Exception:
+        log.critical('Could not export read model.', exc_info = True)
+        raise
+
+
+#################################################
+# Serving
+#################################################
+class ReadModel():
+    name = 'mmap'
+
+    def __init__(self, path: Path):
+        '''
+        Read-only, memory-mapped view of one exported version.
+
+        Exposes the same methods and result shapes as `Core.backend.queries.SqlSource`,
+        answering them with vectorized NumPy operations instead of SQL.
+
+        Attributes:
+            version (int): Data version of the mapped files.
+            rows (int): Number of restaurants.
+            boroughs (list[str]): Borough names by code.
+            populations (list[int | None]): Borough populations by code.
+            cuisines (list[str]): Cuisine names by code.
+        '''
+        meta = json.loads((path / 'meta.json').read_text())
+        self.path = path
+        self.version = meta['version']
+        self.rows = meta['rows']
+        self.boroughs = meta['boroughs']
+        self.populations = meta['populations']
+        self.cuisines = meta['cuisines']
+        load = lambda col: np.load(path / f'{col}.npy', mmap_mode = 'r')
+        self.id = load('id')
+        self.lat = load('lat')
+        self.lng = load('lng')
+        self.borough = load('borough')
+        self.cuisine = load('cuisine')
+        self.date = load('date')
+        self.name_offsets = load('name_offsets')
+        pool = path / 'names.bin'
+        self.name_pool = np.memmap(pool, dtype = np.uint8, mode = 'r') if pool.stat().st_size else np.zeros(0, dtype = np.uint8)
+
+    def names(self, idx: np.ndarray | None = None) -> list[str]:
+        '''Decodes restaurant names from the string pool.
+
+        Args:
+            idx (np.ndarray | None, optional): Row positions, all rows when None. Defaults to None.
+
+        Returns:
+            list[str]: Decoded names.
+        '''
+        pool = memoryview(self.name_pool)
+        starts = self.name_offsets[:-1] if idx is None else self.name_offsets[idx]
+        ends = self.name_offsets[1:] if idx is None else self.name_offsets[idx + 1]
+        return [str(pool[a:b], 'utf-8') for a, b in zip(starts.tolist(), ends.tolist())]
+
+    def scope(self, session = None):
+        return nullcontext(session)     # Nothing to open, kept for parity with SqlSource
+
+    def code_of(self, names: list[str], value: str) -> int | None:
+        return names.index(value) if value in names else None
+
+    def map_rows(self, session = None, idx: np.ndarray | None = None) -> list[dict]:
+        sel = slice(None) if idx is None else idx
+        boroughs = np.array(self.boroughs, dtype = object)[self.borough[sel]]
+        cuisines = np.array(self.cuisines, dtype = object)[self.cuisine[sel]]
+        dates = self.date[sel].astype('datetime64[D]').astype(str)
+        return [
+            {
+                'id': i,
+                'name': n,
+                'lat': la,
+                'lng': ln,
+                'borough': b,
+                'cuisine': c,
+                'inspection_date': d
+            }
+        for i, n, la, ln, b, c, d in zip(
+            self.id[sel].tolist()
+            ,self.names(idx)
+            ,np.round(self.lat[sel].astype(np.float64), COORD_DECIMALS).tolist()
+            ,np.round(self.lng[sel].astype(np.float64), COORD_DECIMALS).tolist()
+            ,boroughs.tolist()
+            ,cuisines.tolist()
+            ,dates.tolist()
+        )]
+
+    def top_cuisines(self, borough: str, session = None) -> list[dict]:
+        code = self.code_of(self.boroughs, borough)
+        if code is None:
+            return []
+        counts = np.bincount(self.cuisine[self.borough == code], minlength = len(self.cuisines))
+        present = np.flatnonzero(counts)
+        order = sorted(present.tolist(), key = lambda c: (-counts[c], self.cuisines[c]))
+        return [{'cuisine': self.cuisines[c], 'count': int(counts[c])} for c in order]
+
+    def top_cuisines_all(self, session = None) -> dict[str, list[dict]]:
+        n_cuisines = len(self.cuisines)
+        counts = np.bincount(
+            self.borough.astype(np.int64) * n_cuisines + self.cuisine
+            ,minlength = len(self.boroughs) * n_cuisines
+        ).reshape(len(self.boroughs), n_cuisines)
+        grouped = {}
+        for b in sorted(np.flatnonzero(counts.sum(axis = 1)).tolist(), key = lambda b: self.boroughs[b]):
+            row = counts[b]
+            order = sorted(np.flatnonzero(row).tolist(), key = lambda c: (-row[c], self.cuisines[c]))
+            grouped[self.boroughs[b]] = [{'cuisine': self.cuisines[c], 'count': int(row[c])} for c in order]
+        return grouped
+
+    def cuisine_distribution(self, session = None) -> list[dict]:
+        counts = np.bincount(self.cuisine, minlength = len(self.cuisines))
+        total = int(counts.sum())
+        present = sorted(np.flatnonzero(counts).tolist(), key = lambda c: self.cuisines[c])
+        return [
+            {
+                'cuisine': self.cuisines[c]
+                ,'count': int(counts[c])
+                ,'percent': (int(counts[c]) / total * 100)
+            }
+        for c in present]
+
+    def borough_summary(self, session = None) -> list[dict]:
+        counts = np.bincount(self.borough, minlength = len(self.boroughs))
+        present = sorted(np.flatnonzero(counts).tolist(), key = lambda b: self.boroughs[b])
+        return [
+            {
+                'borough': self.boroughs[b]
+                ,'restaurant_count': int(counts[b])
+                ,'population': self.populations[b]
+            }
+        for b in present]
+
+
+# Per-process handle, swapped when the pipeline publishes a new version
+_current: dict[str, ReadModel | int | None] = {'model': None, 'stamp': None}
+
+
+def load_read_model(root: Path) -> ReadModel | None:
+    '''Returns the mapped read model for the latest published version.
+
+    Args:
+        root (Path): Read model root directory.
+
+    Returns:
+        ReadModel | None: Current model, or None when nothing has been exported.
+    '''
+    pointer = root / 'LATEST'
+    try:
+        stamp = pointer.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _current['model'] is None or _current['stamp'] != stamp:
+        path = root / pointer.read_text().strip()
+        log.info('Mapping read model %s.', path.name)
+        _current['model'] = ReadModel(path)
+        _current['stamp'] = stamp
+    return _current['model']
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
@@ -1,25 +1,9 @@
-from Core import Pipeline
 from Core.backend import app
-import config as C
 
 
-# Global variable to stop double execution
-_has_executed = False
-
-# Function safety wrapper for object instantiation only once
-def runPipeline():
-    global _has_executed
-    if not _has_executed:
-        log_path = C.STORAGE / 'app.log'
-        Pipeline(C.DB_CONFIG, C.API_CONFIG, C.REF_SEQS, log_path).run()
-        _has_executed = True
-    return None
-
-
-# Run with app_context to try to execute on top of app declaration
-with app.app_context():
-    # Run All DB Tests and Ops
-    runPipeline()
+# Refreshes no longer run on the web process's startup path, schedule them separately:
+#   python -m Core              (the App_Data/jobs/triggered/refresh WebJob in production, or by hand before serving locally)
+# The CLI warms the shared response cache after each load, so workers serve new data at once.
 
 
 # Exposing Flask App for Azure Deployment
@@ -27,8 +11,5 @@ app
 
 
 if __name__ == '__main__':
-    # Run All DB Tests and Ops
-    runPipeline()
-
     # Serve up flask API
-    app.run(debug = False, use_reloader = False)
\ No newline at end of file
+    app.run(debug = False, use_reloader = False)
@@ -0,0 +1,8 @@
+# Serve-only ASGI entry point: the same data endpoints as `wsgi.py`, multiplexed on an event loop
+# with blocking database reads offloaded to a bounded thread pool (`ASGI_THREADS`).
+# Run with an ASGI server, e.g. `uvicorn asgi:app --workers 2`.
+from Core.backend.asgi import app
+
+
+# Exposing ASGI App for ASGI servers
+app
@@ -0,0 +1,142 @@
+'''Coordinate decoding benchmark: legacy `Numeric(14, 12)` columns vs native REAL.
+
+Usage:
+    python -m benchmarks.coords --rows 200000 --repeat 3
+
+Builds a scratch database with the legacy restaurants schema, reads the map columns the
+way `/api/v1.0/map` does (fetch, build row dicts, encode JSON) with the coordinates typed
+as `Numeric` and then as `Float`, and reports per-row cost of each. Finally runs
+`migrate_coordinates()` on the file, timing it and checking every value survived.
+'''
+# Import dependencies
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from pathlib import Path
+
+# Repository root, so `config` and `Core` resolve when run from elsewhere
+ROOT = Path(__file__).resolve().parent.parent
+
+LEGACY_DDL = '''
+CREATE TABLE boroughs (borough_id VARCHAR(2) NOT NULL PRIMARY KEY, borough VARCHAR NOT NULL, population INTEGER);
+CREATE TABLE cuisines (cuisine_id VARCHAR NOT NULL PRIMARY KEY, cuisine VARCHAR NOT NULL);
+CREATE TABLE restaurants (
+    id INTEGER NOT NULL PRIMARY KEY, name VARCHAR NOT NULL,
+    borough_id VARCHAR(2) NOT NULL REFERENCES boroughs (borough_id),
+    cuisine_id VARCHAR NOT NULL REFERENCES cuisines (cuisine_id),
+    inspection_date DATETIME NOT NULL, lat NUMERIC(14, 12) NOT NULL, lng NUMERIC(14, 12) NOT NULL
+);
+'''
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = 'Measure Decimal vs float coordinate decoding on the map read path.')
+    parser.add_argument('--rows', type = int, default = 100000)
+    parser.add_argument('--repeat', type = int, default = 3, help = 'Reads per column type, the fastest is reported.')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--json', type = Path, help = 'Also write the report as JSON to this path.')
+    return parser.parse_args(argv)
+
+
+def build_legacy_db(path: Path, rows: int, seed: int) -> None:
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_DDL)
+    conn.executemany('INSERT INTO boroughs VALUES (?, ?, ?)', [('MN', 'Manhattan', 1600000), ('BK', 'Brooklyn', 2600000)])
+    conn.executemany('INSERT INTO cuisines VALUES (?, ?)', [('C0', 'Thai'), ('C1', 'Korean')])
+    conn.executemany(
+        'INSERT INTO restaurants VALUES (?, ?, ?, ?, ?, ?, ?)'
+        ,(
+            (i, f'Restaurant {i}', rng.choice(('MN', 'BK')), rng.choice(('C0', 'C1')), '2025-01-01 00:00:00.000000'
+             ,round(rng.uniform(40.5, 40.9), 6), round(rng.uniform(-74.2, -73.7), 6))
+        for i in range(1, rows + 1))
+    )
+    conn.commit()
+    conn.close()
+
+
+def time_map_read(engine, coord_type, repeat: int) -> dict:
+    '''Times the map read path with the coordinate columns typed as `coord_type`.'''
+    from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, select
+    meta = MetaData()
+    boroughs = Table('boroughs', meta, Column('borough_id', String, primary_key = True), Column('borough', String))
+    cuisines = Table('cuisines', meta, Column('cuisine_id', String, primary_key = True), Column('cuisine', String))
+    restaurants = Table(
+        'restaurants', meta
+        ,Column('id', Integer, primary_key = True), Column('name', String)
+        ,Column('borough_id', String), Column('cuisine_id', String), Column('inspection_date', DateTime)
+        ,Column('lat', coord_type), Column('lng', coord_type)
+    )
+    stmt = select(
+        restaurants.c.id, restaurants.c.name, restaurants.c.lat, restaurants.c.lng
+        ,boroughs.c.borough, cuisines.c.cuisine, restaurants.c.inspection_date
+    ).join(boroughs, boroughs.c.borough_id == restaurants.c.borough_id).join(cuisines, cuisines.c.cuisine_id == restaurants.c.cuisine_id)
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            rows = conn.execute(stmt).all()
+        fetched = time.perf_counter()
+        data = [
+            {
+                'id': r.id, 'name': r.name, 'lat': r.lat, 'lng': r.lng
+                ,'borough': r.borough, 'cuisine': r.cuisine, 'inspection_date': r.inspection_date.date().isoformat()
+            }
+        for r in rows]
+        body = json.dumps(data, default = str)  # Flask's provider also encodes Decimal as str
+        done = time.perf_counter()
+        run = {'fetch_s': fetched - start, 'total_s': done - start, 'bytes': len(body), 'sample': data[0]['lat']}
+        if best is None or run['total_s'] < best['total_s']:
+            best = run
+    return {**best, 'rows': len(rows)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    scratch = Path(tempfile.mkdtemp(prefix = 'curryscorer_coords_'))
+    os.environ['ENV'] = 'benchmark'
+    os.environ['BENCH_STORAGE'] = str(scratch)
+    sys.path.insert(0, str(ROOT))
+    try:
+        from sqlalchemy import create_engine, Numeric, Float
+        from Core.database import migrate_coordinates
+
+        db = scratch / 'coords.sqlite'
+        build_legacy_db(db, args.rows, args.seed)
+        engine = create_engine(f'sqlite:///{db}')
+        before = sqlite3.connect(db).execute('SELECT id, lat, lng FROM restaurants ORDER BY id').fetchall()
+
+        report = {'rows': args.rows}
+        report['decimal'] = time_map_read(engine, Numeric(14, 12), args.repeat)
+        report['float'] = time_map_read(engine, Float, args.repeat)
+        start = time.perf_counter()
+        migrated = migrate_coordinates(engine)
+        report['migration_s'] = time.perf_counter() - start
+        after = sqlite3.connect(db).execute('SELECT id, lat, lng FROM restaurants ORDER BY id').fetchall()
+        report['migration_lossless'] = migrated and before == after
+        report['float_after_migration'] = time_map_read(engine, Float, args.repeat)
+        engine.dispose()
+
+        print(f'{"read path":<24}{"fetch us/row":>14}{"total us/row":>14}{"MB":>8}  sample')
+        for label in ('decimal', 'float', 'float_after_migration'):
+            r = report[label]
+            print(f'{label:<24}{r["fetch_s"] / r["rows"] * 1e6:>14.2f}{r["total_s"] / r["rows"] * 1e6:>14.2f}{r["bytes"] / 2**20:>8.1f}  {r["sample"]!r}')
+        saved = (report['decimal']['total_s'] - report['float']['total_s']) / args.rows * 1e6
+        print(f'float saves {saved:.2f} us/row ({report["decimal"]["total_s"] / report["float"]["total_s"]:.2f}x)')
+        print(f'migration: {report["migration_s"]:.3f} s, lossless: {report["migration_lossless"]}')
+        if args.json:
+            args.json.write_text(json.dumps(report, indent = 2))
+        return 0 if report['migration_lossless'] else 1
+    finally:
+        shutil.rmtree(scratch, ignore_errors = True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+'''End-to-end ETL benchmark against a local Socrata stand-in.
+
+Usage:
+    python -m benchmarks.etl --rows 100000 --latency 0.2 --fail-rate 0.1
+
+Runs a fresh-load and an update-load scenario through `extract` -> `transform` -> `load`
+and reports per-stage wall time, throughput (rows/s) and traced memory peak.
+'''
+# Import dependencies
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# Repository root, used for resources that are copied into scratch storage
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = 'Offline ETL benchmark for the CurryScorer pipeline.')
+    parser.add_argument('--rows', type = int, default = 50000, help = 'Synthetic DOHMH rows served per request.')
+    parser.add_argument('--new-ratio', type = float, default = 0.1, help = 'Share of ids shifted between fresh and update loads.')
+    parser.add_argument('--latency', type = float, default = 0.0, help = 'Seconds of latency added to every stub response.')
+    parser.add_argument('--fail-rate', type = float, default = 0.0, help = 'Probability of an injected 503 per request.')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--dohmh-csv', type = Path, help = 'Serve a recorded DOHMH CSV instead of synthetic rows.')
+    parser.add_argument('--fastfood-csv', type = Path, help = 'Serve a recorded fast food CSV instead of synthetic rows.')
+    parser.add_argument('--scenarios', nargs = '+', choices = ('fresh', 'update'), default = ['fresh', 'update'])
+    parser.add_argument('--sleep', type = float, default = 0, help = 'Override API_CONFIG SLEEP (seconds).')
+    parser.add_argument('--delay', type = float, default = 0, help = 'Override API_CONFIG DELAY (seconds).')
+    parser.add_argument('--retry', type = int, default = 3, help = 'Override API_CONFIG RETRY.')
+    parser.add_argument('--storage', type = Path, help = 'Scratch storage directory. Defaults to a temp dir.')
+    parser.add_argument('--keep', action = 'store_true', help = 'Keep scratch storage after the run.')
+    parser.add_argument('--json', type = Path, help = 'Also write the report as JSON to this path.')
+    return parser.parse_args(argv)
+
+
+def timed_stage(name: str, func, rows) -> dict:
+    '''Runs one pipeline stage under tracemalloc and a wall clock.
+
+    Args:
+        name (str): Stage label.
+        func (Callable): Zero-argument stage call.
+        rows (Callable): Zero-argument row counter evaluated after the stage.
+
+    Returns:
+        dict: Stage measurements.
+    '''
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n_rows = rows()
+    return {
+        'stage': name
+        ,'seconds': elapsed
+        ,'rows': n_rows
+        ,'rows_per_s': n_rows / elapsed if elapsed else float('inf')
+        ,'peak_mb': peak / 2**20
+    }
+
+
+def run_scenario(scenario: str, pipeline) -> dict:
+    '''Runs one scenario stage by stage.
+
+    Args:
+        scenario (str): `fresh` or `update`.
+        pipeline (Pipeline): Configured pipeline instance.
+
+    Returns:
+        dict: Scenario report.
+    '''
+    new_db = scenario == 'fresh'
+    data = pipeline.data
+    start = time.perf_counter()
+    stages = [
+        timed_stage('extract', pipeline.extract, lambda: sum(len(data[k]) for k in ('dohmh', 'fastfood', 'population')))
+        ,timed_stage('transform', lambda: pipeline.transform(new_db = new_db), lambda: len(data['restaurants']))
+        ,timed_stage('load', lambda: pipeline.load(new_db = new_db), lambda: len(data['restaurants']))
+    ]
+    return {
+        'scenario': scenario
+        ,'stages': stages
+        ,'total_seconds': time.perf_counter() - start
+    }
+
+
+def print_report(reports: list[dict], stub) -> None:
+    header = f'{"scenario":<9}{"stage":<11}{"seconds":>10}{"rows":>10}{"rows/s":>12}{"peak MB":>10}'
+    print(header)
+    print('-' * len(header))
+    for report in reports:
+        for s in report['stages']:
+            print(f'{report["scenario"]:<9}{s["stage"]:<11}{s["seconds"]:>10.3f}{s["rows"]:>10}{s["rows_per_s"]:>12.0f}{s["peak_mb"]:>10.1f}')
+        print(f'{report["scenario"]:<9}{"total":<11}{report["total_seconds"]:>10.3f}')
+    print(f'stub: {stub.served} responses served, {stub.failures} injected failures')
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    storage = args.storage or Path(tempfile.mkdtemp(prefix = 'curryscorer_bench_'))
+    storage.mkdir(parents = True, exist_ok = True)
+
+    # Point config at scratch storage before anything imports it
+    os.environ['ENV'] = 'benchmark'
+    os.environ['BENCH_STORAGE'] = str(storage)
+    shutil.copy(ROOT / 'Core' / 'resources' / 'census_population.csv', storage / 'census_population.csv')
+    sys.path.insert(0, str(ROOT))
+
+    import config as C
+    from Core import Pipeline
+    from benchmarks.socrata_stub import SocrataStub, StubConfig
+
+    stub_config = StubConfig(
+        rows = args.rows
+        ,latency = args.latency
+        ,fail_rate = args.fail_rate
+        ,seed = args.seed
+        ,cuisines = C.REF_SEQS['CUISINES']
+        ,dohmh_csv = args.dohmh_csv
+        ,fastfood_csv = args.fastfood_csv
+    )
+    try:
+        with SocrataStub(stub_config) as stub:
+            api_config = {
+                **C.API_CONFIG
+                ,'BASE_URL': stub.base_url
+                ,'SLEEP': args.sleep
+                ,'DELAY': args.delay
+                ,'RETRY': args.retry
+            }
+            reports = []
+            for scenario in args.scenarios:
+                if scenario == 'fresh':
+                    C.DB_CONFIG['PATH'].unlink(missing_ok = True)
+                    C.DB_CONFIG['FASTFOOD_CSV'].unlink(missing_ok = True)
+                else:
+                    # Shift part of the id space so the update sees new restaurants
+                    stub_config.id_offset = int(args.rows * args.new_ratio)
+                    stub_config.seed = args.seed + 1
+                db_config = {**C.DB_CONFIG, 'CHECKPOINT_DIR': None}  # Measure every stage, never resume
+                pipeline = Pipeline(db_config, api_config, C.REF_SEQS, storage / 'bench.log')
+                reports.append(run_scenario(scenario, pipeline))
+            print_report(reports, stub)
+            if args.json:
+                args.json.write_text(json.dumps(reports, indent = 2))
+    finally:
+        if not args.keep and not args.storage:
+            shutil.rmtree(storage, ignore_errors = True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+'''Import-time budget check for the serve-only entry point.
+
+Usage:
+    python -m benchmarks.importtime --budget-ms 1500
+
+Runs `python -X importtime -c "import wsgi"` in a clean interpreter, reports the total and
+the slowest top-level imports, and exits non-zero when the budget is exceeded or when the
+ETL stack (pandas, numpy, pyarrow, requests, tenacity, Core.etl) leaks into the import chain.
+'''
+# Import dependencies
+import re
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+# Repository root, the subprocess runs from here so `wsgi` and `config` resolve
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules a serve-only worker must never import
+FORBIDDEN = ('pandas', 'numpy', 'pyarrow', 'requests', 'tenacity', 'Core.etl', 'Core.pipeline')
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+def measure(target: str) -> list[tuple[int, int, int, str]]:
+    '''Collects `-X importtime` records for importing `target`.
+
+    Args:
+        target (str): Module to import.
+
+    Returns:
+        list[tuple[int, int, int, str]]: (self us, cumulative us, depth, module) per import.
+    '''
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}']
+        ,cwd = ROOT
+        ,capture_output = True
+        ,text = True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f'Importing {target} failed:\n{proc.stderr[-2000:]}')
+    records = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            records.append((int(own), int(cumulative), len(indent) // 2, module))
+    return records
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Import-time budget for the WSGI entry point.')
+    parser.add_argument('--target', default = 'wsgi', help = 'Module to import.')
+    parser.add_argument('--budget-ms', type = float, default = 1500, help = 'Maximum total import time.')
+    parser.add_argument('--top', type = int, default = 10, help = 'Number of slowest imports to list.')
+    args = parser.parse_args(argv)
+
+    records = measure(args.target)
+    total_ms = sum(r[0] for r in records) / 1000
+    modules = {r[3] for r in records}
+    leaked = [f for f in FORBIDDEN if any(m == f or m.startswith(f'{f}.') for m in modules)]
+
+    print(f'{args.target}: {len(records)} modules, {total_ms:.1f} ms total (budget {args.budget_ms:.0f} ms)')
+    print(f'{"cumulative ms":>14}{"self ms":>10}  module')
+    for own, cumulative, _, module in sorted(records, key = lambda r: r[1], reverse = True)[:args.top]:
+        print(f'{cumulative / 1000:>14.1f}{own / 1000:>10.1f}  {module}')
+
+    failed = False
+    if leaked:
+        print(f'FAIL: ETL modules imported by {args.target}: {", ".join(leaked)}')
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f'FAIL: import time {total_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms')
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+'''Query plan benchmark: the SQL behind each data endpoint, its plan and its cost.
+
+Usage:
+    python -m benchmarks.queries --runs 5 --fail-on "USE TEMP B-TREE"
+
+Runs every endpoint read against the configured database, prints the statements SQLAlchemy
+sent, their mean/max execution time and SQLite's `EXPLAIN QUERY PLAN` with `SCAN` and
+`USE TEMP B-TREE` steps marked. `--fail-on` exits 1 when a flagged step is found, so a
+regression in the schema or a statement builder can fail CI.
+'''
+# Import dependencies
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Repository root, so `config` and `Core` resolve when run from elsewhere
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = 'Explain and time the SQL behind the CurryScorer API.')
+    parser.add_argument('--runs', type = int, default = 3, help = 'Executions per endpoint, timings are averaged.')
+    parser.add_argument('--fail-on', nargs = '+', choices = ('SCAN', 'USE TEMP B-TREE'), default = [], help = 'Exit 1 if any plan has these steps.')
+    parser.add_argument('--json', type = Path, help = 'Also write the report as JSON to this path.')
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    sys.path.insert(0, str(ROOT))
+    from Core.backend.audit import audit_endpoints, format_report   # Imported after parse_args so --help stays instant
+    report = audit_endpoints(args.runs)
+    print(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent = 2))
+    flagged = {f for entry in report for s in entry['statements'] for f in s['flags']} & set(args.fail_on)
+    if flagged:
+        print(f'flagged plan steps: {", ".join(sorted(flagged))}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+'''Serving benchmark: Flask on WSGI vs the ASGI app at increasing client concurrency.
+
+Usage:
+    python -m benchmarks.serving --concurrency 1 8 32 64 --duration 5
+
+Starts `wsgi:app` (gunicorn when installed, else werkzeug's threaded dev server) and
+`asgi:app` (uvicorn) as subprocesses against the configured database, drives each endpoint
+with N keep-alive clients for a fixed duration and reports req/s, p50 and p95 latency,
+followed by the query plan audit of the SQL behind those endpoints (`benchmarks.queries`).
+'''
+# Import dependencies
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+import importlib.util
+from pathlib import Path
+
+# Repository root, servers run from here so `wsgi`, `asgi` and `config` resolve
+ROOT = Path(__file__).resolve().parent.parent
+
+ENDPOINTS = {
+    'map': '/api/v1.0/map/'
+    ,'top-cuisines': '/api/v1.0/top-cuisines/?borough=Manhattan'
+    ,'cuisine-distributions': '/api/v1.0/cuisine-distributions/'
+    ,'borough-summaries': '/api/v1.0/borough-summaries/'
+}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = 'Compare WSGI and ASGI serving under concurrent clients.')
+    parser.add_argument('--concurrency', type = int, nargs = '+', default = [1, 8, 32, 64])
+    parser.add_argument('--duration', type = float, default = 5, help = 'Seconds per endpoint and concurrency level.')
+    parser.add_argument('--endpoints', nargs = '+', choices = tuple(ENDPOINTS), default = list(ENDPOINTS))
+    parser.add_argument('--servers', nargs = '+', choices = ('wsgi', 'asgi'), default = ['wsgi', 'asgi'])
+    parser.add_argument('--workers', type = int, default = 1, help = 'Server processes for both apps.')
+    parser.add_argument('--threads', type = int, default = 8, help = 'gunicorn threads per worker and ASGI_THREADS.')
+    parser.add_argument('--json', type = Path, help = 'Also write the report as JSON to this path.')
+    parser.add_argument('--no-plans', action = 'store_true', help = 'Skip the query plan audit after the load tests.')
+    return parser.parse_args(argv)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_command(kind: str, port: int, workers: int, threads: int) -> list[str]:
+    '''Builds the command line that serves `kind` on `port`.'''
+    if kind == 'asgi':
+        return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port), '--workers', str(workers), '--log-level', 'warning']
+    if importlib.util.find_spec('gunicorn') is not None:
+        return [
+            sys.executable, '-m', 'gunicorn', 'wsgi:app'
+            ,'--bind', f'127.0.0.1:{port}'
+            ,'--workers', str(workers)
+            ,'--threads', str(threads)
+            ,'--log-level', 'warning'
+        ]
+    script = f'from werkzeug.serving import run_simple; from wsgi import app; run_simple("127.0.0.1", {port}, app, threaded = True)'
+    return [sys.executable, '-c', script]
+
+
+def start_server(kind: str, workers: int, threads: int) -> tuple[subprocess.Popen, int]:
+    '''Starts a server subprocess and waits until it accepts connections.'''
+    port = free_port()
+    env = {**os.environ, 'ASGI_THREADS': str(threads), 'LOG_ROTATE': os.environ.get('LOG_ROTATE', 'size')}
+    proc = subprocess.Popen(server_command(kind, port, workers, threads), cwd = ROOT, env = env, stdout = subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'{kind} server exited with code {proc.returncode}.')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout = 0.5):
+                return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f'{kind} server did not start within 60 seconds.')
+
+
+def client(port: int, path: str, stop: float, latencies: list, errors: list) -> None:
+    '''Issues requests over one keep-alive connection until `stop`.'''
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout = 60)
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+            latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout = 60)
+    conn.close()
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float('nan')
+
+
+def load_test(port: int, path: str, concurrency: int, duration: float) -> dict:
+    '''Runs `concurrency` clients against one endpoint for `duration` seconds.'''
+    latencies, errors = [], []
+    start = time.perf_counter()
+    stop = start + duration
+    threads = [threading.Thread(target = client, args = (port, path, stop, latencies, errors)) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': len(latencies)
+        ,'errors': len(errors)
+        ,'rps': len(latencies) / elapsed
+        ,'p50_ms': percentile(latencies, 0.50) * 1000
+        ,'p95_ms': percentile(latencies, 0.95) * 1000
+    }
+
+
+def print_report(results: list[dict]) -> None:
+    print(f'{"server":<8}{"endpoint":<24}{"clients":>8}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"errors":>8}')
+    for r in results:
+        print(f'{r["server"]:<8}{r["endpoint"]:<24}{r["concurrency"]:>8}{r["rps"]:>10.1f}{r["p50_ms"]:>10.1f}{r["p95_ms"]:>10.1f}{r["errors"]:>8}')
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    results = []
+    for kind in args.servers:
+        proc, port = start_server(kind, args.workers, args.threads)
+        try:
+            for name in args.endpoints:
+                load_test(port, ENDPOINTS[name], 1, 0.5)   # Warm connections, caches and page cache
+                for n in args.concurrency:
+                    results.append({'server': kind, 'endpoint': name, 'concurrency': n, **load_test(port, ENDPOINTS[name], n, args.duration)})
+        finally:
+            proc.terminate()
+            proc.wait(timeout = 30)
+    print_report(results)
+    plans = None
+    if not args.no_plans:
+        sys.path.insert(0, str(ROOT))
+        from Core.backend.audit import audit_endpoints, format_report
+        plans = audit_endpoints()
+        print()
+        print(format_report(plans))
+    if args.json:
+        args.json.write_text(json.dumps({'load': results, 'query_plans': plans}, indent = 2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
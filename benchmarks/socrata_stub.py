@@ -0,0 +1,178 @@
+# Import dependencies
+import io
+import csv
+import random
+import threading
+import datetime as dt
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Bring in custom logger
+from Core.log_config import init_log
+log = init_log(__name__)
+
+
+# Socrata resource ids served by the stand-in
+DOHMH_RESOURCE = '43nn-pn8j'
+FASTFOOD_RESOURCE = 'qgc5-ecnb'
+
+# Values used to synthesize plausible DOHMH rows
+BOROUGHS = ('Manhattan', 'Bronx', 'Brooklyn', 'Queens', 'Staten Island')
+EXTRA_CUISINES = ('American', 'Pizza', 'Coffee/Tea', 'Hamburgers', 'Bakery Products/Desserts')
+FASTFOOD_NAMES = ('Dairy Queen', 'Olive Garden', 'Jamba Juice', 'Einstein Bros', 'Burger King', 'Subway')
+
+
+class StubConfig():
+    def __init__(
+            self
+            ,rows: int = 10000
+            ,latency: float = 0.0
+            ,fail_rate: float = 0.0
+            ,seed: int = 0
+            ,id_offset: int = 0
+            ,cuisines: tuple[str, ...] = ()
+            ,dohmh_csv: Path | None = None
+            ,fastfood_csv: Path | None = None
+            ):
+        '''
+        Tunables for the local Socrata stand-in.
+
+        Attributes:
+            rows (int): Number of synthetic DOHMH rows served (before `$limit`).
+            latency (float): Seconds slept before answering each request.
+            fail_rate (float): Probability [0, 1] of answering with a `503`.
+            seed (int): RNG seed for synthetic data.
+            id_offset (int): Shifts synthetic `id` values, used to fake new restaurants between loads.
+            cuisines (tuple[str, ...]): Ethnic cuisines to mix into synthetic rows.
+            dohmh_csv (Path | None): Recorded DOHMH CSV to serve instead of synthetic rows.
+            fastfood_csv (Path | None): Recorded fast food CSV to serve instead of synthetic rows.
+        '''
+        self.rows = rows
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.seed = seed
+        self.id_offset = id_offset
+        self.cuisines = cuisines
+        self.dohmh_csv = dohmh_csv
+        self.fastfood_csv = fastfood_csv
+
+
+def synth_dohmh(cfg: StubConfig, limit: int | None = None) -> bytes:
+    '''Builds a DOHMH-shaped CSV (already aliased like the pipeline's `$select`).
+
+    Args:
+        cfg (StubConfig): Stub configuration.
+        limit (int | None, optional): Socrata `$limit`. Defaults to None.
+
+    Returns:
+        bytes: UTF-8 CSV body.
+    '''
+    rng = random.Random(cfg.seed)
+    n_rows = min(cfg.rows, limit) if limit else cfg.rows
+    n_ids = max(n_rows // 3, 1)     # DOHMH has several violation rows per inspection
+    cuisines = tuple(cfg.cuisines) + EXTRA_CUISINES
+    today = dt.datetime.now()
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(['id', 'name', 'borough', 'cuisine', 'inspection_date', 'lat', 'lng'])
+    for _ in range(n_rows):
+        camis = 40000000 + cfg.id_offset + rng.randrange(n_ids)
+        id_rng = random.Random(camis)   # Stable attributes per restaurant id
+        name = id_rng.choice(FASTFOOD_NAMES) if id_rng.random() < 0.05 else f'Restaurant {camis}'
+        inspected = today - dt.timedelta(days = rng.randrange(700), hours = rng.randrange(24))
+        writer.writerow([
+            camis
+            ,name
+            ,id_rng.choice(BOROUGHS)
+            ,id_rng.choice(cuisines)
+            ,inspected.strftime('%Y-%m-%dT%H:00:00.000')
+            ,round(40.50 + id_rng.random() * 0.40, 12)
+            ,round(-74.25 + id_rng.random() * 0.55, 12)
+        ])
+    return buf.getvalue().encode('utf-8')
+
+
+def synth_fastfood() -> bytes:
+    '''Builds a fast food name CSV.
+
+    Returns:
+        bytes: UTF-8 CSV body.
+    '''
+    return ('name\n' + '\n'.join(FASTFOOD_NAMES) + '\n').encode('utf-8')
+
+
+class SocrataHandler(BaseHTTPRequestHandler):
+    '''Answers `/resource/<id>.csv` requests the way the pipeline expects from NYC Open Data.'''
+    server: 'SocrataStub'
+
+    def do_GET(self):
+        cfg = self.server.config
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        resource = Path(parts.path).stem
+        if cfg.latency:
+            threading.Event().wait(cfg.latency)
+        if self.server.rng.random() < cfg.fail_rate:
+            self.server.failures += 1
+            self.send_error(503, 'Injected failure')
+            return
+        limit = int(query['$limit'][0]) if '$limit' in query else None
+        if resource == DOHMH_RESOURCE:
+            body = cfg.dohmh_csv.read_bytes() if cfg.dohmh_csv else synth_dohmh(cfg, limit)
+        elif resource == FASTFOOD_RESOURCE:
+            body = cfg.fastfood_csv.read_bytes() if cfg.fastfood_csv else synth_fastfood()
+        else:
+            self.send_error(404, 'Unknown resource')
+            return
+        self.server.served += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug('%s - %s', self.address_string(), format % args)
+
+
+class SocrataStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: StubConfig, host: str = '127.0.0.1', port: int = 0):
+        '''
+        Local HTTP stand-in for the NYC Open Data (Socrata) resource API.
+
+        Attributes:
+            config (StubConfig): Live tunables, may be changed between scenarios.
+            served (int): Successful responses sent.
+            failures (int): Injected failures sent.
+        '''
+        super().__init__((host, port), SocrataHandler)
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.served = 0
+        self.failures = 0
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/resource'
+
+    def __enter__(self):
+        self._thread = threading.Thread(target = self.serve_forever, daemon = True)
+        self._thread.start()
+        log.info(f'Socrata stub listening on {self.base_url}')
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        return False
+
+
+# EOF
+
+if __name__ == '__main__':
+    print('This module is intended to be imported, not run directly.')
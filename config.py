@@ -1,16 +1,17 @@
 # Import dependencies
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 
+# GRABBING ENV VARIABLES (before the logger so LOG_MODE can come from .env)
+load_dotenv()
+
 # Bring in custom logger
-from Core.log_config import init_log
+from Core.log_config import init_log, configure_logging
 log = init_log(__name__)
 
-
-# GRABBING ENV VARIABLES
-load_dotenv()
 ENV = os.environ.get('ENV', 'development')  # Retrieved ENV value for dev/production
 log.info(f'Environment variables loaded. ENV is {ENV}.')
 
@@ -27,6 +28,10 @@ if ENV == 'production':
 elif ENV == 'development':
     STORAGE = CORE_DIR / 'resources'
     DB_PATH = STORAGE / 'courier_dev.sqlite'
+elif ENV == 'benchmark':
+    # Scratch storage used by the offline benchmark harness in benchmarks/
+    STORAGE = Path(os.environ.get('BENCH_STORAGE', CORE_DIR / 'resources' / 'bench'))
+    DB_PATH = STORAGE / 'courier_bench.sqlite'
 elif ENV is None:
     log.critical('No ENV environment variable has been declared. Be advised - emergency routes being used.')
     STORAGE = CORE_DIR / 'resources'
@@ -35,6 +40,24 @@ elif ENV is None:
 if ENV == 'production' and STORAGE != DEF_STORAGE:
     log.critical(f'Production storage path is incorrect: {STORAGE}')
 
+# Cross-worker response cache, kept on local disk in production: STORAGE is an SMB share there and
+# SQLite's WAL mode needs shared memory that network filesystems cannot provide
+SHARED_CACHE_PATH = Path(os.environ.get(
+    'SHARED_CACHE_PATH'
+    ,Path(tempfile.gettempdir()) / 'curryscorer' / 'response_cache.sqlite' if ENV == 'production' else STORAGE / 'response_cache.sqlite'
+))
+
+# Shared background log writer, see Core/log_config.py
+LOG_CONFIG = {
+    'PATH': STORAGE / 'app.log'
+    ,'ROTATE': os.environ.get('LOG_ROTATE', 'size')   # 'size' or 'time' (one app.<pid>.log per process), 'watched' (shared file, external rotation) or 'none'
+    ,'MAX_BYTES': 5 * 2**20     # Size threshold for 'size' rotation.
+    ,'BACKUPS': 5   # Rotated log files kept.
+    ,'WHEN': 'midnight'     # Interval for 'time' rotation.
+    ,'JSON': os.environ.get('LOG_JSON', 'false').lower() == 'true'    # Structured JSON lines in the log file.
+}
+configure_logging(LOG_CONFIG)
+
 # Logs Storage & DataBase Paths for environment integrity
 log.info(f'Storage: {STORAGE}') if len(STORAGE.parts) <= 2 else log.info(f'Storage: .../{STORAGE.parts[-2]}/{STORAGE.parts[-1]}')
 log.info(f'DataBase: {DB_PATH.name}')
@@ -47,17 +70,35 @@ DB_CONFIG = {
     ,'UPDATE_INTERVAL': timedelta(weeks = 2)
     ,'FASTFOOD_CSV': STORAGE / 'fastfood.csv'
     ,'POPULATION_CSV': STORAGE / 'census_population.csv'
+    ,'SNAPSHOT_DIR': STORAGE / 'snapshots'  # Versioned Parquet snapshots of the curated tables.
+    ,'SNAPSHOT_KEEP': 3     # Number of snapshots retained on disk, at least 1.
+    ,'READ_MODEL_DIR': STORAGE / 'readmodel'    # Memory-mapped columnar copy of restaurants for API serving.
+    ,'SERVE_MODE': os.environ.get('SERVE_MODE', 'sql')  # 'sql' queries SQLite per request, 'mmap' answers from the read model.
+    ,'CHECKPOINT_DIR': STORAGE / 'checkpoints'   # Feather checkpoints of each pipeline stage for resumable runs.
+    ,'CHECKPOINT_MAX_AGE': timedelta(hours = 12)    # Older checkpoints are ignored so stale extracts are refetched.
+    ,'CHANGE_LOG_KEEP': 12  # Versions whose change sets are kept for map deltas (~6 months of biweekly updates).
+    ,'TRANSFORM_WORKERS': int(os.environ.get('TRANSFORM_WORKERS', 0))  # Processes for the sharded transform, 0/1 keeps it serial.
+    ,'CHUNK_SIZE': int(os.environ.get('CHUNK_SIZE', 0)) or None    # Rows per executemany batch during fresh bulk loads, unset uses 50000.
+    ,'ASGI_THREADS': int(os.environ.get('ASGI_THREADS', 8))  # Bounded thread pool for blocking DB reads in the ASGI app.
+    ,'CACHE_MAX_BYTES': int(os.environ.get('CACHE_MAX_BYTES', 64 * 2**20))    # Byte budget of the in-process response cache, 0 disables it.
+    ,'CACHE_TTL': float(os.environ.get('CACHE_TTL', 3600))  # Seconds a cached response stays valid, 0 for no expiry.
+    ,'SHARED_CACHE_PATH': SHARED_CACHE_PATH if os.environ.get('SHARED_CACHE', '1') != '0' else None   # Cross-worker response cache, SHARED_CACHE=0 disables it.
+    ,'SHARED_CACHE_JOURNAL': 'DELETE' if SHARED_CACHE_PATH.is_relative_to(DEF_STORAGE) else 'WAL'   # Rollback journal when pointed at the network share.
+    ,'QUERY_AUDIT': os.environ.get('QUERY_AUDIT', '0') == '1'   # Diagnostic mode: time every SQL statement and serve query plans at /api/v1.0/debug/query-plans.
 }
 
 # NYC Open API Configuration
 API_CONFIG = {
     'KEY': os.environ.get('NYC_OPEN_KEY')   # Retrieve NYC Open Key
+    ,'BASE_URL': os.environ.get('NYC_OPEN_URL', 'https://data.cityofnewyork.us/resource')    # Socrata resource root, overridable for local stand-ins
     ,'ROW_LIMIT': 200000     # Max limit for rows returned by API
     ,'DATE_CUTOFF': 2   # In years, describes max years allowed since last inspection.
     ,'TIMEOUT': 15  # In seconds, requests.get() request timeout cutoff.
     ,'RETRY': 2     # Number of retries for API calls - used in core get_df() function.
     ,'DELAY': 10    # In seconds, delay upon retry before another request is sent out.
-    ,'SLEEP': 10    # In seconds, sleep time between two different API calls for a similar website - only needed during init db construction.
+    ,'SLEEP': 10    # In seconds, sleep time between two different API calls for a similar website - only used by serial get_addData() calls.
+    ,'RATE_LIMIT': 4    # Max requests per second per host - spaces out concurrent extraction calls.
+    ,'POOL_SIZE': 10    # Keep-alive connections per host in the session shared by extraction threads.
 }
 
 
@@ -3,19 +3,19 @@
 // ==================
 
 home_url = 'https://curryscorer.azurewebsites.net/api/v1.0/'
-map_url = home_url + 'map'
-bar_url = home_url + 'top-cuisines?borough='
-pie_url = home_url + 'cuisine-distributions'
-table_url = home_url + 'borough-summaries'
+bundle_url = home_url + 'bundle?include=map,top-cuisines,cuisine-distributions,borough-summaries'
+
+// One request (and one DB session server side) for every dataset on the page
+const bundle = d3.json(bundle_url).then(data => data.results);
 
 const map = L.map('map').setView([40.7128, -74.0060], 9);
 L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png').addTo(map);
 
 
-d3.json(map_url).then(data => {
+bundle.then(data => {
   // Create a marker cluster group
   const markers = L.markerClusterGroup();
-  const results = data.results;
+  const results = data['map'];
 
   for (let i = 0; i < results.length; i++) {
     let loc = results[i];
@@ -42,10 +42,10 @@ d3.json(map_url).then(data => {
 // List borough names needed
 const boroughs = ['Manhattan', 'Brooklyn', 'Queens', 'Bronx', 'Staten Island'];
 
-// Function to perform API call and plot the data
+// Function to plot the data, every borough's list arrives with the bundle so no new request is made
 function updatePlot(borough) {
-  d3.json(bar_url + borough).then(data => {
-    let results = data.results
+  bundle.then(data => {
+    let results = data['top-cuisines'][borough] || [];
     results = results.slice(0, 10);
     
     // Prepare the trace for the bar chart
@@ -89,9 +89,9 @@ updatePlot('Manhattan');
 // ==================
 // Pie Chart (Plotly)
 // ==================
-d3.json(pie_url).then(data => {
+bundle.then(data => {
   // Limit to top 10 or 15 to avoid too many slices
-  let results = data.results.slice(0, 10);
+  let results = data['cuisine-distributions'].slice(0, 10);
 
   // Optionally group very small slices into an "Other" category
   // This is just an example – adapt as needed
@@ -133,8 +133,8 @@ d3.json(pie_url).then(data => {
 // Borough Summary Table
 // ==================
 
-d3.json(table_url).then(data => {
-  let results = data.results;
+bundle.then(data => {
+  let results = data['borough-summaries'];
 
   const tableBody = document.getElementById("boroughTableBody");
 
@@ -0,0 +1,30 @@
+# Import dependencies
+import os
+import tempfile
+import pytest
+
+# Point config at a scratch store before anything imports it, run with `python -m pytest` from the repo root
+os.environ['ENV'] = 'benchmark'
+os.environ['BENCH_STORAGE'] = tempfile.mkdtemp(prefix = 'curryscorer-tests-')
+os.environ['SHARED_CACHE'] = '0'
+os.environ['CACHE_MAX_BYTES'] = '0'
+
+import config as C
+from Core.database import engine, Base, Boroughs, Cuisines
+from Core.etl import load as L, transform as T
+
+
+@pytest.fixture
+def database():
+    '''Empty schema with the borough and cuisine reference tables loaded.'''
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    borough_map = T.create_dict(C.REF_SEQS['BOROUGHS'], lambda num: f'B{num}')
+    cuisine_map = T.create_dict(C.REF_SEQS['CUISINES'], lambda num: f'C{num}')
+    L.fresh_table(Boroughs, T.create_ref_table(borough_map, 'borough'))
+    L.fresh_table(Cuisines, T.create_ref_table(cuisine_map, 'cuisine'))
+    yield engine
+    engine.dispose()
+
+
+# EOF
@@ -0,0 +1,82 @@
+# Import dependencies
+import json
+import shutil
+import pytest
+from pathlib import Path
+from datetime import datetime as dt, timedelta as td
+
+# Import project dependencies
+import config as C
+from Core import Pipeline
+from Core.etl import checkpoint as CP
+from benchmarks.socrata_stub import SocrataStub, StubConfig
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope = 'module')
+def stub():
+    shutil.copy(ROOT / 'Core' / 'resources' / 'census_population.csv', C.DB_CONFIG['POPULATION_CSV'])
+    with SocrataStub(StubConfig(rows = 2000, cuisines = C.REF_SEQS['CUISINES'])) as server:
+        yield server
+
+
+@pytest.fixture
+def pipeline(database, stub, tmp_path):
+    '''Builds pipelines that share one checkpoint store, like consecutive runs of the WebJob.'''
+    db_config = {**C.DB_CONFIG, 'CHECKPOINT_DIR': tmp_path / 'checkpoints'}
+    api_config = {**C.API_CONFIG, 'BASE_URL': stub.base_url, 'SLEEP': 0, 'DELAY': 0}
+
+    def build(ref_seqs: dict = C.REF_SEQS) -> Pipeline:
+        return Pipeline(db_config, api_config, ref_seqs, tmp_path / 'pipeline.log')
+    return build
+
+
+def sources(pipeline: Pipeline) -> dict[str, str]:
+    return {s['stage']: s['source'] for s in pipeline.stats}
+
+
+def test_unchanged_inputs_resume_every_stage(pipeline):
+    assert sources(pipeline().run(mode = 'delta')) == {'extract': 'run', 'transform': 'run', 'load': 'run'}
+    assert sources(pipeline().run(mode = 'delta')) == {'extract': 'checkpoint', 'transform': 'checkpoint', 'load': 'checkpoint'}
+
+
+def test_fingerprint_change_reruns_the_stage_and_everything_after(pipeline):
+    pipeline().run(mode = 'delta')
+    ref_seqs = {**C.REF_SEQS, 'CUISINES': C.REF_SEQS['CUISINES'][:-1]}     # Transform input only
+    assert sources(pipeline(ref_seqs).run(mode = 'delta')) == {'extract': 'checkpoint', 'transform': 'run', 'load': 'run'}
+
+
+def test_expired_checkpoint_is_rerun(pipeline):
+    first = pipeline().run(mode = 'delta')
+    manifest = first.checkpoints.root / 'transform' / 'manifest.json'
+    stale = json.loads(manifest.read_text())
+    stale['created'] = (dt.now() - C.DB_CONFIG['CHECKPOINT_MAX_AGE'] - td(minutes = 1)).isoformat()
+    manifest.write_text(json.dumps(stale))
+    assert sources(pipeline().run(mode = 'delta')) == {'extract': 'checkpoint', 'transform': 'run', 'load': 'run'}
+
+
+def test_skipped_stage_needs_a_checkpoint(pipeline):
+    with pytest.raises(CP.CheckpointMissing):
+        pipeline().run(mode = 'delta', stages = ('load',))
+    pipeline().run(mode = 'delta', stages = ('extract',))
+    assert sources(pipeline().run(mode = 'delta', stages = ('transform', 'load'))) == {'transform': 'run', 'load': 'run'}
+
+
+def test_interrupted_fresh_run_resumes_as_fresh(pipeline, monkeypatch):
+    from Core import pipeline as P
+    def fail(*args, **kwargs):
+        raise OSError('share unavailable')
+    with monkeypatch.context() as patch:
+        patch.setattr(P.S, 'export_snapshot', fail)
+        with pytest.raises(OSError):
+            pipeline().run(mode = 'full')
+    resumed = pipeline()
+    assert resumed.checkpoints.pending() == 'fresh'
+    assert resumed.plan() == (True, 'resuming unfinished fresh run')
+    assert sources(resumed.run()) == {'extract': 'checkpoint', 'transform': 'checkpoint', 'load': 'run'}
+    assert resumed.checkpoints.pending() is None
+
+
+# EOF
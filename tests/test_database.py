@@ -0,0 +1,56 @@
+# Import dependencies
+from datetime import datetime as dt
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, Numeric, insert, select
+
+# Import project dependencies
+from Core.database import Restaurants, migrate_coordinates, get_session
+
+
+ROWS = [
+    {'id': 1, 'name': 'Curry House', 'borough_id': 'B1', 'cuisine_id': 'C1', 'inspection_date': dt(2024, 5, 1), 'lat': 40.712345, 'lng': -73.987654}
+    ,{'id': 2, 'name': 'Taqueria', 'borough_id': 'B3', 'cuisine_id': 'C2', 'inspection_date': dt(2024, 5, 2), 'lat': 40.600001, 'lng': -74.000001}
+]
+
+
+def legacy_table(engine) -> None:
+    '''Replaces `restaurants` with the table as the baseline schema created it, Numeric(14, 12) coordinates.'''
+    Restaurants.__table__.drop(engine)
+    legacy = Table(
+        'restaurants'
+        ,MetaData()
+        ,Column('id', Integer, primary_key = True)
+        ,Column('name', String, nullable = False)
+        ,Column('borough_id', String(2), nullable = False)
+        ,Column('cuisine_id', String, nullable = False)
+        ,Column('inspection_date', DateTime, nullable = False)
+        ,Column('lat', Numeric(14, 12), nullable = False)
+        ,Column('lng', Numeric(14, 12), nullable = False)
+    )
+    legacy.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(legacy), ROWS)
+
+
+def stored(engine) -> tuple[list[tuple], set[str]]:
+    with get_session() as session:
+        rows = session.execute(select(Restaurants).order_by(Restaurants.id)).scalars()
+        values = [(r.id, r.name, r.borough_id, r.cuisine_id, r.inspection_date, r.lat, r.lng) for r in rows]
+    with engine.connect() as conn:
+        types = {t for row in conn.exec_driver_sql('SELECT typeof(lat), typeof(lng) FROM restaurants') for t in row}
+    return values, types
+
+
+def test_migrate_coordinates_converts_legacy_table_once(database):
+    legacy_table(database)
+    assert migrate_coordinates(database) is True
+    values, types = stored(database)
+    assert values == [tuple(r.values()) for r in ROWS]
+    assert types == {'real'}
+    with database.connect() as conn:
+        declared = {r[1]: r[2] for r in conn.exec_driver_sql('PRAGMA table_info(restaurants)')}
+    assert (declared['lat'], declared['lng']) == ('FLOAT', 'FLOAT')
+    assert migrate_coordinates(database) is False
+    assert stored(database) == (values, types)
+
+
+# EOF
@@ -0,0 +1,179 @@
+# Import dependencies
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime as dt, timedelta as td
+from sqlalchemy import select, insert
+
+# Import project dependencies
+import config as C
+from Core.database import Restaurants, CuisineScores, ChangeLog, engine, get_session
+from Core.etl import load as L
+from Core.backend.queries import SqlSource
+
+
+RECENT = pd.Timestamp(dt.now() - td(days = 30)).floor('s')
+EXPIRED = pd.Timestamp(dt.now() - td(days = 3 * 365)).floor('s')
+CUTOFF_YEARS = 2
+
+
+def restaurants(rows: list[tuple]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns = ['id', 'name', 'borough_id', 'cuisine_id', 'inspection_date', 'lat', 'lng'])
+
+
+# Version 1: a fresh build
+V1 = restaurants([
+    (1, 'Unchanged', 'B1', 'C1', RECENT, 40.7, -73.9)
+    ,(2, 'Old Name', 'B2', 'C2', RECENT, 40.6, -73.8)
+    ,(3, 'Expired', 'B3', 'C1', EXPIRED, 40.8, -73.7)
+    ,(4, 'Moved', 'B4', 'C2', RECENT, 40.5, -74.0)
+])
+
+# Version 2: 1 unchanged, 2 renamed, 3 aged out of the window, 4 moved, 5 new
+V2 = restaurants([
+    (1, 'Unchanged', 'B1', 'C1', RECENT, 40.7, -73.9)
+    ,(2, 'New Name', 'B2', 'C2', RECENT, 40.6, -73.8)
+    ,(4, 'Moved', 'B4', 'C2', RECENT, 40.55, -74.05)
+    ,(5, 'Inserted', 'B5', 'C1', RECENT, 40.65, -73.95)
+])
+
+
+def load_v1() -> int:
+    L.fresh_table(Restaurants, V1)
+    return L.record_version('fresh')
+
+
+def update(data_df: pd.DataFrame) -> int:
+    version = L.next_version()
+    L.delete_expiredRows(Restaurants, CUTOFF_YEARS, version)
+    L.update_restaurants(Restaurants, data_df, version)
+    return L.record_version('update', version)
+
+
+def stored() -> dict[int, tuple]:
+    with get_session() as session:
+        rows = session.execute(select(Restaurants.id, Restaurants.name, Restaurants.lat, Restaurants.lng)).all()
+    return {r.id: (r.name, r.lat, r.lng) for r in rows}
+
+
+def change_set(version: int) -> dict[int, str]:
+    with get_session() as session:
+        rows = session.execute(select(ChangeLog.restaurant_id, ChangeLog.op).where(ChangeLog.version == version)).all()
+    return {r.restaurant_id: r.op for r in rows}
+
+
+def test_update_applies_inserts_updates_and_expiry(database):
+    assert load_v1() == 1
+    assert update(V2) == 2
+    assert stored() == {
+        1: ('Unchanged', 40.7, -73.9)
+        ,2: ('New Name', 40.6, -73.8)
+        ,4: ('Moved', 40.55, -74.05)
+        ,5: ('Inserted', 40.65, -73.95)
+    }
+    assert change_set(2) == {ChangeLog.MARKER: 'V', 2: 'U', 3: 'D', 4: 'U', 5: 'I'}
+
+
+def test_map_changes_bridges_one_update(database):
+    load_v1()
+    update(V2)
+    changes = SqlSource().map_changes(1, 2)
+    assert [r['id'] for r in changes['upserts']] == [2, 4, 5]
+    assert changes['deleted'] == [3]
+    renamed = changes['upserts'][0]
+    assert (renamed['name'], renamed['borough'], renamed['cuisine']) == ('New Name', C.REF_SEQS['BOROUGHS'][1], C.REF_SEQS['CUISINES'][1])
+    assert renamed['inspection_date'] == RECENT.date().isoformat()
+
+
+def test_unchanged_reload_records_an_empty_change_set(database):
+    load_v1()
+    update(V2)
+    assert update(V2) == 3
+    assert change_set(3) == {ChangeLog.MARKER: 'V'}
+    assert SqlSource().map_changes(2, 3) == {'upserts': [], 'deleted': []}
+
+
+def test_fresh_build_forces_full_reload(database):
+    load_v1()
+    update(V2)
+    assert L.record_version('fresh') == 3
+    assert SqlSource().map_changes(1, 3) is None
+    assert SqlSource().map_changes(2, 3) is None
+
+
+def test_compacted_versions_force_full_reload(database):
+    load_v1()
+    update(V2)
+    update(V2)
+    L.compact_change_log(1)     # Keeps only version 3's change set
+    assert SqlSource().map_changes(1, 3) is None
+    assert SqlSource().map_changes(2, 3) == {'upserts': [], 'deleted': []}
+
+
+def test_since_after_current_version_forces_full_reload(database):
+    from Core.backend import map_delta_payload
+    from Core.backend.cache import data_version
+    load_v1()
+    update(V2)
+    assert data_version(refresh = True) == 2
+    results = map_delta_payload(5, host = 'localhost')['results']
+    assert (results['version'], results['since'], results['full_reload']) == (2, 5, True)
+    assert (results['upserts'], results['deleted']) == ([], [])
+
+
+def bulk_frame(rows: int) -> pd.DataFrame:
+    '''Restaurants with the compact dtypes a transform hands to the load, float32 coordinates included.'''
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'id': np.arange(1, rows + 1, dtype = np.int32)
+        ,'name': [f'Restaurant {i}' for i in range(rows)]
+        ,'borough_id': rng.choice([f'B{i}' for i in range(1, 6)], rows)
+        ,'cuisine_id': rng.choice(['C1', 'C2'], rows)
+        ,'inspection_date': RECENT - pd.to_timedelta(rng.integers(0, 10**6, rows), unit = 's')
+        ,'lat': rng.uniform(40.5, 40.9, rows).astype(np.float32)
+        ,'lng': rng.uniform(-74.2, -73.7, rows).astype(np.float32)
+    })
+
+
+def raw_rows(table: str) -> list[tuple]:
+    # Values exactly as SQLite stores them, so storage formats are compared too
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f'SELECT * FROM {table} ORDER BY 1, 2').all()
+
+
+def indexes(table: str) -> list[tuple]:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? ORDER BY name", (table,)).all()
+
+
+@pytest.mark.parametrize('chunk_size', [None, 33_333])
+def test_fresh_table_matches_orm_insert(database, chunk_size):
+    df = bulk_frame(2 * L.BULK_BATCH + 17)    # Two full default batches and a ragged tail
+    L.fresh_table(Restaurants, df, chunk_size)
+    bulk = raw_rows('restaurants')
+    with engine.begin() as conn:
+        conn.execute(Restaurants.__table__.delete())
+        conn.execute(insert(Restaurants), L.db_records(df))
+    assert len(bulk) == len(df)
+    assert bulk == raw_rows('restaurants')
+
+
+def test_fresh_table_rebuilds_every_index(database):
+    created = indexes('cuisine_scores')
+    scores = pd.DataFrame({
+        'borough_id': ['B1', 'B1', 'B2']
+        ,'cuisine_id': ['C1', 'C2', 'C1']
+        ,'restaurants': [3, 1, 2]
+        ,'per_100k': [0.5, None, 0.25]
+        ,'location_quotient': [1.2, 0.6, 1.0]
+        ,'citywide_percent': [60.0, 100.0, 40.0]
+    })
+    L.fresh_table(CuisineScores, scores)
+    assert len(created) == len(CuisineScores.__table__.indexes)
+    assert indexes('cuisine_scores') == created
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA integrity_check').scalar() == 'ok'
+    assert len(raw_rows('cuisine_scores')) == 3
+
+
+# EOF
@@ -0,0 +1,29 @@
+# Import dependencies
+import os
+import sys
+import subprocess
+import pytest
+
+# Import project dependencies
+from Core.log_config import process_path, prune_process_logs
+
+
+@pytest.mark.skipif(os.name != 'posix', reason = 'pids are only probed on POSIX')
+def test_prune_removes_only_files_of_exited_processes(tmp_path):
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output = True, text = True)
+    dead = int(exited.stdout)
+    files = [
+        tmp_path / f'app.{dead}.log'
+        ,tmp_path / f'app.{dead}.log.1'
+        ,tmp_path / f'app.{os.getppid()}.log'
+        ,process_path(tmp_path / 'app.log')
+        ,tmp_path / 'app.log'
+        ,tmp_path / 'app.log.1'
+    ]
+    for file in files:
+        file.write_text('entry\n')
+    assert prune_process_logs(tmp_path / 'app.log') == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(f.name for f in files[2:])
+
+
+# EOF
@@ -0,0 +1,57 @@
+# Import dependencies
+import pandas as pd
+import pytest
+
+# Import project dependencies
+import config as C
+from Core.database import Boroughs, Restaurants
+from Core.etl import load as L
+from Core.readmodel import ReadModel, export_read_model
+from Core.backend.queries import SqlSource
+
+
+BOROUGHS = C.REF_SEQS['BOROUGHS']
+DATE = pd.Timestamp('2024-05-01')
+
+
+@pytest.fixture
+def restaurants(database):
+    '''Rows with tied cuisine counts in one borough and coordinates that need all six decimals.'''
+    rows = [
+        # id, name, borough, cuisine, lat, lng
+        (1, 'Zeta', 'B1', 'C3', 40.712345, -73.987654)
+        ,(2, 'Alpha', 'B1', 'C1', 40.712346, -73.987655)
+        ,(3, 'Beta', 'B1', 'C2', 40.600001, -73.800001)
+        ,(4, 'Gamma', 'B1', 'C2', 40.600002, -73.800002)
+        ,(5, 'Delta', 'B2', 'C5', 40.650123, -73.950321)
+        ,(6, 'Eta', 'B2', 'C4', 40.650124, -73.950322)
+        ,(7, 'Theta', 'B3', 'C1', 40.750999, -74.001999)
+    ]
+    df = pd.DataFrame(rows, columns = ['id', 'name', 'borough_id', 'cuisine_id', 'lat', 'lng']).assign(inspection_date = DATE)
+    L.fresh_table(Restaurants, df.astype({'lat': 'float32', 'lng': 'float32'}))
+    L.update_population(Boroughs, pd.DataFrame({'borough': BOROUGHS, 'population': [1_400_000, 2_600_000, 1_600_000, 2_300_000, 500_000]}))
+    return df
+
+
+def test_read_model_matches_sql(restaurants, tmp_path):
+    model = ReadModel(export_read_model(1, tmp_path))
+    sql = SqlSource()
+    assert model.map_rows() == sql.map_rows()
+    assert model.top_cuisines_all() == sql.top_cuisines_all()
+    assert model.borough_summary() == sql.borough_summary()
+    for borough in BOROUGHS:
+        assert model.top_cuisines(borough) == sql.top_cuisines(borough)
+
+
+def test_publishing_never_touches_mapped_versions(restaurants, tmp_path):
+    first = export_read_model(1, tmp_path)
+    again = export_read_model(1, tmp_path, grace = 3600)   # Re-export lands beside the published copy
+    assert first.exists() and again != first
+    assert (tmp_path / 'LATEST').read_text() == again.name
+    export_read_model(2, tmp_path, keep = 1, grace = 3600)
+    assert first.exists()   # Superseded too recently to be unmapped everywhere
+    latest = export_read_model(3, tmp_path, keep = 1, grace = 0)
+    assert sorted(p.name for p in tmp_path.glob('v*')) == [latest.name]
+
+
+# EOF
@@ -0,0 +1,47 @@
+# Import dependencies
+import zipfile
+import pandas as pd
+import pytest
+
+# Import project dependencies
+from Core.database import Restaurants
+from Core.etl import load as L
+from Core.etl.snapshot import export_snapshot, prune_snapshots
+from Core.backend.backend import latest_snapshot
+
+
+@pytest.fixture
+def restaurants(database):
+    df = pd.DataFrame(
+        [(1, 'Curry House', 'B1', 'C1', pd.Timestamp('2024-05-01'), 40.7, -73.9), (2, 'Taqueria', 'B3', 'C2', pd.Timestamp('2024-05-02'), 40.6, -73.8)]
+        ,columns = ['id', 'name', 'borough_id', 'cuisine_id', 'inspection_date', 'lat', 'lng']
+    )
+    L.fresh_table(Restaurants, df)
+    return df
+
+
+def test_snapshot_is_published_through_the_pointer(restaurants, tmp_path):
+    first = export_snapshot(1, tmp_path)
+    assert latest_snapshot(tmp_path) == first
+    second = export_snapshot(2, tmp_path, keep = 1)
+    assert latest_snapshot(tmp_path) == second
+    assert sorted(p.name for p in tmp_path.iterdir() if not p.name.startswith('.')) == ['LATEST', 'v000002', 'v000002.zip']
+    with zipfile.ZipFile(second) as zf:
+        assert all(n.startswith('v000002/borough=') for n in zf.namelist())
+
+
+def test_republishing_a_version_leaves_it_in_place(restaurants, tmp_path):
+    archive = export_snapshot(1, tmp_path)
+    stamp = archive.stat().st_mtime_ns
+    assert export_snapshot(1, tmp_path) == archive
+    assert archive.stat().st_mtime_ns == stamp
+
+
+def test_keep_must_retain_a_snapshot(tmp_path):
+    with pytest.raises(ValueError):
+        prune_snapshots(tmp_path, 0)
+    with pytest.raises(ValueError):
+        export_snapshot(1, tmp_path, keep = 0)
+
+
+# EOF
@@ -0,0 +1,56 @@
+# Import dependencies
+import numpy as np
+import pandas as pd
+import pytest
+
+# Import project dependencies
+import config as C
+from Core.etl import transform as T
+from Core.etl.schema import SCHEMAS, apply_schema
+
+
+BOROUGH_MAP = T.create_dict(C.REF_SEQS['BOROUGHS'], lambda num: f'B{num}')
+CUISINE_MAP = T.create_dict(C.REF_SEQS['CUISINES'], lambda num: f'C{num}')
+FASTFOOD = ['Burger Chain']
+
+
+def extract(rows: int = 240, seed: int = 0) -> pd.DataFrame:
+    '''Raw DOHMH rows with repeated ids, tied dates, fast food names and non-ethnic cuisines.'''
+    rng = np.random.default_rng(seed)
+    cuisines = np.array(list(C.REF_SEQS['CUISINES'][:6]) + ['Hamburgers'])
+    raw = pd.DataFrame({
+        'id': rng.integers(1, 60, rows)
+        ,'name': rng.choice(['Curry House', 'Noodle Bar', 'Taqueria', FASTFOOD[0]], rows)
+        ,'borough': rng.choice(C.REF_SEQS['BOROUGHS'], rows)
+        ,'cuisine': rng.choice(cuisines, rows)
+        ,'inspection_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 30, rows), unit = 'D')
+        ,'lat': rng.uniform(40.55, 40.85, rows)
+        ,'lng': rng.uniform(-74.1, -73.8, rows)
+    })
+    # Restaurant 7 opens and closes the frame, so any split by row position would separate its
+    # inspections; its latest one is the last row
+    split = pd.DataFrame({
+        'id': [7, 7]
+        ,'name': ['Split Kitchen'] * 2
+        ,'borough': [C.REF_SEQS['BOROUGHS'][0], C.REF_SEQS['BOROUGHS'][2]]
+        ,'cuisine': [C.REF_SEQS['CUISINES'][0]] * 2
+        ,'inspection_date': pd.to_datetime(['2023-06-01', '2024-03-01'])
+        ,'lat': [40.7, 40.7]
+        ,'lng': [-73.9, -73.9]
+    })
+    raw = pd.concat([split.iloc[:1], raw[raw['id'] != 7], split.iloc[1:]], ignore_index = True)
+    return apply_schema(raw, SCHEMAS['dohmh'])[0]
+
+
+@pytest.mark.parametrize('workers', [2, 3, 4])
+def test_parallel_transform_matches_serial(workers):
+    df = extract()
+    serial = T.transform_restaurants(df, FASTFOOD, CUISINE_MAP.keys(), BOROUGH_MAP, CUISINE_MAP)
+    parallel = T.parallel_transform(df, FASTFOOD, CUISINE_MAP.keys(), BOROUGH_MAP, CUISINE_MAP, workers)
+    pd.testing.assert_frame_equal(parallel, serial)
+    split = serial[serial['id'] == 7]
+    assert len(split) == 1
+    assert (split['inspection_date'].iloc[0], split['borough_id'].iloc[0]) == (pd.Timestamp('2024-03-01'), 'B3')
+
+
+# EOF
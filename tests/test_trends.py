@@ -0,0 +1,77 @@
+# Import dependencies
+import warnings
+import pandas as pd
+from sqlalchemy import select
+
+# Import project dependencies
+import config as C
+from Core.database import InspectionTrends, get_session
+from Core.etl import load as L, transform as T
+from Core.etl.schema import SCHEMAS, apply_schema
+
+
+BOROUGHS = C.REF_SEQS['BOROUGHS']
+CUISINES = C.REF_SEQS['CUISINES']
+
+
+def extract() -> pd.DataFrame:
+    '''Raw DOHMH rows, one per violation, coerced to the same categorical dtypes as a real extract.'''
+    raw = pd.DataFrame(
+        [
+            (1, 'Curry House', BOROUGHS[0], CUISINES[0], '2024-01-05', 40.7, -73.9)
+            ,(1, 'Curry House', BOROUGHS[0], CUISINES[0], '2024-01-05', 40.7, -73.9)     # Second violation, same inspection
+            ,(1, 'Curry House', BOROUGHS[0], CUISINES[0], '2024-02-10', 40.7, -73.9)
+            ,(2, 'Noodle Bar', BOROUGHS[0], CUISINES[0], '2024-01-20', 40.71, -73.91)
+            ,(3, 'Taqueria', BOROUGHS[2], CUISINES[1], '2024-02-01', 40.6, -73.8)
+            ,(4, 'Burger Spot', BOROUGHS[1], 'Hamburgers', '2024-01-15', 40.8, -73.95)    # Not an ethnic cuisine
+        ]
+        ,columns = ['id', 'name', 'borough', 'cuisine', 'inspection_date', 'lat', 'lng']
+    )
+    return apply_schema(raw, SCHEMAS['dohmh'])[0]
+
+
+def rollup(start: pd.Timestamp | None = None) -> pd.DataFrame:
+    borough_map = T.create_dict(BOROUGHS, lambda num: f'B{num}')
+    cuisine_map = T.create_dict(CUISINES, lambda num: f'C{num}')
+    return T.monthly_inspections(extract(), [], cuisine_map.keys(), borough_map, cuisine_map, start = start)
+
+
+def stored() -> list[tuple]:
+    with get_session() as session:
+        rows = session.execute(select(InspectionTrends).order_by(InspectionTrends.month, InspectionTrends.borough_id, InspectionTrends.cuisine_id)).scalars()
+        return [(r.month, r.borough_id, r.cuisine_id, r.inspections, r.restaurants) for r in rows]
+
+
+def test_rollup_only_has_observed_combinations():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        trends = rollup()
+    assert (trends['inspections'] > 0).all()
+    assert list(trends.itertuples(index = False, name = None)) == [
+        ('2024-01', 'B1', 'C1', 2, 2)
+        ,('2024-02', 'B1', 'C1', 1, 1)
+        ,('2024-02', 'B3', 'C2', 1, 1)
+    ]
+
+
+def test_update_trends_is_idempotent(database):
+    trends = rollup()
+    L.update_trends(InspectionTrends, trends)
+    first = stored()
+    L.update_trends(InspectionTrends, trends)
+    assert stored() == first == list(trends.itertuples(index = False, name = None))
+
+
+
+def test_rollup_from_watermark_keeps_final_months(database):
+    assert L.trends_watermark(InspectionTrends) is None
+    L.update_trends(InspectionTrends, rollup())
+    watermark = L.trends_watermark(InspectionTrends)
+    assert watermark == '2024-02'
+    partial = rollup(start = pd.Timestamp(watermark))
+    assert set(partial['month']) == {'2024-02'}
+    L.update_trends(InspectionTrends, partial)
+    assert stored() == list(rollup().itertuples(index = False, name = None))
+
+
+# EOF
@@ -0,0 +1,8 @@
+# Serve-only entry point: exposes the Flask app without importing or running the ETL pipeline.
+# Run refreshes separately (e.g. `python app.py` locally or a scheduled job) and point the
+# WSGI server here, e.g. `gunicorn wsgi:app`.
+from Core.backend import app
+
+
+# Exposing Flask App for WSGI servers
+app